@@ -14,6 +14,10 @@ AI_MAX_RETRIES = int(os.getenv("AI_MAX_RETRIES", "2"))
 AI_MODEL = os.getenv("AI_MODEL", "openai/gpt-oss-120b")
 AI_TEMPERATURE = float(os.getenv("AI_TEMPERATURE", "0.3"))
 
+# Другой сервер chat completions вместо api.groq.com — например, локальная
+# заглушка benchmarks/stub_llm.py для нагрузочных тестов (ключ GROQ_API не нужен)
+AI_BASE_URL = os.getenv("AI_BASE_URL", "")
+
 # Fallback настройки
 FALLBACK_ON_ERROR = os.getenv("FALLBACK_ON_ERROR", "true").lower() == "true"
 AI_FALLBACK_MESSAGE = "🔄 Переключаюсь на стандартный алгоритм сборки..."
@@ -23,6 +27,14 @@ LOG_AI_REQUESTS = os.getenv("LOG_AI_REQUESTS", "true").lower() == "true"  # Вк
 LOG_AI_RESPONSES = os.getenv("LOG_AI_RESPONSES", "true").lower() == "true"  # Логировать ответы
 LOG_AI_PERFORMANCE = os.getenv("LOG_AI_PERFORMANCE", "true").lower() == "true"  # Время ответа
 
+# Журнал вызовов LLM (Bot/utils/ai_log.py): JSON Lines в фоновом потоке.
+# Пустой AI_LOG_PATH — журнал выключен.
+AI_LOG_PATH = os.getenv("AI_LOG_PATH", os.path.join("logs", "ai_calls.jsonl"))
+AI_LOG_MAX_BYTES = int(os.getenv("AI_LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+AI_LOG_BACKUPS = int(os.getenv("AI_LOG_BACKUPS", "10"))  # старые файлы сжимаются в .gz
+AI_LOG_SAMPLE = os.getenv("AI_LOG_SAMPLE", "*=1")  # доли по шагам: "step1=1,step3=0.1,*=1"
+AI_LOG_REDACT = [p for p in os.getenv("AI_LOG_REDACT", "").split(";;") if p]  # доп. регулярки
+
 # AI сообщения
 AI_SUCCESS_MESSAGES = [
     "🤖 **ИИ подобрал оптимальные компоненты!**",
@@ -45,6 +57,7 @@ def get_ai_config() -> dict:
             "max_retries": AI_MAX_RETRIES,
             "model": AI_MODEL,
             "temperature": AI_TEMPERATURE,
+            "base_url": AI_BASE_URL,
             "fallback_on_error": FALLBACK_ON_ERROR,
             "log_requests": LOG_AI_REQUESTS,
             "log_responses": LOG_AI_RESPONSES,
@@ -60,6 +73,7 @@ def get_ai_config() -> dict:
             "max_retries": 2,
             "model": "openai/gpt-oss-120b",
             "temperature": 0.3,
+            "base_url": "",
             "fallback_on_error": True,
             "log_requests": False,
             "log_responses": False,
@@ -69,7 +83,7 @@ def get_ai_config() -> dict:
 
 def is_ai_enabled() -> bool:
     """Проверяет включен ли AI."""
-    return ENABLE_AI and bool(os.getenv("GROQ_API"))
+    return ENABLE_AI and bool(os.getenv("GROQ_API") or AI_BASE_URL)
 
 
 def get_ai_status_message() -> str:
@@ -89,29 +103,3 @@ def get_ai_fallback_message() -> str:
     """Возвращает случайное сообщение о fallback."""
     import random
     return random.choice(AI_FALLBACK_MESSAGES)
-
-
-def log_ai_request(prompt: str, model: str):
-    """Логирует AI запрос."""
-    if LOG_AI_REQUESTS:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"🔤 ===== AI ЗАПРОС =====")
-        logger.info(f"📝 Модель: {model}")
-        logger.info(f"📤 Промпт: {prompt[:200]}...")  # Первые 200 символов
-        logger.info(f"🔤 =================")
-
-
-def log_ai_response(response: str, duration: float = None):
-    """Логирует AI ответ."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    if LOG_AI_RESPONSES:
-        logger.info(f"🔤 ===== AI ОТВЕТ =====")
-        logger.info(f"📝 Длина: {len(response)} символов")
-        logger.info(f"📥 Ответ: {response[:300]}...")  # Первые 300 символов
-        logger.info(f"🔤 =================")
-    
-    if LOG_AI_PERFORMANCE and duration:
-        logger.info(f"⏱️ Время ответа AI: {duration:.2f} сек")
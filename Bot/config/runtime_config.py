@@ -0,0 +1,68 @@
+"""
+Конфигурация режима запуска бота (polling / webhook).
+"""
+
+import os
+import tempfile
+
+# polling — dp.start_polling (по умолчанию), webhook — aiohttp-сервер
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+
+# Публичный адрес, на который Telegram шлёт обновления (например https://bot.example.com).
+# Пусто — setWebhook не вызывается (вебхук настроен снаружи или локальный тест).
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "").rstrip("/")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = int(os.getenv("WEBAPP_PORT", "8080"))
+
+# Обработка обновлений: у каждого чата своя очередь (порядок FSM сохраняется),
+# разные чаты — параллельно, не больше WEBHOOK_WORKERS одновременно
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "64"))
+# Принятых, но не обработанных обновлений на процесс; при переполнении — 503
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+WEBHOOK_MAX_BODY = int(os.getenv("WEBHOOK_MAX_BODY", str(1024 * 1024)))  # байт
+
+# Сколько секунд при остановке дорабатывать уже принятые обновления
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "30"))
+
+# Свой адрес Bot API (локальный telegram-bot-api или фальшивый из benchmarks/fake_telegram.py)
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "").rstrip("/")
+
+# Несколько процессов: супервизор принимает обновления (polling или webhook)
+# и раздаёт их BOT_PROCESSES воркерам по хэшу chat_id. 1 — один процесс, 0 — по числу CPU
+BOT_PROCESSES = int(os.getenv("BOT_PROCESSES", "1"))
+
+# Снапшот каталога, общий для воркеров (mmap), и период проверки обновления JSON
+CATALOG_SNAPSHOT_PATH = os.getenv(
+    "CATALOG_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "pcbuilder_catalog.snap")
+)
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "60"))
+
+# Таймаут long polling getUpdates в супервизоре, секунд
+POLLING_TIMEOUT = int(os.getenv("POLLING_TIMEOUT", "30"))
+
+# Метрики этапов сборки: гистограммы в памяти, Prometheus на METRICS_PORT (0 — без сервера).
+# У воркеров супервизора порт METRICS_PORT + номер воркера (1..N).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Сторож event loop (Bot/utils/loop_watchdog.py): лаг цикла и стек блокирующего вызова.
+# Включается и здесь, и на ходу командой /watchdog.
+LOOP_WATCHDOG = os.getenv("LOOP_WATCHDOG", "false").lower() == "true"
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+LOOP_WATCHDOG_INTERVAL = float(os.getenv("LOOP_WATCHDOG_INTERVAL", "0.05"))
+
+# Профилирование по запросу (Bot/utils/profiling.py): следующие PROFILE_BUILDS сборок
+# под cProfile или сэмплером, PROFILE_MEMORY — tracemalloc вокруг load_components.
+# На ходу — админ-команда /profile.
+PROFILE_BUILDS = int(os.getenv("PROFILE_BUILDS", "0"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")  # cprofile | sample
+PROFILE_MEMORY = os.getenv("PROFILE_MEMORY", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# Telegram id администраторов (через запятую): /stats и прочие служебные команды
+ADMIN_IDS = {int(x) for x in os.getenv("ADMIN_IDS", "").replace(" ", "").split(",") if x}
@@ -0,0 +1,36 @@
+"""
+Конфигурация хранилища FSM (состояния диалогов BuildPC / PreferencesState).
+"""
+
+import os
+
+# memory — in-process (как раньше), sqlite — локальный файл в режиме WAL,
+# redis — общий Redis/совместимый сервер для нескольких процессов/машин
+FSM_STORAGE = os.getenv("FSM_STORAGE", "sqlite").lower()
+
+FSM_SQLITE_PATH = os.getenv("FSM_SQLITE_PATH", "fsm_storage.sqlite3")
+FSM_REDIS_URL = os.getenv("FSM_REDIS_URL", "redis://localhost:6379/0")
+
+# Брошенный диалог удаляется через FSM_TTL секунд после последней записи (0 — без срока)
+FSM_TTL = int(os.getenv("FSM_TTL", str(24 * 60 * 60)))
+
+# Отложенная запись: пачка сбрасывается раз в FSM_FLUSH_INTERVAL секунд
+# или при FSM_FLUSH_BATCH изменённых ключах (0 — писать сразу)
+FSM_FLUSH_INTERVAL = float(os.getenv("FSM_FLUSH_INTERVAL", "0.5"))
+FSM_FLUSH_BATCH = int(os.getenv("FSM_FLUSH_BATCH", "256"))
+
+# Предпочтения пользователей (последняя сборка): LRU в памяти + SQLite на диске
+PREFS_MAX_USERS = int(os.getenv("PREFS_MAX_USERS", "10000"))
+PREFS_CACHE_TTL = int(os.getenv("PREFS_CACHE_TTL", str(60 * 60)))  # вытеснение из памяти после простоя
+PREFS_TTL = int(os.getenv("PREFS_TTL", str(90 * 24 * 60 * 60)))  # хранение на диске (0 — бессрочно)
+PREFS_PERSIST = os.getenv("PREFS_PERSIST", "true").lower() == "true"
+PREFS_SQLITE_PATH = os.getenv("PREFS_SQLITE_PATH", FSM_SQLITE_PATH)
+
+# Варианты показанных сборок (кнопки «Дешевле / Упор в GPU…»): только в памяти процесса
+VARIANTS_MAX_MESSAGES = int(os.getenv("VARIANTS_MAX_MESSAGES", "5000"))
+VARIANTS_CACHE_TTL = int(os.getenv("VARIANTS_CACHE_TTL", str(24 * 60 * 60)))  # кнопки старше — «устарели»
+
+# Готовые результаты сборок (основная + варианты) по запросу и версии каталога:
+# повторный одинаковый запрос и прогретые популярные запросы — без пересчёта и без ИИ
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))  # 0 — без кэша
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", str(6 * 60 * 60)))  # секунд с момента расчёта
@@ -1,15 +1,35 @@
 """
 Хранение пользовательских предпочтений для сборки ПК.
+
+Предпочтения (последняя сборка) лежат в PreferencesStore: LRU с ограничением
+по числу пользователей и вытеснением после простоя (PREFS_CACHE_TTL), поверх
+опционального SQLite-бэкенда — так последние предпочтения переживают рестарт
+и доступна кнопка «повторить последнюю сборку».
+
+Обработчики вызывают *_async-варианты: чтение/запись SQLite идут в одном
+отдельном потоке (порядок запросов сохраняется), event loop не блокируется.
 """
 
-from typing import Dict, Optional
-from dataclasses import dataclass, field
+import asyncio
+import functools
 import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from Bot.config.storage_config import (
+    PREFS_CACHE_TTL, PREFS_MAX_USERS, PREFS_PERSIST, PREFS_SQLITE_PATH, PREFS_TTL,
+)
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class UserPreferences:
     """Предпочтения пользователя для сборки ПК."""
     budget: int = 0
@@ -18,6 +38,7 @@ class UserPreferences:
     gpu_brand: Optional[str] = None  # "nvidia", "radeon", None
     need_gpu: Optional[bool] = None  # True, False, None
     step: str = "budget"  # budget, usage, cpu_brand, gpu_brand, gpu_need, confirm
+    updated_at: float = 0.0  # время последнего сохранения (unix)
     
     def to_dict(self) -> Dict:
         """Конвертирует в словарь для AI."""
@@ -36,15 +57,246 @@ class UserPreferences:
         self.step = "budget"
 
 
+# ══════════════════════════════════════════════════════════
+#  ПОСТОЯННОЕ ХРАНЕНИЕ
+# ══════════════════════════════════════════════════════════
+
+_PERSISTED = ("budget", "usage", "cpu_brand", "gpu_brand", "need_gpu", "updated_at")
+
+
+class SQLitePreferencesBackend:
+    """Таблица user_preferences в SQLite (тот же файл, что и у FSM, режим WAL)."""
+
+    def __init__(self, path: str = PREFS_SQLITE_PATH, ttl: int = PREFS_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS user_preferences ("
+                "user_id INTEGER PRIMARY KEY, budget INTEGER, usage TEXT, "
+                "cpu_brand TEXT, gpu_brand TEXT, need_gpu INTEGER, updated_at REAL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self, user_id: int) -> Optional[UserPreferences]:
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(_PERSISTED)} FROM user_preferences WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        prefs = UserPreferences(*row[:4], need_gpu=None if row[4] is None else bool(row[4]), updated_at=row[5])
+        if self.ttl > 0 and prefs.updated_at < time.time() - self.ttl:
+            self.delete(user_id)
+            return None
+        return prefs
+
+    def save(self, user_id: int, prefs: UserPreferences) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO user_preferences (user_id, {', '.join(_PERSISTED)}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, *(getattr(prefs, f) for f in _PERSISTED)),
+                )
+
+    def delete(self, user_id: int) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM user_preferences WHERE user_id = ?", (user_id,))
+
+    def popular(self, limit: int) -> List[UserPreferences]:
+        """Самые частые (бюджет, назначение, бренды, need_gpu) среди последних сборок."""
+        since = time.time() - self.ttl if self.ttl > 0 else 0
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT budget, usage, cpu_brand, gpu_brand, need_gpu "
+                "FROM user_preferences WHERE budget > 0 AND updated_at >= ? "
+                "GROUP BY budget, usage, cpu_brand, gpu_brand, need_gpu "
+                "ORDER BY COUNT(*) DESC, budget LIMIT ?",
+                (since, limit),
+            ).fetchall()
+        return [UserPreferences(*row[:4], need_gpu=None if row[4] is None else bool(row[4])) for row in rows]
+
+
+# ══════════════════════════════════════════════════════════
+#  LRU + TTL В ПАМЯТИ
+# ══════════════════════════════════════════════════════════
+
+class _Entry:
+    __slots__ = ("prefs", "touched")
+
+    def __init__(self, prefs: UserPreferences, touched: float):
+        self.prefs = prefs
+        self.touched = touched
+
+
+class PreferencesStore:
+    """
+    Ограниченное хранилище предпочтений: не больше max_size пользователей
+    в памяти, запись вытесняется после ttl секунд без обращений.
+
+    OrderedDict держит записи в порядке последнего обращения, поэтому
+    и LRU-вытеснение, и истечение TTL снимают записи с начала.
+    При промахе запись подгружается из backend (если он есть).
+    """
+
+    def __init__(
+        self,
+        max_size: int = PREFS_MAX_USERS,
+        ttl: int = PREFS_CACHE_TTL,
+        backend: Optional[SQLitePreferencesBackend] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend = backend
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def _expire(self, now: float) -> None:
+        if self.ttl <= 0:
+            return
+        deadline = now - self.ttl
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry.touched >= deadline:
+                break
+            self._entries.popitem(last=False)
+            self.expirations += 1
+
+    def _insert(self, user_id: int, prefs: UserPreferences, now: float) -> None:
+        self._entries[user_id] = _Entry(prefs, now)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, user_id: int) -> Optional[UserPreferences]:
+        """Предпочтения из памяти или backend; None, если пользователь неизвестен."""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.touched = now
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry.prefs
+            self.misses += 1
+
+        prefs = None
+        if self.backend is not None:
+            try:
+                prefs = self.backend.load(user_id)
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка чтения предпочтений user={user_id}: {e}")
+        if prefs is not None:
+            with self._lock:
+                self._insert(user_id, prefs, now)
+        return prefs
+
+    def put(self, user_id: int, prefs: UserPreferences, persist: bool = True) -> None:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._insert(user_id, prefs, now)
+        if persist and self.backend is not None:
+            prefs.updated_at = now
+            try:
+                self.backend.save(user_id, prefs)
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка сохранения предпочтений user={user_id}: {e}")
+
+    def pop(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self.backend is not None:
+            try:
+                self.backend.delete(user_id)
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка удаления предпочтений user={user_id}: {e}")
+
+    def popular(self, limit: int) -> List[UserPreferences]:
+        """
+        Самые частые запросы по последним сборкам пользователей (бюджет —
+        ровно тот, что вводили). С backend — по всем сохранённым, иначе —
+        по тем, что в памяти.
+        """
+        if self.backend is not None:
+            try:
+                return self.backend.popular(limit)
+            except sqlite3.Error as e:
+                logger.error(f"Ошибка чтения популярных запросов: {e}")
+        with self._lock:
+            combos: Counter = Counter(
+                (e.prefs.budget, e.prefs.usage, e.prefs.cpu_brand,
+                 e.prefs.gpu_brand, e.prefs.need_gpu)
+                for e in self._entries.values() if e.prefs.budget > 0
+            )
+        return [UserPreferences(*combo[:4], need_gpu=combo[4]) for combo, _ in combos.most_common(limit)]
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def memory_usage(self) -> int:
+        """Оценка занятой памяти в байтах (словарь + записи + строки)."""
+        with self._lock:
+            total = sys.getsizeof(self._entries)
+            for user_id, entry in self._entries.items():
+                prefs = entry.prefs
+                total += sys.getsizeof(user_id) + sys.getsizeof(entry) + sys.getsizeof(prefs)
+                for value in (prefs.usage, prefs.cpu_brand, prefs.gpu_brand, prefs.step):
+                    if value is not None:
+                        total += sys.getsizeof(value)
+        return total
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "memory_bytes": self.memory_usage(),
+        }
+
+
 # Глобальное хранилище предпочтений
-_user_preferences: Dict[int, UserPreferences] = {}
+_user_preferences = PreferencesStore(backend=SQLitePreferencesBackend() if PREFS_PERSIST else None)
 
 
 def get_user_preferences(user_id: int) -> UserPreferences:
     """Получает предпочтения пользователя."""
-    if user_id not in _user_preferences:
-        _user_preferences[user_id] = UserPreferences()
-    return _user_preferences[user_id]
+    prefs = _user_preferences.get(user_id)
+    if prefs is None:
+        prefs = UserPreferences()
+        _user_preferences.put(user_id, prefs, persist=False)
+    return prefs
+
+
+def get_last_preferences(user_id: int) -> Optional[UserPreferences]:
+    """Предпочтения последней сборки (None, если пользователь ещё ничего не собирал)."""
+    prefs = _user_preferences.get(user_id)
+    if prefs is None or not prefs.budget:
+        return None
+    return prefs
 
 
 def set_user_preferences(user_id: int, **kwargs):
@@ -55,12 +307,35 @@ def set_user_preferences(user_id: int, **kwargs):
             setattr(prefs, key, value)
         else:
             logger.warning(f"Неизвестное предпочтение: {key}")
+    _user_preferences.put(user_id, prefs)
+
+
+# Один поток: SQLite-запросы предпочтений выполняются по очереди, как пришли
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefs-sqlite")
+
+
+async def _call(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def get_last_preferences_async(user_id: int) -> Optional[UserPreferences]:
+    """get_last_preferences вне event loop."""
+    return await _call(get_last_preferences, user_id)
+
+
+async def set_user_preferences_async(user_id: int, **kwargs) -> None:
+    """set_user_preferences вне event loop."""
+    await _call(set_user_preferences, user_id, **kwargs)
+
+
+def popular_requests(limit: int) -> List[UserPreferences]:
+    """Самые частые запросы сборки, по убыванию частоты."""
+    return _user_preferences.popular(limit)
 
 
 def clear_user_preferences(user_id: int):
     """Очищает предпочтения пользователя."""
-    if user_id in _user_preferences:
-        del _user_preferences[user_id]
+    _user_preferences.pop(user_id)
 
 
 def get_usage_display(usage: str) -> str:
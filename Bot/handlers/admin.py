@@ -0,0 +1,120 @@
+"""
+Служебные команды администраторов (ADMIN_IDS).
+"""
+
+import asyncio
+import html
+
+from aiogram import Bot, Router, F
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from Bot.config.runtime_config import ADMIN_IDS
+from Bot.utils.loop_watchdog import WATCHDOG
+from Bot.utils.metrics import REGISTRY
+from Bot.utils.profiling import MODES, PROFILER
+
+router = Router()
+router.message.filter(F.from_user.id.in_(ADMIN_IDS))
+
+# отложенные отправки отчётов профайлера (ссылки, чтобы задачи не собрал GC)
+_report_tasks: set = set()
+
+
+def _pre(text: str) -> str:
+    return f"<pre>{html.escape(text[:3900])}</pre>"
+
+
+@router.message(Command("stats"))
+async def cmd_stats(message: Message) -> None:
+    """Задержки этапов сборки (число замеров и p50/p95/p99 в мс) и счётчики событий."""
+    summary = REGISTRY.summary()
+    counters = REGISTRY.counters()
+    if not summary and not counters:
+        return await message.answer("📊 Замеров пока нет.")
+
+    width = max(len(name) for name in [*summary, *counters])
+    lines = [f"{'этап':<{width}} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8}"]
+    for stage, s in summary.items():
+        lines.append(
+            f"{stage:<{width}} {s['count']:>6} "
+            f"{s['p50'] * 1000:>8.1f} {s['p95'] * 1000:>8.1f} {s['p99'] * 1000:>8.1f}"
+        )
+    if counters:
+        lines.append("")
+        lines += [f"{name:<{width}} {value:>6}" for name, value in counters.items()]
+
+    # длинная таблица режется под лимит сообщения Telegram
+    text = "\n".join(lines)[:3900]
+    await message.answer(f"📊 *Задержки этапов, мс*\n```\n{text}\n```", parse_mode="Markdown")
+
+
+@router.message(Command("watchdog"))
+async def cmd_watchdog(message: Message, command: CommandObject) -> None:
+    """/watchdog on|off|<порог мс> — сторож event loop на ходу; без аргумента — состояние."""
+    arg = (command.args or "").strip().lower()
+    if arg == "on":
+        WATCHDOG.start()
+    elif arg == "off":
+        WATCHDOG.stop()
+    elif arg.isdigit() and int(arg) > 0:
+        WATCHDOG.set_threshold(int(arg))
+        WATCHDOG.start()
+    elif arg:
+        return await message.answer("Использование: /watchdog on | off | <порог, мс>")
+
+    lag = REGISTRY.summary().get("loop.lag")
+    lines = [
+        f"🐶 Сторож цикла: {'включён' if WATCHDOG.running else 'выключен'}",
+        f"Порог: {WATCHDOG.threshold * 1000:.0f} мс, остановок: {WATCHDOG.stalls}",
+    ]
+    if lag:
+        lines.append(f"Лаг p50/p99: {lag['p50'] * 1000:.1f} / {lag['p99'] * 1000:.1f} мс")
+    await message.answer("\n".join(lines))
+
+
+@router.message(Command("profile"))
+async def cmd_profile(message: Message, command: CommandObject, bot: Bot) -> None:
+    """
+    /profile [N] [cprofile|sample] [mem] — профилировать следующие N сборок
+    (по умолчанию 5, cprofile); mem — ещё и отдельная загрузка JSON каталога
+    (load_components) под tracemalloc; рабочий каталог не перезагружается.
+    /profile off — снять; без аргументов — состояние и последний отчёт.
+    """
+    args = (command.args or "").lower().split()
+    if not args:
+        state = f"взведён: осталось {PROFILER.remaining} ({PROFILER.mode})" if PROFILER.armed else "не взведён"
+        text = f"🔬 Профайлер {state}"
+        if PROFILER.last_report:
+            return await message.answer(f"{text}\nПоследний отчёт:\n{_pre(PROFILER.last_report)}", parse_mode="HTML")
+        return await message.answer(text)
+    if args == ["off"]:
+        PROFILER.disarm()
+        return await message.answer("🔬 Профайлер снят")
+
+    builds = next((int(a) for a in args if a.isdigit()), 5 if "mem" not in args else 0)
+    mode = next((a for a in args if a in MODES), "cprofile")
+    loop = asyncio.get_running_loop()
+    chat_id = message.chat.id
+
+    def on_done(report: str) -> None:
+        # вызывается из потока последней сборки
+        def send() -> None:
+            task = loop.create_task(bot.send_message(chat_id, f"🔬 Готово\n{_pre(report)}", parse_mode="HTML"))
+            _report_tasks.add(task)
+            task.add_done_callback(_report_tasks.discard)
+        loop.call_soon_threadsafe(send)
+
+    if builds:
+        PROFILER.arm(builds, mode, on_done=on_done)
+        await message.answer(f"🔬 Профилирую следующие {builds} сборок ({mode}), отчёт пришлю сюда")
+
+    if "mem" in args:
+        from Bot.services.component_loader import COMPONENTS_DIR, load_components
+
+        # одна явная загрузка мимо @memory_profiled: взвод PROFILER.memory не расходуется,
+        # общий каталог, его версия и слушатели загрузки (прогрев) не затрагиваются
+        report = await loop.run_in_executor(
+            None, PROFILER.measure_memory, "load_components", load_components.__wrapped__, COMPONENTS_DIR,
+        )
+        await message.answer(_pre(report), parse_mode="HTML")
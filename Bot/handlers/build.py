@@ -8,6 +8,8 @@ from aiogram.fsm.context import FSMContext
 from Bot.states.build_state import BuildPC
 from Bot.keyboards.main_kb import main_keyboard
 from Bot.keyboards.build_kb import usage_keyboard
+from Bot.keyboards.preferences_kb import get_repeat_build_keyboard
+from Bot.data.user_preferences import get_last_preferences_async, get_usage_display
 from Bot.services.component_loader import load_components
 from Bot.services.ai_pc_builder import build_pc_with_ai
 from Bot.services.pc_builder import escape_md
@@ -31,12 +33,21 @@ router = Router()
 @router.message(Command("build"))
 async def cmd_build(message: Message, state: FSMContext) -> None:
     await state.clear()
+
+    # Вернувшемуся пользователю — кнопка повтора последней сборки
+    last = await get_last_preferences_async(message.from_user.id)
+    repeat_kb = None
+    if last is not None:
+        label = f"{last.budget:,} ₸".replace(",", " ")
+        repeat_kb = get_repeat_build_keyboard(f"{label} · {get_usage_display(last.usage)}")
+
     await message.answer(
         "💰 *Введи бюджет на сборку в тенге*\n\n"
         "Просто напиши число, например: `350000`\n\n"
         "Бот подберёт комплектующие *строго в пределах* этой суммы — "
         "итоговая сборка будет стоить ровно столько или дешевле.",
         parse_mode="Markdown",
+        reply_markup=repeat_kb,
     )
     await state.set_state(BuildPC.budget)
 
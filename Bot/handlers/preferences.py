@@ -17,16 +17,25 @@ from Bot.keyboards.preferences_kb import (
     get_gpu_need_keyboard,
     get_preferences_summary_keyboard
 )
+from Bot.data.user_preferences import get_last_preferences_async, set_user_preferences_async
 # from Bot.handlers.build import set_usage_with_preferences  # Убираем циклический импорт
 from Bot.keyboards.main_kb import main_keyboard
-from Bot.services.component_loader import load_components
-from Bot.services.ai_pc_builder import build_pc_with_ai
-from Bot.utils.enhanced_formatter import format_enhanced_ai_build_message
+from Bot.services.catalog import get_catalog
+from Bot.services.build_variants import BEST, VariantSet, build_with_variants_async
+from Bot.handlers.variants import send_build
+from Bot.utils.single_flight import UserLocks
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
+# Бренды в FSM хранятся в «человеческом» виде, в предпочтениях — ключами
+_CPU_DISPLAY = {"intel": "Intel", "amd": "AMD"}
+_GPU_DISPLAY = {"nvidia": "NVIDIA", "radeon": "AMD Radeon"}
+
+# Не больше одной сборки на пользователя одновременно
+_building = UserLocks()
+
 
 @router.callback_query(F.data.startswith("pref_cpu_"))
 async def process_cpu_brand(callback: CallbackQuery, state: FSMContext):
@@ -154,6 +163,19 @@ async def show_preferences_summary(callback: CallbackQuery, state: FSMContext):
 @router.callback_query(F.data == "pref_confirm")
 async def confirm_preferences(callback: CallbackQuery, state: FSMContext):
     """Подтверждение предпочтений и переход к сборке."""
+    # Повторное нажатие: сборка уже идёт или уже отправлена
+    if await state.get_state() != PreferencesState.confirming_preferences.state:
+        return await callback.answer("Эта сборка уже запущена")
+    if not _building.acquire(callback.from_user.id):
+        return await callback.answer("⏳ Сборка уже идёт, подождите...")
+    
+    try:
+        await _confirm_and_build(callback, state)
+    finally:
+        _building.release(callback.from_user.id)
+
+
+async def _confirm_and_build(callback: CallbackQuery, state: FSMContext):
     await callback.answer("Предпочтения сохранены!")
     
     # Переходим к сборке
@@ -174,7 +196,8 @@ async def confirm_preferences(callback: CallbackQuery, state: FSMContext):
         f"🎯 **Начинаю сборку ПК...**\n\n"
         f"💰 Бюджет: **{budget_label}**\n"
         f"🎯 Назначение: **{usage_nice.get(preset, preset)}**\n\n"
-        f"🤖 *ИИ подбирает оптимальные компоненты...*"
+        f"🤖 *ИИ подбирает оптимальные компоненты...*",
+        reply_markup=main_keyboard(),
     )
     
     # Отправляем сообщения о процессе
@@ -210,11 +233,12 @@ async def set_usage_with_preferences(message: Message, state: FSMContext):
         if data.get("need_gpu") is not None:
             preferences["need_gpu"] = data["need_gpu"]
         
-        # Загружаем компоненты
-        all_parts = load_components()
+        # Каталог (кэшируется, перечитывается при обновлении JSON)
+        all_parts = get_catalog()
         
-        # Вызываем AI сборку с предпочтениями
-        result, used_ai, ai_explanation = build_pc_with_ai(
+        # AI сборка с предпочтениями + альтернативы к ней
+        # (в пуле потоков; одинаковые запросы объединяются)
+        result, used_ai, ai_explanation, alternatives = await build_with_variants_async(
             budget_val, 
             preset, 
             all_parts, 
@@ -229,28 +253,32 @@ async def set_usage_with_preferences(message: Message, state: FSMContext):
                 reply_markup=main_keyboard()
             )
         
-        # Форматируем красивое сообщение
-        formatted_message = format_enhanced_ai_build_message(
-            build=result,
+        # Отправляем результат (с кнопками вариантов, если они есть)
+        await send_build(message, VariantSet(
             budget=budget_val,
-            usage=preset,
+            preset=preset,
+            preferences=preferences,
+            builds={BEST: result, **alternatives},
             used_ai=used_ai,
-            ai_explanation=ai_explanation
-        )
-        
-        # Отправляем результат
-        await message.answer(
-            formatted_message,
-            parse_mode="Markdown",
-            reply_markup=main_keyboard()
-        )
+            explanation=ai_explanation,
+        ))
         
         # Очищаем состояние
         await state.clear()
         
+        # Запоминаем для «повторить последнюю сборку» (в личке chat.id == user.id)
+        await set_user_preferences_async(
+            message.chat.id,
+            budget=budget_val,
+            usage=preset,
+            cpu_brand=(preferences.get("cpu_brand") or "").lower() or None,
+            gpu_brand=(preferences.get("gpu_brand") or "").lower() or None,
+            need_gpu=preferences.get("need_gpu"),
+        )
+        
         logger.info(
             "Сборка отправлена: user=%s budget=%s preset=%s preferences=%s",
-            message.from_user.id,
+            message.chat.id,
             budget_val,
             preset,
             preferences
@@ -288,3 +316,46 @@ async def change_preferences(callback: CallbackQuery, state: FSMContext):
         f"🎯 Назначение: **{preset}**",
         reply_markup=get_cpu_brand_keyboard()
     )
+
+
+@router.callback_query(F.data == "pref_repeat")
+async def repeat_last_build(callback: CallbackQuery, state: FSMContext):
+    """Повтор последней сборки пользователя по сохранённым предпочтениям."""
+    prefs = await get_last_preferences_async(callback.from_user.id)
+    if prefs is None:
+        return await callback.answer("Прошлая сборка не найдена", show_alert=True)
+    if not _building.acquire(callback.from_user.id):
+        return await callback.answer("⏳ Сборка уже идёт, подождите...")
+    
+    try:
+        await _repeat_build(callback, state, prefs)
+    finally:
+        _building.release(callback.from_user.id)
+
+
+async def _repeat_build(callback: CallbackQuery, state: FSMContext, prefs):
+    await callback.answer("Повторяю последнюю сборку...")
+    
+    budget_label = f"{prefs.budget:,} ₸".replace(",", " ")
+    usage_nice = {"gaming": "🎮 Игры", "work": "💼 Работа", "universal": "🔄 Универсальный"}
+    
+    await state.clear()
+    await state.update_data(
+        budget=prefs.budget,
+        budget_label=budget_label,
+        usage=prefs.usage,
+        cpu_brand=_CPU_DISPLAY.get(prefs.cpu_brand, "Любой"),
+        gpu_brand=_GPU_DISPLAY.get(prefs.gpu_brand, "Любая"),
+        need_gpu=prefs.need_gpu,
+    )
+    await state.set_state(BuildPC.usage)
+    
+    await callback.message.answer(
+        f"🔁 **Повторяю прошлую сборку...**\n\n"
+        f"💰 Бюджет: **{budget_label}**\n"
+        f"🎯 Назначение: **{usage_nice.get(prefs.usage, prefs.usage)}**\n\n"
+        f"🤖 *ИИ подбирает оптимальные компоненты по текущим ценам...*",
+        reply_markup=main_keyboard(),
+    )
+    
+    await set_usage_with_preferences(callback.message, state)
@@ -0,0 +1,176 @@
+"""
+Кнопки под сообщением со сборкой.
+
+  • варианты «Дешевле / Баланс / Упор в GPU / Упор в CPU» — посчитаны вместе
+    с основной сборкой (build_with_variants), нажатие только перерисовывает
+    сообщение;
+  • «Заменить компонент» — категория → ближайшие по цене альтернативы →
+    замена с перепроверкой зависимых категорий (component_swap), без ИИ.
+
+Сборки лежат в variant_store по сообщению; сообщение редактируется на месте.
+"""
+
+import logging
+
+from aiogram import Router, F
+from aiogram.types import CallbackQuery, Message
+
+from Bot.keyboards.build_kb import (
+    COMPONENT_LABELS, VARIANT_LABELS,
+    swap_categories_keyboard, swap_options_keyboard, variants_keyboard,
+)
+from Bot.services.build_variants import BEST, VARIANTS, VariantSet, variant_store
+from Bot.services.catalog import get_catalog
+from Bot.services.component import item_forms
+from Bot.services.component_swap import SWAPPABLE, resolve_build, swap_component, swap_options
+from Bot.services.pc_builder import _total_price
+from Bot.utils.enhanced_formatter import format_enhanced_ai_build_message
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+_EXPIRED = "Сборка устарела — соберите ПК заново"
+
+
+def _render(variants: VariantSet, key: str) -> str:
+    text = variants.texts.get(key)
+    if text is None:
+        build = variants.builds[key]
+        swapped = variants.swapped.get(key)
+        if key == BEST and not swapped:
+            text = format_enhanced_ai_build_message(
+                build=build, budget=variants.budget, usage=variants.preset,
+                used_ai=variants.used_ai, ai_explanation=variants.explanation,
+            )
+        else:
+            # альтернативы собраны стандартным алгоритмом; после замены
+            # комментарий ИИ к исходной сборке уже не подходит
+            text = format_enhanced_ai_build_message(build=build, budget=variants.budget, usage=variants.preset)
+            if swapped:
+                labels = ", ".join(COMPONENT_LABELS.get(cat, cat) for cat in swapped)
+                text = f"🔧 *Заменено:* {labels}\n\n" + text
+            if key != BEST:
+                text = f"🔀 *Вариант: {VARIANT_LABELS[key]}*\n\n" + text
+        variants.texts[key] = text
+    return text
+
+
+def _keyboard(variants: VariantSet):
+    options = [(key, _total_price(variants.builds[key]))
+               for key in (BEST, *VARIANTS) if key in variants.builds]
+    return variants_keyboard(options, variants.current)
+
+
+async def send_build(message: Message, variants: VariantSet) -> None:
+    """Отправляет основную сборку с кнопками вариантов и замены компонента."""
+    sent = await message.answer(_render(variants, BEST), parse_mode="Markdown", reply_markup=_keyboard(variants))
+    variant_store.put(sent.chat.id, sent.message_id, variants)
+
+
+def _entry(callback: CallbackQuery):
+    return variant_store.get(callback.message.chat.id, callback.message.message_id)
+
+
+# ────────────────────────── ВАРИАНТЫ ──────────────────────────
+
+@router.callback_query(F.data.startswith("variant_"))
+async def switch_variant(callback: CallbackQuery) -> None:
+    """Показывает другой вариант в том же сообщении."""
+    key = callback.data.removeprefix("variant_")
+    variants = _entry(callback)
+    if variants is None:
+        return await callback.answer(_EXPIRED, show_alert=True)
+    if key == variants.current or key not in variants.builds:
+        return await callback.answer()
+
+    variants.current = key
+    await callback.message.edit_text(_render(variants, key), parse_mode="Markdown", reply_markup=_keyboard(variants))
+    await callback.answer(VARIANT_LABELS.get(key, key))
+
+
+# ────────────────────────── ЗАМЕНА КОМПОНЕНТА ──────────────────────────
+
+@router.callback_query(F.data == "swap_menu")
+async def swap_menu(callback: CallbackQuery) -> None:
+    """Меню категорий для замены в показанном варианте."""
+    variants = _entry(callback)
+    if variants is None:
+        return await callback.answer(_EXPIRED, show_alert=True)
+
+    build = variants.builds[variants.current]
+    categories = [cat for cat in SWAPPABLE
+                  if build.get(cat) or (cat == "cooler" and build.get("coolers"))]
+    await callback.message.edit_reply_markup(reply_markup=swap_categories_keyboard(categories))
+    await callback.answer()
+
+
+@router.callback_query(F.data == "swap_back")
+async def swap_back(callback: CallbackQuery) -> None:
+    variants = _entry(callback)
+    if variants is None:
+        return await callback.answer(_EXPIRED, show_alert=True)
+
+    variants.swap_category, variants.swap_choices, variants.swap_catalog = None, [], None
+    await callback.message.edit_reply_markup(reply_markup=_keyboard(variants))
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("swap_cat_"))
+async def swap_category(callback: CallbackQuery) -> None:
+    """Ближайшие по цене совместимые альтернативы выбранной категории."""
+    category = callback.data.removeprefix("swap_cat_")
+    variants = _entry(callback)
+    if variants is None:
+        return await callback.answer(_EXPIRED, show_alert=True)
+    if category not in SWAPPABLE:
+        return await callback.answer()
+
+    # один экземпляр каталога на сопоставление и подбор: перезагрузка может подменить ссылку между вызовами
+    catalog = get_catalog()
+    build = resolve_build(catalog, variants.builds[variants.current])
+    choices = swap_options(catalog, build, category, variants.preferences)
+    if not choices:
+        return await callback.answer("Других вариантов в прайсе нет", show_alert=True)
+
+    current = build.get(category) or build.get("coolers" if category == "cooler" else category)
+    variants.swap_category, variants.swap_choices, variants.swap_catalog = category, choices, catalog
+    await callback.message.edit_reply_markup(reply_markup=swap_options_keyboard(
+        [(item_forms(item).short, item["price"]) for item in choices],
+        current["price"] if current else 0,
+    ))
+    await callback.answer(COMPONENT_LABELS.get(category, category))
+
+
+@router.callback_query(F.data.startswith("swap_pick_"))
+async def swap_pick(callback: CallbackQuery) -> None:
+    """Ставит выбранную позицию, пересчитывает зависимые категории и перерисовывает сборку."""
+    variants = _entry(callback)
+    if variants is None:
+        return await callback.answer(_EXPIRED, show_alert=True)
+    try:
+        choice = variants.swap_choices[int(callback.data.removeprefix("swap_pick_"))]
+    except (ValueError, IndexError):
+        return await callback.answer()
+
+    key, category = variants.current, variants.swap_category
+    # тот же экземпляр, из которого взяты варианты меню
+    build, changed = swap_component(variants.swap_catalog, variants.builds[key], category, choice)
+
+    variants.builds[key] = build
+    swapped = variants.swapped.setdefault(key, [])
+    swapped += [cat for cat in (category, *changed) if cat not in swapped]
+    variants.texts.pop(key, None)
+    variants.swap_category, variants.swap_choices, variants.swap_catalog = None, [], None
+
+    await callback.message.edit_text(_render(variants, key), parse_mode="Markdown", reply_markup=_keyboard(variants))
+
+    note = f"Заменено: {COMPONENT_LABELS.get(category, category)}"
+    if changed:
+        note += " (+ " + ", ".join(COMPONENT_LABELS.get(cat, cat) for cat in changed) + ")"
+    over = _total_price(build) - variants.budget
+    if over > 0:
+        note += f"\n⚠️ Итого выше бюджета на {over:,} ₸".replace(",", " ")
+    await callback.answer(note, show_alert=over > 0)
+    logger.info("Замена компонента: chat=%s %s → %s, зависимые=%s",
+                callback.message.chat.id, category, choice["name"], changed)
@@ -1,4 +1,32 @@
-from aiogram.types import ReplyKeyboardMarkup, KeyboardButton
+from typing import List, Tuple
+
+from aiogram.types import (
+    ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton,
+)
+
+# Подписи вариантов сборки (ключи — Bot.services.build_variants)
+VARIANT_LABELS = {
+    "best":     "⭐ Лучшая",
+    "cheaper":  "💸 Дешевле",
+    "balanced": "⚖️ Баланс",
+    "gpu":      "🎮 Упор в GPU",
+    "cpu":      "🧠 Упор в CPU",
+}
+
+# Подписи категорий в меню замены компонента
+COMPONENT_LABELS = {
+    "cpu":         "🖥 Процессор",
+    "gpu":         "🎮 Видеокарта",
+    "motherboard": "🧩 Мат. плата",
+    "ram":         "💾 Оперативка",
+    "ssd":         "⚡ SSD",
+    "psu":         "🔌 Блок питания",
+    "cooler":      "❄️ Охлаждение",
+    "case":        "🧱 Корпус",
+}
+
+_SWAP_BUTTON = InlineKeyboardButton(text="🔧 Заменить компонент", callback_data="swap_menu")
+_BACK_BUTTON = InlineKeyboardButton(text="⬅️ Назад", callback_data="swap_back")
 
 
 def usage_keyboard() -> ReplyKeyboardMarkup:
@@ -10,4 +38,43 @@ def usage_keyboard() -> ReplyKeyboardMarkup:
             [KeyboardButton(text="⬅️ Отмена")],
         ],
         resize_keyboard=True,
-    )
\ No newline at end of file
+    )
+
+
+def variants_keyboard(options: List[Tuple[str, int]], current: str) -> InlineKeyboardMarkup:
+    """
+    Кнопки под сборкой: варианты — options (ключ, итоговая цена), текущий
+    отмечен «•»; при единственном варианте — только «Заменить компонент».
+    """
+    if len(options) < 2:
+        return InlineKeyboardMarkup(inline_keyboard=[[_SWAP_BUTTON]])
+    buttons = [
+        InlineKeyboardButton(
+            text=f"{'• ' if key == current else ''}{VARIANT_LABELS.get(key, key)} · {total // 1000}k",
+            callback_data=f"variant_{key}",
+        )
+        for key, total in options
+    ]
+    # основная сборка — отдельной строкой, альтернативы — по две
+    rows = [buttons[:1]] + [buttons[i:i + 2] for i in range(1, len(buttons), 2)]
+    return InlineKeyboardMarkup(inline_keyboard=rows + [[_SWAP_BUTTON]])
+
+
+def swap_categories_keyboard(categories: List[str]) -> InlineKeyboardMarkup:
+    """Выбор категории для замены (по две в строке)."""
+    buttons = [InlineKeyboardButton(text=COMPONENT_LABELS.get(cat, cat), callback_data=f"swap_cat_{cat}")
+               for cat in categories]
+    rows = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
+    return InlineKeyboardMarkup(inline_keyboard=rows + [[_BACK_BUTTON]])
+
+
+def swap_options_keyboard(options: List[Tuple[str, int]], current_price: int) -> InlineKeyboardMarkup:
+    """Альтернативы для замены: options — (короткое название, цена), разница — к текущей цене."""
+    rows = [
+        [InlineKeyboardButton(
+            text=f"{name[:28]} · {price // 1000}k ({round((price - current_price) / 1000):+d}k)",
+            callback_data=f"swap_pick_{i}",
+        )]
+        for i, (name, price) in enumerate(options)
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=rows + [[_BACK_BUTTON]])
@@ -53,3 +53,13 @@ def get_preferences_summary_keyboard() -> InlineKeyboardMarkup:
         ]
     ])
     return keyboard
+
+
+def get_repeat_build_keyboard(summary: str) -> InlineKeyboardMarkup:
+    """Кнопка «повторить последнюю сборку» (summary — бюджет и назначение)."""
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [
+            InlineKeyboardButton(text=f"🔁 Повторить: {summary}", callback_data="pref_repeat"),
+        ]
+    ])
+    return keyboard
@@ -4,6 +4,8 @@ import json
 import re
 from pathlib import Path
 
+from Bot.utils.keyword_matcher import FLAG_BAD_NAME, name_flags
+
 CATEGORY_MAP = {
     "100_Процессоры": "cpu.json",
     "150_Модули оперативной памяти": "ram.json",
@@ -55,17 +57,12 @@ def _clean_name(name: str) -> str:
 
 def _is_bad_name(name: str) -> bool:
     if not name: return True
-    low = name.lower()
-    # строки вида "Память для серверов смотрите в разделе..."
-    if "смотрите в разделе" in low or "для серверов" in low or "сервер" in low and "серверные" in low:
-        return True
-    if "http" in low or "http:" in low:
-        return True
-    # убрать явно б/у позиции
-    if "б/у" in low or "used" in low:
+    # строки вида "Память для серверов смотрите в разделе...", ссылки, явно б/у позиции
+    # (BAD_NAME_KEYWORDS в общем автомате ключевых слов)
+    if name_flags(name) & FLAG_BAD_NAME:
         return True
     # любой короткий мусор
-    if len(low) < 3:
+    if len(name) < 3:
         return True
     return False
 
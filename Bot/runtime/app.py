@@ -0,0 +1,136 @@
+"""
+Сборка Bot и Dispatcher — общая для одиночного процесса и воркеров супервизора.
+
+Роутеры — модульные объекты, подключить их можно только к одному диспетчеру,
+поэтому create_dispatcher() вызывается один раз на процесс.
+"""
+
+import asyncio
+import logging
+import os
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.client.telegram import TelegramAPIServer
+
+from config import TOKEN
+
+from Bot.config.runtime_config import (
+    CATALOG_REFRESH_INTERVAL, LOOP_WATCHDOG, METRICS_HOST, METRICS_PORT, TELEGRAM_API_BASE,
+)
+from Bot.services.fsm_storage import create_storage
+from Bot.utils.loop_watchdog import WATCHDOG
+from Bot.utils.metrics import span, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramTiming(BaseRequestMiddleware):
+    """Замер каждого запроса к Bot API: этап "telegram.<метод>"."""
+
+    async def __call__(self, make_request, bot, method):
+        with span(f"telegram.{type(method).__name__}"):
+            return await make_request(bot, method)
+
+
+def create_bot() -> Bot:
+    session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_BASE)) if TELEGRAM_API_BASE else AiohttpSession()
+    session.middleware(TelegramTiming())
+    return Bot(token=TOKEN, session=session)
+
+
+def _metrics_port() -> int:
+    # воркеры супервизора: METRICS_PORT + номер воркера (1..N)
+    return METRICS_PORT + int(os.getenv("BOT_WORKER_INDEX", "0"))
+
+
+async def _start_metrics(dispatcher: Dispatcher) -> None:
+    dispatcher["metrics_runner"] = await start_metrics_server(METRICS_HOST, _metrics_port())
+
+
+async def _stop_metrics(dispatcher: Dispatcher) -> None:
+    runner = dispatcher.workflow_data.pop("metrics_runner", None)
+    if runner is not None:
+        await runner.cleanup()
+
+
+async def _start_watchdog() -> None:
+    WATCHDOG.start()
+
+
+async def _stop_watchdog() -> None:
+    # сторож мог быть включён командой /watchdog и без LOOP_WATCHDOG
+    WATCHDOG.stop()
+
+
+async def _refresh_catalog() -> None:
+    from Bot.services.catalog import refresh_catalog
+
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(CATALOG_REFRESH_INTERVAL)
+        try:
+            # обход и stat файлов, загрузка и слушатели — в пуле, не в цикле
+            await loop.run_in_executor(None, refresh_catalog)
+        except Exception as e:
+            logger.error(f"Обновление каталога упало: {e}", exc_info=True)
+
+
+async def _start_catalog(dispatcher: Dispatcher) -> None:
+    from Bot.services.catalog import get_catalog
+
+    # первая загрузка — до приёма обновлений и вне цикла; дальше обработчики только читают ссылку
+    await asyncio.get_running_loop().run_in_executor(None, get_catalog)
+    dispatcher["catalog_refresh"] = asyncio.create_task(_refresh_catalog())
+
+
+async def _stop_catalog(dispatcher: Dispatcher) -> None:
+    task = dispatcher.workflow_data.pop("catalog_refresh", None)
+    if task is not None:
+        task.cancel()
+
+
+async def _start_warmup() -> None:
+    from Bot.services.warmup import WARMER
+
+    WARMER.start()
+    # первый прогрев — под уже загруженный каталог (_start_catalog)
+    WARMER.schedule()
+
+
+async def _stop_warmup() -> None:
+    from Bot.services.warmup import WARMER
+
+    WARMER.stop()
+
+
+def create_dispatcher() -> Dispatcher:
+    from Bot.handlers.start import router as start_router
+    from Bot.handlers.help import router as help_router
+    from Bot.handlers.about import router as about_router
+    from Bot.handlers.build import router as build_router
+    from Bot.handlers.preferences import router as preferences_router
+    from Bot.handlers.variants import router as variants_router
+    from Bot.handlers.admin import router as admin_router
+
+    dp = Dispatcher(storage=create_storage())
+    dp.include_router(admin_router)
+    dp.include_router(start_router)
+    dp.include_router(help_router)
+    dp.include_router(about_router)
+    dp.include_router(build_router)
+    dp.include_router(preferences_router)
+    dp.include_router(variants_router)
+
+    if METRICS_PORT:
+        dp.startup.register(_start_metrics)
+        dp.shutdown.register(_stop_metrics)
+    if LOOP_WATCHDOG:
+        dp.startup.register(_start_watchdog)
+    dp.shutdown.register(_stop_watchdog)
+    dp.startup.register(_start_catalog)
+    dp.shutdown.register(_stop_catalog)
+    dp.startup.register(_start_warmup)
+    dp.shutdown.register(_stop_warmup)
+    return dp
@@ -0,0 +1,41 @@
+"""
+Маршрутизация обновлений Telegram по чату.
+
+Обновления одного чата должны обрабатываться строго по очереди (иначе FSM
+получит «бюджет» раньше «/build»): очереди вебхука заводятся по chat_id,
+а процессы супервизора выбираются по стабильному хэшу chat_id.
+"""
+
+import zlib
+from typing import Any, Dict, Optional
+
+# Поля обновления, в которых лежит объект с chat / from
+_UPDATE_FIELDS = (
+    "message", "edited_message", "callback_query", "channel_post", "edited_channel_post",
+    "business_message", "edited_business_message", "my_chat_member", "chat_member",
+    "chat_join_request", "inline_query", "chosen_inline_result", "shipping_query",
+    "pre_checkout_query", "poll_answer", "message_reaction", "chat_boost",
+)
+
+
+def update_chat_id(update: Dict[str, Any]) -> int:
+    """chat.id обновления (для callback — чат сообщения, иначе from.id); 0 если нет."""
+    for field in _UPDATE_FIELDS:
+        obj: Optional[dict] = update.get(field)
+        if not obj:
+            continue
+        chat = obj.get("chat") or (obj.get("message") or {}).get("chat")
+        if chat and "id" in chat:
+            return chat["id"]
+        user = obj.get("from") or obj.get("user")
+        if user and "id" in user:
+            return user["id"]
+        return 0
+    return 0
+
+
+def shard_of(chat_id: int, shards: int) -> int:
+    """Номер очереди/процесса для чата; одинаков во всех процессах и между рестартами."""
+    if shards <= 1:
+        return 0
+    return zlib.crc32(str(chat_id).encode()) % shards
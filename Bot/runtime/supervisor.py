@@ -0,0 +1,244 @@
+"""
+Супервизор: N процессов-воркеров, обновления распределяются по chat_id.
+
+  • супервизор загружает каталог, пишет снапшот (catalog_snapshot) и следит
+    за обновлением JSON — при изменении снапшот перезаписывается атомарно;
+  • воркер — отдельный процесс со своим event loop, Bot и Dispatcher; каталог
+    читает из снапшота через mmap (цены и колонки общие, не копируются;
+    позиции — своя копия в каждом процессе);
+  • супервизор получает обновления (long polling или вебхук, BOT_MODE) и кладёт
+    каждое в очередь воркера shard_of(chat_id) — все обновления одного чата
+    обрабатывает один процесс по порядку, FSM не перемешивается;
+  • упавший воркер перезапускается с той же очередью;
+  • остановка: приём прекращается, воркеры дорабатывают очереди и выходят.
+"""
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import queue as queue_errors
+import signal
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+
+from Bot.config.runtime_config import (
+    BOT_MODE, BOT_PROCESSES, CATALOG_REFRESH_INTERVAL, CATALOG_SNAPSHOT_PATH, POLLING_TIMEOUT,
+    WEBHOOK_DRAIN_TIMEOUT, WEBHOOK_MAX_BODY, WEBHOOK_PATH, WEBHOOK_QUEUE_SIZE, WEBHOOK_SECRET, WEBHOOK_WORKERS,
+)
+from Bot.runtime.routing import shard_of, update_chat_id
+
+logger = logging.getLogger(__name__)
+
+_ctx = mp.get_context("spawn")
+
+
+# ══════════════════════════════════════════════════════════
+#  ВОРКЕР
+# ══════════════════════════════════════════════════════════
+
+def _worker_main(index: int, updates, snapshot: str) -> None:
+    """Точка входа процесса-воркера."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # останавливает супервизор
+    os.environ["BOT_WORKER_INDEX"] = str(index + 1)
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [%(levelname)s] [w{index}] %(message)s", force=True)
+
+    from Bot.services.catalog import use_snapshot
+    use_snapshot(snapshot)
+    asyncio.run(_worker_loop(updates))
+
+
+async def _worker_loop(updates) -> None:
+    from Bot.runtime.app import create_bot, create_dispatcher
+    from Bot.runtime.webhook import ChatUpdateQueue
+
+    bot = create_bot()
+    dp = create_dispatcher()
+    workflow = {"bot": bot, "dispatcher": dp, **dp.workflow_data}
+    await dp.emit_startup(**workflow)
+
+    # внутри процесса — те же очереди по чатам, что и в режиме вебхука
+    local = ChatUpdateQueue(lambda update: dp.feed_raw_update(bot, update), concurrency=WEBHOOK_WORKERS)
+    local.start()
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            update = await loop.run_in_executor(None, updates.get)
+            if update is None:
+                break
+            await local.put(update)
+    finally:
+        await local.drain()
+        await dp.emit_shutdown(**workflow)
+        await bot.session.close()
+
+
+# ══════════════════════════════════════════════════════════
+#  МАРШРУТИЗАЦИЯ ПО ПРОЦЕССАМ
+# ══════════════════════════════════════════════════════════
+
+class ProcessRouter:
+    """Очереди и процессы воркеров; обновление уходит воркеру shard_of(chat_id)."""
+
+    def __init__(self, workers: int, snapshot: str):
+        self.snapshot = snapshot
+        self.queues = [_ctx.Queue(WEBHOOK_QUEUE_SIZE) for _ in range(workers)]
+        self.processes: List[Optional[mp.Process]] = [None] * workers
+        self.stopping = False
+
+    def _spawn(self, index: int) -> None:
+        proc = _ctx.Process(
+            target=_worker_main, args=(index, self.queues[index], self.snapshot),
+            name=f"bot-worker-{index}", daemon=False,
+        )
+        proc.start()
+        self.processes[index] = proc
+        logger.info(f"Воркер {index} запущен (pid {proc.pid})")
+
+    def start(self) -> None:
+        for i in range(len(self.queues)):
+            self._spawn(i)
+
+    def _queue_for(self, update: Dict[str, Any]):
+        return self.queues[shard_of(update_chat_id(update), len(self.queues))]
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        if self.stopping:
+            return False
+        try:
+            self._queue_for(update).put_nowait(update)
+        except queue_errors.Full:
+            return False
+        return True
+
+    async def put(self, update: Dict[str, Any]) -> None:
+        """Как submit, но при полной очереди ждёт (long polling не должен терять обновления)."""
+        if not self.submit(update) and not self.stopping:
+            await asyncio.get_running_loop().run_in_executor(None, self._queue_for(update).put, update)
+
+    async def watch(self) -> None:
+        """Перезапускает упавшие воркеры."""
+        while not self.stopping:
+            await asyncio.sleep(1)
+            for i, proc in enumerate(self.processes):
+                if proc is not None and not proc.is_alive() and not self.stopping:
+                    logger.error(f"Воркер {i} завершился (код {proc.exitcode}), перезапуск")
+                    self._spawn(i)
+
+    async def stop(self, timeout: float = WEBHOOK_DRAIN_TIMEOUT) -> None:
+        """Воркеры дорабатывают очереди и выходят; зависшие — terminate."""
+        self.stopping = True
+        for q in self.queues:
+            q.put(None)
+        loop = asyncio.get_running_loop()
+        for i, proc in enumerate(self.processes):
+            if proc is None:
+                continue
+            await loop.run_in_executor(None, proc.join, timeout)
+            if proc.is_alive():
+                logger.warning(f"Воркер {i} не завершился за {timeout} c, terminate")
+                proc.terminate()
+
+
+# ══════════════════════════════════════════════════════════
+#  ИСТОЧНИКИ ОБНОВЛЕНИЙ
+# ══════════════════════════════════════════════════════════
+
+async def _poll(bot: Bot, router: ProcessRouter, allowed_updates: List[str]) -> None:
+    offset: Optional[int] = None
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=POLLING_TIMEOUT, allowed_updates=allowed_updates)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"getUpdates: {e}")
+            await asyncio.sleep(1)
+            continue
+        for update in updates:
+            await router.put(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+            offset = update.update_id + 1
+
+
+class ForwardingRequestHandler(SimpleRequestHandler):
+    """Вебхук супервизора: обновление сразу уходит в очередь воркера."""
+
+    def __init__(self, router: ProcessRouter, bot: Bot, **kwargs: Any):
+        super().__init__(dispatcher=None, bot=bot, handle_in_background=True, **kwargs)
+        self.router = router
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if not self.verify_secret(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), self.bot):
+            return web.Response(body="Unauthorized", status=401)
+        try:
+            update = await request.json(loads=self.bot.session.json_loads)
+        except ValueError:
+            return web.Response(status=400, text="Bad Request")
+        if not self.router.submit(update):
+            return web.Response(status=503, text="Busy")
+        return web.json_response({}, dumps=self.bot.session.json_dumps)
+
+
+async def _refresh_catalog(catalog) -> None:
+    from Bot.services.catalog_snapshot import write_snapshot
+
+    def refresh(catalog):
+        if not catalog.is_stale():
+            return catalog
+        catalog = catalog.reloaded()
+        write_snapshot(catalog, CATALOG_SNAPSHOT_PATH)
+        logger.info(f"Снапшот каталога обновлён (v{catalog.version})")
+        return catalog
+
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(CATALOG_REFRESH_INTERVAL)
+        # обход файлов, загрузка и запись снапшота — в пуле, цикл принимает обновления
+        catalog = await loop.run_in_executor(None, refresh, catalog)
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАПУСК
+# ══════════════════════════════════════════════════════════
+
+async def run_supervisor(workers: int = BOT_PROCESSES, stop: Optional[asyncio.Event] = None) -> None:
+    from Bot.runtime.app import create_bot, create_dispatcher
+    from Bot.runtime.webhook import serve, stop_event
+    from Bot.services.catalog import Catalog
+    from Bot.services.catalog_snapshot import write_snapshot
+
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+
+    catalog = Catalog()
+    write_snapshot(catalog, CATALOG_SNAPSHOT_PATH)
+    logger.info(f"Снапшот каталога: {CATALOG_SNAPSHOT_PATH} ({os.path.getsize(CATALOG_SNAPSHOT_PATH)} байт)")
+
+    router = ProcessRouter(workers, CATALOG_SNAPSHOT_PATH)
+    router.start()
+
+    bot = create_bot()
+    # диспетчер супервизора ничего не обрабатывает — нужен только список типов обновлений
+    allowed_updates = create_dispatcher().resolve_used_update_types()
+    if stop is None:
+        stop = stop_event()
+
+    background = [asyncio.create_task(router.watch()), asyncio.create_task(_refresh_catalog(catalog))]
+    try:
+        if BOT_MODE == "webhook":
+            app = web.Application(client_max_size=WEBHOOK_MAX_BODY)
+            ForwardingRequestHandler(router, bot, secret_token=WEBHOOK_SECRET or None).register(app, path=WEBHOOK_PATH)
+            await serve(app, bot, allowed_updates, stop)
+        else:
+            polling = asyncio.create_task(_poll(bot, router, allowed_updates))
+            background.append(polling)
+            await stop.wait()
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        logger.info("Супервизор: остановка воркеров...")
+        await router.stop()
+        await bot.session.close()
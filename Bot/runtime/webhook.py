@@ -0,0 +1,222 @@
+"""
+Режим вебхука: aiohttp-сервер на хелперах aiogram (SimpleRequestHandler).
+
+Запрос Telegram только разбирается и кладётся в очередь — ответ 200 уходит
+сразу. У каждого чата своя очередь: обновления одного чата идут строго по
+порядку, разные чаты — параллельно (не больше WEBHOOK_WORKERS одновременно).
+Тело запроса ограничено WEBHOOK_MAX_BODY; больше WEBHOOK_QUEUE_SIZE
+необработанных обновлений — ответ 503 (Telegram повторит доставку).
+
+Остановка (SIGINT/SIGTERM): сервер перестаёт принимать новые обновления
+(503), очереди дорабатываются до WEBHOOK_DRAIN_TIMEOUT секунд, затем
+закрываются сессия бота и хранилище FSM.
+"""
+
+import asyncio
+import logging
+import signal
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from Bot.config.runtime_config import (
+    WEBAPP_HOST, WEBAPP_PORT, WEBHOOK_BASE_URL, WEBHOOK_DRAIN_TIMEOUT, WEBHOOK_MAX_BODY,
+    WEBHOOK_PATH, WEBHOOK_QUEUE_SIZE, WEBHOOK_SECRET, WEBHOOK_WORKERS,
+)
+from Bot.runtime.routing import update_chat_id
+
+logger = logging.getLogger(__name__)
+
+
+# ══════════════════════════════════════════════════════════
+#  ОЧЕРЕДИ ПО ЧАТАМ
+# ══════════════════════════════════════════════════════════
+
+class ChatUpdateQueue:
+    """
+    Очередь на каждый чат: обновления одного chat_id обрабатываются строго
+    по порядку, разные чаты — параллельно (не больше concurrency обработчиков
+    одновременно). Задача чата живёт, пока у него есть обновления, поэтому
+    долгая сборка в одном чате не задерживает остальные.
+    """
+
+    def __init__(
+        self,
+        handle: Callable[[Dict[str, Any]], Awaitable[None]],
+        concurrency: int = WEBHOOK_WORKERS,
+        maxsize: int = WEBHOOK_QUEUE_SIZE,
+    ):
+        self._handle = handle
+        self._maxsize = maxsize
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._chats: Dict[int, Deque[Dict[str, Any]]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._pending = 0
+        self._changed = asyncio.Condition()
+        self.accepting = True
+
+    def start(self) -> None:
+        self.accepting = True
+
+    def pending(self) -> int:
+        return self._pending
+
+    def _enqueue(self, update: Dict[str, Any]) -> None:
+        self._pending += 1
+        chat_id = update_chat_id(update)
+        queue = self._chats.get(chat_id)
+        if queue is not None:
+            queue.append(update)
+            return
+        queue = self._chats[chat_id] = deque([update])
+        task = asyncio.create_task(self._chat_worker(chat_id, queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        """Кладёт обновление в очередь его чата; False — нет места или идёт остановка."""
+        if not self.accepting or self._pending >= self._maxsize:
+            return False
+        self._enqueue(update)
+        return True
+
+    async def put(self, update: Dict[str, Any]) -> None:
+        """Как submit, но при переполнении ждёт места (для источников без ретраев)."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._pending < self._maxsize)
+            self._enqueue(update)
+
+    async def _chat_worker(self, chat_id: int, queue: Deque[Dict[str, Any]]) -> None:
+        try:
+            while queue:
+                update = queue[0]
+                async with self._slots:
+                    try:
+                        await self._handle(update)
+                    except Exception as e:
+                        logger.error(f"Ошибка обработки обновления {update.get('update_id')}: {e}", exc_info=True)
+                queue.popleft()
+                async with self._changed:
+                    self._pending -= 1
+                    self._changed.notify_all()
+        finally:
+            # между проверкой очереди и удалением нет await — новое обновление не потеряется
+            del self._chats[chat_id]
+
+    async def drain(self, timeout: float = WEBHOOK_DRAIN_TIMEOUT) -> None:
+        """Перестаёт принимать обновления и ждёт обработки принятых (не дольше timeout)."""
+        self.accepting = False
+        left = self._pending
+
+        async def idle() -> None:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._pending == 0)
+
+        try:
+            await asyncio.wait_for(idle(), timeout)
+            logger.info(f"Вебхук: очереди обработаны ({left} обновлений)")
+        except asyncio.TimeoutError:
+            logger.warning(f"Вебхук: за {timeout} c не обработано {self._pending} обновлений")
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class QueuedRequestHandler(SimpleRequestHandler):
+    """SimpleRequestHandler, который отдаёт обновления в ChatUpdateQueue."""
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, workers: int = WEBHOOK_WORKERS, **kwargs: Any):
+        super().__init__(dispatcher, bot, handle_in_background=True, **kwargs)
+        self.queue = ChatUpdateQueue(self._feed, concurrency=workers)
+
+    def register(self, app: web.Application, /, path: str, **kwargs: Any) -> None:
+        app.on_startup.append(self._on_startup)
+        super().register(app, path=path, **kwargs)
+
+    async def _on_startup(self, *a: Any, **kw: Any) -> None:
+        self.queue.start()
+
+    async def _feed(self, update: Dict[str, Any]) -> None:
+        # ответ обработчика методом API (webhook reply) отправляется отдельным запросом
+        result = await self.dispatcher.feed_raw_update(bot=self.bot, update=update, **self.data)
+        if isinstance(result, TelegramMethod):
+            await self.dispatcher.silent_call_request(bot=self.bot, result=result)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        # публичная точка входа aiogram: проверка секрета, разбор, постановка в очередь
+        if not self.verify_secret(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), self.bot):
+            return web.Response(body="Unauthorized", status=401)
+        try:
+            update = await request.json(loads=self.bot.session.json_loads)
+        except ValueError:
+            return web.Response(status=400, text="Bad Request")
+        if not self.queue.submit(update):
+            return web.Response(status=503, text="Busy")
+        return web.json_response({}, dumps=self.bot.session.json_dumps)
+
+    async def close(self) -> None:
+        await self.queue.drain()
+        await super().close()
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАПУСК
+# ══════════════════════════════════════════════════════════
+
+def create_app(dp: Dispatcher, bot: Bot, workers: int = WEBHOOK_WORKERS) -> web.Application:
+    """aiohttp-приложение вебхука (без запуска сервера)."""
+    app = web.Application(client_max_size=WEBHOOK_MAX_BODY)
+    # обработчик регистрируется первым: его on_shutdown (дренаж очередей)
+    # выполняется раньше закрытия хранилища FSM в shutdown диспетчера
+    handler = QueuedRequestHandler(dp, bot, workers=workers, secret_token=WEBHOOK_SECRET or None)
+    handler.register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    app["webhook_handler"] = handler
+    return app
+
+
+def stop_event() -> asyncio.Event:
+    """Событие, которое выставляют SIGINT/SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    return stop
+
+
+async def serve(app: web.Application, bot: Bot, allowed_updates: List[str], stop: Optional[asyncio.Event] = None) -> None:
+    """Поднимает сервер, регистрирует вебхук (если задан WEBHOOK_BASE_URL) и ждёт сигнала остановки."""
+    runner = web.AppRunner(app, shutdown_timeout=WEBHOOK_DRAIN_TIMEOUT)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBAPP_HOST, WEBAPP_PORT)
+    await site.start()
+    logger.info(f"Вебхук слушает {WEBAPP_HOST}:{WEBAPP_PORT}{WEBHOOK_PATH}")
+
+    if WEBHOOK_BASE_URL:
+        await bot.set_webhook(
+            f"{WEBHOOK_BASE_URL}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=allowed_updates,
+        )
+        logger.info(f"Вебхук зарегистрирован: {WEBHOOK_BASE_URL}{WEBHOOK_PATH}")
+
+    if stop is None:
+        stop = stop_event()
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Вебхук: остановка, дорабатываю принятые обновления...")
+        await runner.cleanup()
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, stop: Optional[asyncio.Event] = None) -> None:
+    """Режим вебхука в одном процессе."""
+    await serve(create_app(dp, bot), bot, dp.resolve_used_update_types(), stop)
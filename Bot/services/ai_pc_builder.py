@@ -14,18 +14,27 @@ AI PC Builder — 5-шаговый конвейер подбора компон
 import json
 import logging
 import statistics
+from array import array
+from bisect import bisect_left
 from typing import Dict, List, Optional, Tuple
 
+from Bot.services.component import DEDUPE_LEN, item_forms
+from Bot.utils.metrics import traced
+from Bot.utils.profiling import profiled
+from Bot.utils.single_flight import SingleFlight
+from Bot.utils.keyword_matcher import (
+    FLAG_SKIP_CPU, FLAG_SKIP_GPU, FLAG_SKIP_MB,
+    FLAG_AMD, FLAG_INTEL, FLAG_RADEON, FLAG_GEFORCE,
+    FLAG_RAM_SMALL, FLAG_SSD_SMALL,
+    item_flags,
+)
+
 logger = logging.getLogger(__name__)
 
 # ─── Константы ───────────────────────────────────────────────────────────────
 
 CATEGORIES = ["cpu", "motherboard", "ram", "gpu", "ssd", "psu", "coolers", "case"]
 
-SKIP_GPU = {"GT 710", "GT 730", "GT 1030"}
-SKIP_CPU = {"CELERON", "PENTIUM"}
-SKIP_MB  = {"H610", "A320", "A520"}
-
 MAX_REVISION_ROUNDS = 2
 
 DEFAULT_WEIGHTS = {
@@ -52,11 +61,7 @@ def _price(item: dict) -> int:
 
 
 def _name(item: dict) -> str:
-    return item.get("name", "").upper()
-
-
-def _has(text: str, tokens) -> bool:
-    return any(t in text for t in tokens)
+    return item_forms(item).upper
 
 
 def _integrated_gpu() -> dict:
@@ -65,6 +70,24 @@ def _integrated_gpu() -> dict:
 
 # ─── Фильтрация ──────────────────────────────────────────────────────────────
 
+def _brand_mismatch(flags: int, category: str, cpu_brand: str, gpu_brand: str) -> bool:
+    """Позиция другого бренда, чем выбран (CPU — Intel/AMD, GPU — NVIDIA/Radeon)."""
+    if category == "cpu":
+        return bool(cpu_brand == "INTEL" and flags & FLAG_AMD or cpu_brand == "AMD" and flags & FLAG_INTEL)
+    if category == "gpu":
+        return bool(gpu_brand == "NVIDIA" and flags & FLAG_RADEON
+                    or gpu_brand in ("RADEON", "AMD") and flags & FLAG_GEFORCE)
+    return False
+
+
+def _brand_filter(items: List[dict], category: str, preferences: dict) -> List[dict]:
+    """Только бренд из preferences — без остальных правил _hard_filter (цены, SKIP_*, объёмы)."""
+    cpu_brand = (preferences.get("cpu_brand") or "").upper()
+    gpu_brand = (preferences.get("gpu_brand") or "").upper()
+    return [item for item in items if not _brand_mismatch(item_flags(item), category, cpu_brand, gpu_brand)]
+
+
+@traced()
 def _hard_filter(items: List[dict], category: str, preferences: dict) -> List[dict]:
     """Жёсткая фильтрация мусора и несовместимых компонентов."""
     cpu_brand = preferences.get("cpu_brand", "").upper()
@@ -72,38 +95,36 @@ def _hard_filter(items: List[dict], category: str, preferences: dict) -> List[di
 
     result = []
     for item in items:
-        n = _name(item)
         p = _price(item)
 
         if p < 5_000:
             continue
 
+        # SKIP_*/бренды/объёмы — биты из общего автомата ключевых слов
+        flags = item_flags(item)
+
         if category == "cpu":
-            if _has(n, SKIP_CPU):
-                continue
-            if cpu_brand == "INTEL" and "AMD" in n:
+            if flags & FLAG_SKIP_CPU:
                 continue
-            if cpu_brand == "AMD" and _has(n, {"INTEL", "CORE I"}):
+            if _brand_mismatch(flags, category, cpu_brand, gpu_brand):
                 continue
 
         elif category == "gpu":
-            if _has(n, SKIP_GPU):
+            if flags & FLAG_SKIP_GPU:
                 continue
-            if gpu_brand == "NVIDIA" and _has(n, {"RADEON", " RX "}):
-                continue
-            if gpu_brand in ("RADEON", "AMD") and _has(n, {"GTX", "RTX"}):
+            if _brand_mismatch(flags, category, cpu_brand, gpu_brand):
                 continue
 
         elif category == "ram":
-            if _has(n, {"4GB", "8GB", " 4 GB", " 8 GB"}):
+            if flags & FLAG_RAM_SMALL:
                 continue
 
         elif category == "ssd":
-            if _has(n, {"120GB", "128GB", "240GB", "256GB", "480GB"}):
+            if flags & FLAG_SSD_SMALL:
                 continue
 
         elif category == "motherboard":
-            if _has(n, SKIP_MB):
+            if flags & FLAG_SKIP_MB:
                 continue
 
         result.append(item)
@@ -111,66 +132,135 @@ def _hard_filter(items: List[dict], category: str, preferences: dict) -> List[di
     return result
 
 
-def _pick_around_price(items: List[dict], target: int, count: int = 5) -> List[dict]:
-    """Выбирает count компонентов близко к целевой цене."""
+def _filtered(all_parts: dict, category: str, preferences: dict) -> List[dict]:
+    """_hard_filter категории; для Catalog — из кэша его представлений."""
+    view = getattr(all_parts, "view", None)
+    if view is not None:
+        return view(
+            category,
+            cpu_brand=preferences.get("cpu_brand") or "",
+            gpu_brand=preferences.get("gpu_brand") or "",
+        )
+    return _hard_filter(all_parts.get(category, []), category, preferences)
+
+
+def _pick_around_price(
+    items: List[dict], target: int, count: int = 5, exclude: Optional[set] = None
+) -> List[dict]:
+    """
+    Выбирает count разных компонентов, ближайших к целевой цене.
+
+    Ищет ближайшую цену через bisect по отсортированному массиву цен
+    (готовый у CatalogView, иначе строится здесь) и расширяется в обе
+    стороны двумя указателями, пропуская дубли и exclude (ключи NameForms.key
+    — готовые строки у позиций каталога).
+    """
     if not items:
         return []
 
-    sorted_items = sorted(items, key=_price)
-    idx   = min(range(len(sorted_items)), key=lambda i: abs(_price(sorted_items[i]) - target))
-    start = max(0, idx - count // 2)
-    end   = min(len(sorted_items), start + count)
-    start = max(0, end - count)
-
-    seen, result = set(), []
-    for item in sorted_items[start:end]:
-        key = _name(item)[:45]
+    prices = getattr(items, "prices", None)
+    if prices is None:
+        items  = sorted(items, key=_price)
+        prices = array("q", (_price(i) for i in items))
+
+    n      = len(items)
+    hi     = bisect_left(prices, target)
+    lo     = hi - 1
+    seen   = set(exclude) if exclude else set()
+    picked = []
+    # при равном расстоянии до цели берём более дешёвый
+    while len(picked) < count and (lo >= 0 or hi < n):
+        if hi >= n or (lo >= 0 and target - prices[lo] <= prices[hi] - target):
+            idx, lo = lo, lo - 1
+        else:
+            idx, hi = hi, hi + 1
+        key = item_forms(items[idx]).key
         if key not in seen:
             seen.add(key)
-            result.append(item)
+            picked.append(idx)
 
-    return result
+    picked.sort()
+    return [items[i] for i in picked]
 
 
 def _pick_alternatives(
     items: List[dict], exclude_names: List[str], target: int, count: int = 5
 ) -> List[dict]:
     """Выбирает альтернативы, исключая уже показанные."""
-    exclude_set = {n[:45].upper() for n in exclude_names}
-    candidates  = [i for i in items if _name(i)[:45] not in exclude_set]
-    return _pick_around_price(candidates, target, count)
+    exclude_set = {n.upper()[:DEDUPE_LEN] for n in exclude_names}
+    return _pick_around_price(items, target, count, exclude=exclude_set)
 
 
 # ─── Статистика рынка ────────────────────────────────────────────────────────
 
+_EMPTY_MARKET = {"count": 0, "min": 0, "max": 0, "median": 0, "p25": 0, "p75": 0,
+                 "cheap": {}, "mid": {}, "top": {}}
+
+
+@traced()
 def _market_stats(items: List[dict]) -> dict:
     """Считает статистику цен для категории."""
-    prices = [_price(i) for i in items if _price(i) > 0]
+    # цена каждой позиции читается один раз
+    keyed = [_price(i) for i in items]
+    prices = [p for p in keyed if p > 0]
     if not prices:
-        return {"count": 0, "min": 0, "max": 0, "median": 0,
-                "cheap": {}, "mid": {}, "top": {}}
+        return dict(_EMPTY_MARKET)
 
     prices_s = sorted(prices)
 
     def _short(item):
-        return {"name": item["name"][:55], "price": _price(item)}
+        return {"name": item_forms(item).short, "price": _price(item)}
 
-    items_s = sorted(items, key=_price)
+    items_s = [items[i] for i in sorted(range(len(items)), key=keyed.__getitem__)]
     return {
         "count":  len(prices),
         "min":    prices_s[0],
         "max":    prices_s[-1],
         "median": int(statistics.median(prices_s)),
+        "p25":    prices_s[len(prices_s) // 4],
+        "p75":    prices_s[len(prices_s) * 3 // 4],
         "cheap":  _short(items_s[0]),
         "mid":    _short(items_s[len(items_s) // 2]),
         "top":    _short(items_s[-1]),
     }
 
 
+def _market_row(category: str, s: dict) -> str:
+    """Строка «Рынок» промпта шага 1 для одной категории."""
+    if s["count"] == 0:
+        return f"{category}: нет позиций"
+    return (
+        f"{category}({s['count']}шт): "
+        f"{s['min']//1000}k-{s['max']//1000}k₸ медиана={s['median']//1000}k | "
+        f"дешевле={s['cheap'].get('name','')[:40]} {s['cheap'].get('price',0)//1000}k | "
+        f"среднее={s['mid'].get('name','')[:40]} {s['mid'].get('price',0)//1000}k | "
+        f"топ={s['top'].get('name','')[:40]} {s['top'].get('price',0)//1000}k"
+    )
+
+
+def _market(all_parts: dict, category: str, preferences: dict) -> Tuple[dict, str]:
+    """(статистика, строка промпта) категории; для Catalog — из его кэша до reload()."""
+    market = getattr(all_parts, "market", None)
+    if market is not None:
+        return market(
+            category,
+            cpu_brand=preferences.get("cpu_brand") or "",
+            gpu_brand=preferences.get("gpu_brand") or "",
+        )
+    stats = _market_stats(_filtered(all_parts, category, preferences))
+    return stats, _market_row(category, stats)
+
+
 # ─── Промпты ─────────────────────────────────────────────────────────────────
 
+# неизменные части промпта шага 1
+_BUDGET_SCHEMA   = "{" + ",".join(f'"{c}":0' for c in CATEGORIES) + "}"
+_BUDGET_PRIORITY = {"gaming": "GPU 30-40% CPU 18-22%"}
+_BUDGET_PRIORITY_DEFAULT = "CPU 25-30% RAM+SSD 30%"
+
+
 def _prompt_budget_distribution(
-    budget: int, preset: str, market: dict, preferences: dict
+    budget: int, preset: str, market_rows: List[str], preferences: dict
 ) -> str:
     pref = []
     if preferences.get("cpu_brand"):
@@ -181,28 +271,14 @@ def _prompt_budget_distribution(
         pref.append("GPU=не нужна")
     pref_str = f" | {', '.join(pref)}" if pref else ""
 
-    rows = []
-    for cat, s in market.items():
-        if s["count"] == 0:
-            rows.append(f"{cat}: нет позиций")
-            continue
-        rows.append(
-            f"{cat}({s['count']}шт): "
-            f"{s['min']//1000}k-{s['max']//1000}k₸ медиана={s['median']//1000}k | "
-            f"дешевле={s['cheap'].get('name','')[:40]} {s['cheap'].get('price',0)//1000}k | "
-            f"среднее={s['mid'].get('name','')[:40]} {s['mid'].get('price',0)//1000}k | "
-            f"топ={s['top'].get('name','')[:40]} {s['top'].get('price',0)//1000}k"
-        )
-
     no_gpu_note = "\nGPU=0 (встроенная графика)" if preferences.get("need_gpu") is False else ""
-    priority    = "GPU 30-40% CPU 18-22%" if preset == "gaming" else "CPU 25-30% RAM+SSD 30%"
-    schema      = "{" + ",".join(f'"{c}":0' for c in CATEGORIES) + "}"
+    priority    = _BUDGET_PRIORITY.get(preset, _BUDGET_PRIORITY_DEFAULT)
 
     return (
         f"Эксперт по ПК. Распредели бюджет {budget//1000}k ₸ | {preset}{pref_str}\n\n"
-        f"Рынок:\n" + "\n".join(rows) +
+        f"Рынок:\n" + "\n".join(market_rows) +
         f"\n\nПравила: сумма=бюджет±5%. {priority}. Совместимость сокетов обязательна.{no_gpu_note}\n"
-        f"JSON суммы в тенге: {schema}"
+        f"JSON суммы в тенге: {_BUDGET_SCHEMA}"
     )
 
 
@@ -298,21 +374,21 @@ class AIPcBuilder:
     def __init__(self, ai_service):
         self.ai = ai_service
 
+    @traced()
     def _step1_distribute_budget(
         self, budget: int, preset: str, all_parts: dict, preferences: dict
     ) -> Optional[dict]:
         """Шаг 1: ИИ анализирует рынок и распределяет бюджет."""
-        market = {}
+        # строки рынка — готовые фрагменты из кэша каталога (пересчёт только после reload)
+        rows = []
         for cat in CATEGORIES:
-            items = _hard_filter(all_parts.get(cat, []), cat, preferences)
-            market[cat] = _market_stats(items)
-
-        if preferences.get("need_gpu") is False:
-            market["gpu"] = {"count": 0, "min": 0, "max": 0, "median": 0,
-                             "cheap": {}, "mid": {}, "top": {}}
+            if cat == "gpu" and preferences.get("need_gpu") is False:
+                rows.append(_market_row(cat, _EMPTY_MARKET))
+            else:
+                rows.append(_market(all_parts, cat, preferences)[1])
 
-        prompt = _prompt_budget_distribution(budget, preset, market, preferences)
-        raw    = self.ai.get_completion(prompt)
+        prompt = _prompt_budget_distribution(budget, preset, rows, preferences)
+        raw    = self.ai.get_completion(prompt, step="step1")
         if not raw:
             return None
 
@@ -335,6 +411,7 @@ class AIPcBuilder:
             logger.error(f"Шаг 1 — ошибка: {e}")
             return None
 
+    @traced()
     def _step2_select_components(
         self, budget: int, preset: str, all_parts: dict,
         allotment: dict, preferences: dict,
@@ -351,7 +428,7 @@ class AIPcBuilder:
                     options[cat] = [_integrated_gpu()]
                 continue
 
-            items  = _hard_filter(all_parts.get(cat, []), cat, preferences)
+            items  = _filtered(all_parts, cat, preferences)
             target = allotment[cat]
 
             if exclude and cat in exclude:
@@ -363,7 +440,7 @@ class AIPcBuilder:
                 options[cat] = candidates
 
         prompt = _prompt_select_components(budget, preset, allotment, options, preferences)
-        raw    = self.ai.get_completion(prompt)
+        raw    = self.ai.get_completion(prompt, step="step2")
         if not raw:
             return None
 
@@ -391,12 +468,13 @@ class AIPcBuilder:
             logger.error(f"Шаг 2 — ошибка: {e}")
             return None
 
+    @traced()
     def _step3_check_balance(
         self, build: dict, budget: int, preset: str
     ) -> Tuple[bool, List[str], str]:
         """Шаг 3: ИИ оценивает баланс сборки."""
         prompt   = _prompt_check_balance(build, budget, preset)
-        raw      = self.ai.get_completion(prompt)
+        raw      = self.ai.get_completion(prompt, step="step3")
         if not raw:
             return True, [], ""
 
@@ -412,6 +490,7 @@ class AIPcBuilder:
             logger.error(f"Шаг 3 — ошибка: {e}")
             return True, [], ""
 
+    @traced()
     def _step4_revise(
         self, build: dict, budget: int, preset: str,
         all_parts: dict, allotment: dict, preferences: dict,
@@ -423,7 +502,7 @@ class AIPcBuilder:
 
         alternatives = {}
         for cat in weak_cats:
-            items  = _hard_filter(all_parts.get(cat, []), cat, preferences)
+            items  = _filtered(all_parts, cat, preferences)
             target = allotment.get(cat, budget // 8)
             alts   = _pick_alternatives(items, shown_names.get(cat, []), target, count=5)
             if alts:
@@ -434,7 +513,7 @@ class AIPcBuilder:
             return build
 
         prompt = _prompt_revise(build, budget, preset, weak_cats, alternatives)
-        raw    = self.ai.get_completion(prompt)
+        raw    = self.ai.get_completion(prompt, step="step4")
         if not raw:
             return build
 
@@ -453,10 +532,11 @@ class AIPcBuilder:
 
         return build
 
+    @traced()
     def _step5_describe(self, build: dict, budget: int, preset: str) -> str:
         """Шаг 5: ИИ пишет финальное описание для клиента."""
         prompt = _prompt_final_description(build, budget, preset)
-        text   = self.ai.get_completion(prompt, use_json_format=False) or ""
+        text   = self.ai.get_completion(prompt, use_json_format=False, step="step5") or ""
         text   = text.strip().replace("**", "").replace("##", "")
         return text[:600] if text else ""
 
@@ -540,6 +620,8 @@ def get_ai_builder() -> Optional[AIPcBuilder]:
     return None
 
 
+@traced()
+@profiled
 def build_pc_with_ai(
     budget: int,
     preset: str,
@@ -553,7 +635,7 @@ def build_pc_with_ai(
     Args:
         budget      — бюджет в тенге
         preset      — "gaming" | "work" | "universal"
-        all_parts   — результат load_components()
+        all_parts   — результат load_components() или Catalog
         preferences — {"cpu_brand": "AMD", "gpu_brand": "NVIDIA", "need_gpu": bool}
         enable_ai   — использовать ли ИИ
 
@@ -575,4 +657,32 @@ def build_pc_with_ai(
         return std_build(budget, preset, all_parts), False, "Сборка по стандартному алгоритму."
     except Exception as e:
         logger.error(f"Стандартный алгоритм упал: {e}")
-        return {}, False, "Ошибка при сборке ПК."
\ No newline at end of file
+        return {}, False, "Ошибка при сборке ПК."
+
+
+_build_flight = SingleFlight()
+
+
+def _build_key(budget: int, preset: str, all_parts: dict, preferences: Optional[dict], enable_ai: bool) -> tuple:
+    # версия каталога: после перезагрузки прайса одинаковые запросы считаются заново
+    version = getattr(all_parts, "version", id(all_parts))
+    return budget, preset, tuple(sorted((preferences or {}).items())), enable_ai, version
+
+
+async def build_pc_with_ai_async(
+    budget: int,
+    preset: str,
+    all_parts: dict,
+    preferences: Optional[dict] = None,
+    enable_ai: bool = True,
+) -> Tuple[dict, bool, str]:
+    """
+    build_pc_with_ai в пуле потоков (event loop не блокируется) с коалесингом:
+    одинаковые запросы, пришедшие пока такой же считается, получают его результат.
+    Результат общий — не изменять.
+    """
+    key = _build_key(budget, preset, all_parts, preferences, enable_ai)
+    return await _build_flight.run(
+        key, build_pc_with_ai, budget, preset, all_parts,
+        preferences=preferences, enable_ai=enable_ai,
+    )
@@ -6,6 +6,7 @@ import time
 from groq import Groq, APIConnectionError, APITimeoutError, RateLimitError
 from config import GROQ_API
 from Bot.config.ai_config import get_ai_config
+from Bot.utils.ai_log import log_ai_call
 
 logger = logging.getLogger(__name__)
 
@@ -14,20 +15,23 @@ class AIService:
     """Сервис для работы с Groq AI API."""
 
     def __init__(self):
-        config = get_ai_config()
+        config   = get_ai_config()
+        base_url = config.get("base_url") or None
 
-        if not GROQ_API:
+        if not GROQ_API and not base_url:
             logger.warning("GROQ_API ключ не найден — AI сервис отключён")
             self.client = None
             return
 
         try:
-            self.client      = Groq(api_key=GROQ_API)
+            # base_url (AI_BASE_URL) — свой сервер, например локальная заглушка LLM
+            self.client      = Groq(api_key=GROQ_API or "stub", base_url=base_url)
             self.model       = config["model"]
             self.timeout     = config.get("timeout", 30)
             self.max_retries = config.get("max_retries", 3)
             self.temperature = config.get("temperature", 0.3)
-            logger.info(f"AI сервис запущен | модель={self.model} | t={self.temperature} | retries={self.max_retries}")
+            logger.info(f"AI сервис запущен | модель={self.model} | t={self.temperature} | retries={self.max_retries}"
+                        + (f" | {base_url}" if base_url else ""))
         except Exception as e:
             logger.error(f"Ошибка инициализации AI сервиса: {e}")
             self.client = None
@@ -37,11 +41,12 @@ class AIService:
     def is_available(self) -> bool:
         return self.client is not None
 
-    def get_completion(self, prompt: str, use_json_format: bool = True) -> str | None:
+    def get_completion(self, prompt: str, use_json_format: bool = True, step: str | None = None) -> str | None:
         """
         Отправляет запрос к Groq и возвращает текст ответа.
         При временных ошибках делает до max_retries попыток с паузой.
         Если use_json_format=True — извлекает и валидирует JSON из ответа.
+        step — шаг конвейера для журнала вызовов (выборка AI_LOG_SAMPLE).
         Возвращает None если все попытки неудачны.
         """
         if not self.is_available():
@@ -49,17 +54,10 @@ class AIService:
             return None
 
         messages = self._build_messages(prompt, use_json_format)
-        
-        # Используем новую систему логирования
-        from Bot.config.ai_config import log_ai_request, log_ai_response
-        import time
-        
-        start_time = time.time()
-        log_ai_request(prompt, self.model)
-        
         logger.debug(f"→ AI запрос | json={use_json_format} | {len(prompt)} симв.")
 
         for attempt in range(1, self.max_retries + 1):
+            start_time = time.monotonic()
             try:
                 response = self.client.chat.completions.create(
                     model       = self.model,
@@ -68,37 +66,41 @@ class AIService:
                     timeout     = self.timeout,
                 )
                 raw = response.choices[0].message.content or ""
-                duration = time.time() - start_time
-                
-                logger.debug(f"← AI ответ | {len(raw)} симв.")
-                log_ai_response(raw, duration)
+                logger.debug(f"← AI ответ | {len(raw)} симв. | {time.monotonic() - start_time:.2f} с")
 
                 if use_json_format:
                     extracted = self._extract_json(raw)
                     if extracted is None:
+                        self._log(prompt, raw, start_time, "no_json", attempt, use_json_format, step)
                         logger.warning(f"JSON не найден в ответе (попытка {attempt})")
                         if attempt < self.max_retries:
                             time.sleep(1)
                         continue
+                    self._log(prompt, raw, start_time, "ok", attempt, use_json_format, step)
                     return extracted
 
+                self._log(prompt, raw, start_time, "ok", attempt, use_json_format, step)
                 return raw
 
             except RateLimitError:
+                self._log(prompt, None, start_time, "rate_limit", attempt, use_json_format, step)
                 wait = 2 ** attempt  # 2, 4, 8 сек
                 logger.warning(f"Rate limit — жду {wait}с (попытка {attempt}/{self.max_retries})")
                 time.sleep(wait)
 
             except APITimeoutError:
+                self._log(prompt, None, start_time, "timeout", attempt, use_json_format, step)
                 logger.warning(f"Таймаут {self.timeout}с (попытка {attempt}/{self.max_retries})")
                 if attempt < self.max_retries:
                     time.sleep(1)
 
             except APIConnectionError as e:
+                self._log(prompt, None, start_time, "connection", attempt, use_json_format, step)
                 logger.error(f"Ошибка соединения с Groq: {e}")
                 break  # сетевые ошибки — не ретраим
 
             except Exception as e:
+                self._log(prompt, None, start_time, "error", attempt, use_json_format, step)
                 logger.error(f"Неожиданная ошибка Groq (попытка {attempt}): {e}")
                 if attempt < self.max_retries:
                     time.sleep(1)
@@ -108,6 +110,11 @@ class AIService:
 
     # ── Вспомогательные методы ───────────────────────────────────────────────
 
+    def _log(self, prompt: str, raw: str | None, start_time: float, status: str, attempt: int, json_mode: bool,
+             step: str | None) -> None:
+        """Событие в журнал вызовов LLM (очередь, запись в фоне)."""
+        log_ai_call(self.model, prompt, raw, time.monotonic() - start_time, status, attempt, json_mode, step)
+
     def _build_messages(self, prompt: str, use_json_format: bool) -> list:
         messages = []
         if use_json_format:
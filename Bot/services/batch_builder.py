@@ -0,0 +1,254 @@
+"""
+Пакетная сборка — много (budget, preset, preferences) за один вызов.
+
+Для ценовых лендингов нужны сотни сборок (например, каждые 25k от 150k до 2M
+для каждого пресета). Вместо сотен независимых build_pc пакет:
+
+  • группирует запросы по (preset, preferences) и сортирует по бюджету;
+  • один раз готовит для группы списки категорий (бренды — через
+    Catalog.brand_view: только фильтр бренда, как если бы build_pc получил
+    каталог без позиций другого бренда; остальные категории — без фильтров);
+  • передаёт build_pc профиль и ценовые ступени всего каталога (распределение
+    берётся из кэша BudgetAllocator, запасной возврат к квотам профиля при
+    переборе — тот же, что у одиночной сборки);
+  • кэширует pick_* внутри группы по ключу, который не меняется между
+    соседними бюджетами: для RAM/GPU/SSD/PSU/кулера результат зависит только
+    от числа позиций с ценой <= квоты (монотонность по бюджету), поэтому
+    соседние бюджеты переиспользуют уже выбранные компоненты;
+  • раскладывает непрерывные диапазоны бюджетов по процессам.
+
+Результаты совпадают с build_pc(budget, preset, ...) для каждого запроса.
+"""
+
+import logging
+import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Bot.services.ai_pc_builder import _brand_filter
+from Bot.services.budget_allocator import BudgetProfile, PriceTiers, profile_for, tiers_for
+from Bot.services.catalog import CatalogView, get_catalog
+from Bot.services.pc_builder import build_pc
+from Bot.services.pc_builder_pick import _get, estimate_system_power
+
+logger = logging.getLogger(__name__)
+
+BuildRequest = Tuple[int, str, Optional[dict]]
+GroupKey = Tuple[str, Tuple]
+
+# Меньше этого — считаем в текущем процессе: пул дороже самой работы
+MIN_PARALLEL_REQUESTS = 64
+
+
+# ══════════════════════════════════════════════════════════
+#  КЭШ ВЫБОРА ПО ГРУППЕ
+# ══════════════════════════════════════════════════════════
+
+class _MemoColumns:
+    """
+    Прокси над CategoryColumns: pick_* кэшируются по ключу (зависимость, ранг).
+    Ранг — число позиций с ценой <= бюджета; там, где оценка зависит от самого
+    бюджета (CPU, материнка, корпус), ключом служит точный бюджет.
+    """
+
+    def __init__(self, columns, prices, is_sorted: bool):
+        self._cols = columns
+        self._prices = prices
+        self._sorted = is_sorted
+        self._memo: Dict[tuple, Optional[dict]] = {}
+
+    def _rank(self, budget: int):
+        return bisect_right(self._prices, budget) if self._sorted else budget
+
+    def _cached(self, key: tuple, fn, *args):
+        try:
+            return self._memo[key]
+        except KeyError:
+            result = self._memo[key] = fn(*args)
+            return result
+
+    def pick_cpu(self, budget):
+        return self._cached((budget,), self._cols.pick_cpu, budget)
+
+    def pick_motherboard(self, cpu, budget):
+        key = (_get(cpu, "specs", "socket") or None, budget)
+        return self._cached(key, self._cols.pick_motherboard, cpu, budget)
+
+    def pick_ram(self, mobo, budget):
+        key = (_get(mobo, "specs", "ram_type") or None, self._rank(budget))
+        return self._cached(key, self._cols.pick_ram, mobo, budget)
+
+    def pick_gpu(self, budget):
+        return self._cached((self._rank(budget),), self._cols.pick_gpu, budget)
+
+    def pick_ssd(self, budget):
+        return self._cached((self._rank(budget),), self._cols.pick_ssd, budget)
+
+    def pick_psu(self, cpu, gpu, budget):
+        key = (estimate_system_power(cpu, gpu), self._rank(budget))
+        return self._cached(key, self._cols.pick_psu, cpu, gpu, budget)
+
+    def pick_cooler(self, cpu, budget):
+        tdp = _get(cpu, "specs", "tdp", default=65) if cpu else None
+        return self._cached((tdp, self._rank(budget)), self._cols.pick_cooler, cpu, budget)
+
+    def pick_case(self, mobo, budget):
+        ff = (_get(mobo, "specs", "formfactor") or _get(mobo, "specs", "form_factor") or "").lower()
+        return self._cached((ff, budget), self._cols.pick_case, mobo, budget)
+
+
+class _MemoList(list):
+    """Список категории с кэширующими колонками (pick_* видят .columns)."""
+
+    def __init__(self, view: CatalogView):
+        super().__init__(view)
+        self.prices = view.prices
+        cols = view.columns
+        is_sorted = all(a <= b for a, b in zip(view.prices, view.prices[1:]))
+        self.columns = _MemoColumns(cols, view.prices, is_sorted) if cols is not None else None
+
+
+def _group_key(preset: str, preferences: Optional[dict]) -> GroupKey:
+    return preset, tuple(sorted((preferences or {}).items()))
+
+
+def _brand_filtered(all_parts: dict, category: str, preferences: dict) -> list:
+    """_brand_filter категории; для Catalog — из кэша его представлений."""
+    view = getattr(all_parts, "brand_view", None)
+    if view is not None:
+        return view(
+            category,
+            cpu_brand=preferences.get("cpu_brand") or "",
+            gpu_brand=preferences.get("gpu_brand") or "",
+        )
+    return _brand_filter(all_parts.get(category, []), category, preferences)
+
+
+def _group_parts(all_parts: dict, preferences: Optional[dict]) -> Dict[str, list]:
+    """
+    Списки категорий группы: у CPU/GPU отброшен другой бренд, остальные
+    категории — как в каталоге (тот же набор, что видит build_pc).
+    """
+    preferences = preferences or {}
+    parts = {}
+    for cat, items in all_parts.items():
+        if cat == "gpu" and preferences.get("need_gpu") is False:
+            items = []
+        elif (cat == "cpu" and preferences.get("cpu_brand")) or (cat == "gpu" and preferences.get("gpu_brand")):
+            items = _brand_filtered(all_parts, cat, preferences)
+        if not isinstance(items, CatalogView):
+            items = CatalogView(items)
+        parts[cat] = _MemoList(items)
+    return parts
+
+
+# ══════════════════════════════════════════════════════════
+#  ВЫПОЛНЕНИЕ
+# ══════════════════════════════════════════════════════════
+
+class _BatchState:
+    """Каталог одного вызова build_many (или процесса пула) и списки его групп."""
+
+    def __init__(self, all_parts: Optional[dict]):
+        self.parts = all_parts if all_parts is not None else get_catalog()
+        self.groups: Dict[GroupKey, Dict[str, list]] = {}
+        # профиль и ступени — по всему каталогу, а не по спискам группы
+        self.allocation: Tuple[Optional[BudgetProfile], Optional[PriceTiers]] = (
+            profile_for(self.parts), tiers_for(self.parts),
+        )
+
+    def group(self, preset: str, preferences: Optional[dict]) -> Dict[str, list]:
+        key = _group_key(preset, preferences)
+        parts = self.groups.get(key)
+        if parts is None:
+            parts = self.groups[key] = _group_parts(self.parts, preferences)
+        return parts
+
+
+# Состояние процесса пула (initializer); в текущем процессе — свой _BatchState на вызов
+_worker_state: Optional[_BatchState] = None
+
+
+def _init_worker(plain_parts: Optional[dict]) -> None:
+    global _worker_state
+    _worker_state = _BatchState(plain_parts)
+
+
+def _run_chunk(chunk: List[Tuple[int, BuildRequest]], state: Optional[_BatchState] = None) -> List[Tuple[int, dict]]:
+    """Собирает диапазон запросов одной группы (по возрастанию бюджета)."""
+    state = state if state is not None else _worker_state
+    profile, tiers = state.allocation
+    out = []
+    for pos, (budget, preset, preferences) in chunk:
+        parts = state.group(preset, preferences)
+        out.append((pos, build_pc(budget, preset, parts, profile=profile, tiers=tiers)))
+    return out
+
+
+def _chunks(requests: List[BuildRequest], workers: int) -> List[List[Tuple[int, BuildRequest]]]:
+    """Группы по (preset, preferences) → непрерывные диапазоны бюджетов."""
+    groups: Dict[GroupKey, List[Tuple[int, BuildRequest]]] = {}
+    for pos, req in enumerate(requests):
+        groups.setdefault(_group_key(req[1], req[2]), []).append((pos, req))
+
+    chunks = []
+    for items in groups.values():
+        items.sort(key=lambda x: x[1][0])
+        size = max(8, -(-len(items) // workers))
+        chunks.extend(items[i:i + size] for i in range(0, len(items), size))
+    return chunks
+
+
+def build_many(
+    requests: Iterable[BuildRequest],
+    all_parts: Optional[dict] = None,
+    workers: Optional[int] = None,
+) -> List[dict]:
+    """
+    Собирает ПК для каждого (budget, preset, preferences).
+
+    Параметры:
+      requests:  итерируемое (budget, preset, preferences|None)
+      all_parts: каталог; по умолчанию общий get_catalog()
+      workers:   число процессов; по умолчанию os.cpu_count(), 1 — без пула
+
+    Возвращает: список сборок в порядке requests.
+    preferences: cpu_brand / gpu_brand (только фильтр бренда), need_gpu=False — без GPU.
+    """
+    requests = [(int(b), p if p else "universal", prefs) for b, p, prefs in requests]
+    if not requests:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(requests, workers)
+    results: List[Optional[dict]] = [None] * len(requests)
+
+    if workers == 1 or len(requests) < MIN_PARALLEL_REQUESTS:
+        # состояние — локальное: параллельные вызовы из разных потоков не мешают друг другу
+        run = partial(_run_chunk, state=_BatchState(all_parts))
+        for chunk in chunks:
+            for pos, build in run(chunk):
+                results[pos] = build
+        return results
+
+    # Каталог в воркерах: общий get_catalog() или копия переданных списков
+    plain = None if all_parts is None else {k: list(v) for k, v in all_parts.items()}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(plain,)) as pool:
+        for part in pool.map(_run_chunk, chunks):
+            for pos, build in part:
+                results[pos] = build
+
+    logger.info("Пакетная сборка: %s запросов, %s диапазонов, %s процессов",
+                len(requests), len(chunks), workers)
+    return results
+
+
+def budget_sweep(
+    start: int, stop: int, step: int,
+    presets: Iterable[str] = ("gaming", "work", "universal"),
+    preferences: Optional[dict] = None,
+) -> List[BuildRequest]:
+    """Сетка запросов: бюджеты start..stop (включительно) с шагом step × пресеты."""
+    return [(b, p, preferences) for p in presets for b in range(start, stop + 1, step)]
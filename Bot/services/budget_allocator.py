@@ -1,110 +1,369 @@
 """
-Бюджетный планировщик v3.
+Бюджетный планировщик v4.
 Гарантия: sum(квот) == total_budget.
-Динамические веса в зависимости от размера бюджета.
+
+Веса категорий задаёт профиль (Bot/data/budget_profiles.json): по каждому
+пресету — узлы «бюджет → веса», между узлами веса интерполируются линейно,
+за крайними узлами постоянны. Ступень задаётся парой соседних узлов
+(600000/600001). Там же минимумы категорий и категория, получающая остаток.
+
+Распределение — детерминированная функция (бюджет, пресет, профиль), поэтому
+оно мемоизируется: повторные BudgetAllocator для того же бюджета (повторные
+сборки, пакетные прогоны) берут готовый результат.
+
+BUDGET_ALLOCATOR=learned — узлы профиля выводятся из цен текущего каталога
+(learn_profile): на бюджетах «все категории по min / p25 / медиане / p75 / max»
+веса смешивают веса профиля с долями категорий в таком наборе.
+
+BUDGET_ALLOCATOR=catalog — квоты CPU, GPU и SSD ставятся на реальные цены:
+по категории строится Pareto-фронт (самые дешёвые позиции каждого следующего
+уровня качества, как его видят pick_*), квота опускается на цену фронта, а
+освободившийся остаток раздаётся ступенями фронта вверх. Квоты зависимых
+категорий (плата, ОЗУ, БП, кулер, корпус) остаются как в профиле, поэтому
+первая сборка build_pc не чаще прежнего требует срезания квот
+(счётчик build_pc.shave_iterations), а остаток бюджета меньше.
 """
 
-from typing import Dict
-
-# ── Профили весов ──
-PROFILES: Dict[str, Dict[str, float]] = {
-    "gaming": {
-        "cpu": 0.20, "gpu": 0.35, "motherboard": 0.10,
-        "ram": 0.08, "ssd": 0.08, "psu": 0.06,
-        "coolers": 0.05, "case": 0.08,
-    },
-    "work": {
-        "cpu": 0.28, "gpu": 0.10, "motherboard": 0.14,
-        "ram": 0.16, "ssd": 0.12, "psu": 0.07,
-        "coolers": 0.05, "case": 0.08,
-    },
-    "universal": {
-        "cpu": 0.22, "gpu": 0.28, "motherboard": 0.12,
-        "ram": 0.10, "ssd": 0.09, "psu": 0.07,
-        "coolers": 0.05, "case": 0.07,
-    },
-}
+import functools
+import json
+import logging
+import os
+import threading
+import weakref
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
 
-# Минимумы — ниже нельзя
-MIN_ABS: Dict[str, int] = {
-    "coolers": 5000,
-    "psu": 15000,
-    "case": 6000,
-    "ssd": 12000,
-    "ram": 22000,
-}
+from Bot.services.ai_pc_builder import _market
+from Bot.services.pc_builder_pick import _get, _gpu_model_rank
+
+logger = logging.getLogger(__name__)
+
+BUDGET_PROFILES_PATH = os.getenv(
+    "BUDGET_PROFILES_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "budget_profiles.json"),
+)
+# profile — веса из файла профиля; learned — узлы из цен каталога (learn_profile);
+# catalog — квоты ставятся на цены Pareto-фронта каталога (PriceTiers).
+# learned и catalog совместимы: BUDGET_ALLOCATOR=learned,catalog
+BUDGET_ALLOCATOR = os.getenv("BUDGET_ALLOCATOR", "profile").lower()
+_MODES = frozenset(m.strip() for m in BUDGET_ALLOCATOR.split(","))
+# Доля цен каталога в весах режима learned (0 — только профиль, 1 — только каталог)
+BUDGET_LEARN_BLEND = float(os.getenv("BUDGET_LEARN_BLEND", "0.5"))
+ALLOCATION_CACHE_SIZE = int(os.getenv("ALLOCATION_CACHE_SIZE", "4096"))
+
+Knot = Tuple[int, Dict[str, float]]
+
+# Ценовые уровни статистики рынка, по которым строятся узлы режима learned
+_LEARN_TIERS = ("min", "p25", "median", "p75", "max")
+
+
+# ══════════════════════════════════════════════════════════
+#  ПРОФИЛЬ
+# ══════════════════════════════════════════════════════════
+
+class BudgetProfile:
+    """
+    Узлы весов по пресетам, минимумы и категория остатка.
+    Неизменяем после создания; в кэше распределений — ключ по identity.
+    """
+
+    def __init__(
+        self,
+        presets: Dict[str, List[Knot]],
+        minimums: Dict[str, int],
+        bonus: Dict[str, str],
+        default: str = "universal",
+    ):
+        self.presets = {p: sorted(knots, key=lambda k: k[0]) for p, knots in presets.items()}
+        self.minimums = dict(minimums)
+        self.bonus = dict(bonus)
+        self.default = default
+        self._budgets = {p: [b for b, _ in knots] for p, knots in self.presets.items()}
+
+    @classmethod
+    def load(cls, path: str) -> "BudgetProfile":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        presets: Dict[str, List[Knot]] = {}
+        for preset, knots in data["presets"].items():
+            resolved: List[Knot] = []
+            for knot in knots:
+                if "weights" in knot:
+                    weights = {c: float(w) for c, w in knot["weights"].items()}
+                else:
+                    # adjust — поправки к весам предыдущего узла
+                    weights = dict(resolved[-1][1])
+                    for c, delta in knot["adjust"].items():
+                        weights[c] += delta
+                resolved.append((int(knot["budget"]), weights))
+            presets[preset] = resolved
+        return cls(presets, data.get("minimums", {}), data.get("bonus", {}), data.get("default", "universal"))
+
+    def weights(self, preset: str, budget: int) -> Dict[str, float]:
+        """Веса пресета на бюджете (кусочно-линейно между узлами)."""
+        knots = self.presets[preset]
+        i = bisect_right(self._budgets[preset], budget)
+        if i == 0:
+            return dict(knots[0][1])
+        if i == len(knots):
+            return dict(knots[-1][1])
+        (b0, w0), (b1, w1) = knots[i - 1], knots[i]
+        if budget == b0:
+            return dict(w0)
+        t = (budget - b0) / (b1 - b0)
+        return {c: w0[c] + (w1.get(c, 0.0) - w0[c]) * t for c in w0}
+
+
+DEFAULT_PROFILE = BudgetProfile.load(BUDGET_PROFILES_PATH)
+
+
+# ══════════════════════════════════════════════════════════
+#  РАСПРЕДЕЛЕНИЕ
+# ══════════════════════════════════════════════════════════
+
+@functools.lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def _allocation(total: int, preset: str, profile: BudgetProfile) -> Tuple[Tuple[str, int], ...]:
+    weights = profile.weights(preset, total)
+    if total <= 0:
+        return tuple((k, 0) for k in weights)
+
+    # Нормализация
+    w_sum = sum(weights.values())
+    weights = {k: v / w_sum for k, v in weights.items()}
+
+    # Первичный расчёт
+    budgets = {k: int(total * w) for k, w in weights.items()}
+
+    # Минимумы
+    minimums = profile.minimums
+    min_total = sum(minimums.get(k, 0) for k in budgets)
+    if total >= min_total:
+        for cat, minimum in minimums.items():
+            if cat in budgets and budgets[cat] < minimum:
+                budgets[cat] = minimum
+
+    # Балансировка
+    _balance(budgets, total, minimums, profile.bonus.get(preset, "gpu"))
+    return tuple(budgets.items())
+
+
+def _balance(budgets: Dict[str, int], total: int, minimums: Dict[str, int], bonus: str) -> None:
+    current = sum(budgets.values())
+    diff = current - total
+
+    if diff == 0:
+        return
+
+    if diff > 0:
+        ordered = sorted(budgets.keys(), key=lambda k: -budgets[k])
+        remaining = diff
+        for k in ordered:
+            if remaining <= 0:
+                break
+            floor = minimums.get(k, 0)
+            can_cut = max(0, budgets[k] - floor)
+            cut = min(can_cut, remaining)
+            budgets[k] -= cut
+            remaining -= cut
+        if remaining > 0:
+            biggest = max(budgets, key=lambda k: budgets[k])
+            budgets[biggest] -= remaining
+    else:
+        budgets[bonus] += abs(diff)
 
 
 class BudgetAllocator:
+    """
+    Квоты по категориям для бюджета и пресета. С tiers (режим catalog) квоты
+    поставлены на цены Pareto-фронта каталога (_snapped): сумма <= бюджета
+    вместо == бюджета, зато первая сборка почти не выходит за бюджет.
+    """
 
-    def __init__(self, total_budget: int, preset: str = "universal"):
+    def __init__(self, total_budget: int, preset: str = "universal", profile: Optional[BudgetProfile] = None,
+                 tiers: Optional["PriceTiers"] = None):
+        self.profile = profile or DEFAULT_PROFILE
         self.total_budget = max(total_budget, 0)
-        self.preset = preset if preset in PROFILES else "universal"
-        self._budgets = self._allocate()
-
-    def _allocate(self) -> Dict[str, int]:
-        total = self.total_budget
-        if total <= 0:
-            return {k: 0 for k in PROFILES[self.preset]}
-
-        weights = dict(PROFILES[self.preset])
-
-        # ── Динамическая коррекция при больших бюджетах ──
-        # При бюджете > 600k: увеличиваем SSD (чтобы не ставить 512GB Hiksemi на 900k сборку)
-        if total > 600_000:
-            weights["ssd"] += 0.03
-            weights["gpu"] -= 0.015
-            weights["cpu"] -= 0.015
-
-        # При бюджете > 800k: ещё больше на GPU (чтобы влезла 5070+)
-        if total > 800_000 and self.preset == "gaming":
-            weights["gpu"] += 0.03
-            weights["ram"] -= 0.015
-            weights["motherboard"] -= 0.015
-
-        # Нормализация
-        w_sum = sum(weights.values())
-        weights = {k: v / w_sum for k, v in weights.items()}
-
-        # Первичный расчёт
-        budgets = {k: int(total * w) for k, w in weights.items()}
-
-        # Минимумы
-        min_total = sum(MIN_ABS.get(k, 0) for k in budgets)
-        if total >= min_total:
-            for cat, minimum in MIN_ABS.items():
-                if cat in budgets and budgets[cat] < minimum:
-                    budgets[cat] = minimum
-
-        # Балансировка
-        self._balance(budgets, total)
-        return budgets
-
-    def _balance(self, budgets: Dict[str, int], total: int) -> None:
-        current = sum(budgets.values())
-        diff = current - total
-
-        if diff == 0:
-            return
-
-        if diff > 0:
-            ordered = sorted(budgets.keys(), key=lambda k: -budgets[k])
-            remaining = diff
-            for k in ordered:
-                if remaining <= 0:
-                    break
-                floor = MIN_ABS.get(k, 0)
-                can_cut = max(0, budgets[k] - floor)
-                cut = min(can_cut, remaining)
-                budgets[k] -= cut
-                remaining -= cut
-            if remaining > 0:
-                biggest = max(budgets, key=lambda k: budgets[k])
-                budgets[biggest] -= remaining
+        self.preset = preset if preset in self.profile.presets else self.profile.default
+        if tiers is not None and self.total_budget > 0:
+            self._budgets = _snapped(self.total_budget, self.preset, self.profile, tiers)
         else:
-            bonus_map = {"gaming": "gpu", "work": "cpu", "universal": "gpu"}
-            target = bonus_map.get(self.preset, "gpu")
-            budgets[target] += abs(diff)
+            self._budgets = _allocation(self.total_budget, self.preset, self.profile)
 
     def get_budgets(self) -> Dict[str, int]:
-        return dict(self._budgets)
\ No newline at end of file
+        return dict(self._budgets)
+
+
+# ══════════════════════════════════════════════════════════
+#  ПРОФИЛЬ ИЗ КАТАЛОГА
+# ══════════════════════════════════════════════════════════
+
+def learn_profile(all_parts: dict, base: BudgetProfile = DEFAULT_PROFILE,
+                  blend: float = BUDGET_LEARN_BLEND) -> BudgetProfile:
+    """
+    Профиль по ценам каталога. Для каждого уровня из _LEARN_TIERS узел
+    ставится на бюджет B = сумма цен уровня по категориям, а веса в нём —
+    (1 - blend) * веса base на B + blend * доля категории в B.
+    Между узлами — та же интерполяция, минимумы и остаток — из base.
+    """
+    categories = list(next(iter(base.presets.values()))[0][1])
+    stats = {cat: _market(all_parts, cat, {})[0] for cat in categories}
+
+    presets: Dict[str, List[Knot]] = {}
+    for preset in base.presets:
+        knots: List[Knot] = []
+        for tier in _LEARN_TIERS:
+            prices = {cat: stats[cat].get(tier, 0) for cat in categories}
+            budget = sum(prices.values())
+            if budget <= 0 or (knots and budget <= knots[-1][0]):
+                continue
+            base_w = base.weights(preset, budget)
+            w_sum = sum(base_w.values())
+            knots.append((budget, {
+                cat: (1 - blend) * base_w[cat] / w_sum + blend * prices[cat] / budget
+                for cat in categories
+            }))
+        presets[preset] = knots or base.presets[preset]
+    return BudgetProfile(presets, base.minimums, base.bonus, base.default)
+
+
+# ══════════════════════════════════════════════════════════
+#  ЦЕНОВЫЕ СТУПЕНИ КАТАЛОГА
+# ══════════════════════════════════════════════════════════
+
+def _ssd_quality(s) -> tuple:
+    iface = (_get(s, "specs", "interface") or "").lower()
+    return (2 if ("nvme" in iface or "pcie" in iface) else 1, _get(s, "specs", "capacity_gb", default=0))
+
+
+# Качество позиции для Pareto-фронта — признаки из score соответствующих pick_* (без цены).
+# Только независимые категории: плата, ОЗУ, БП, кулер и корпус подбираются под
+# выбранные CPU/GPU (сокет, DDR, TDP, мощность), и цена фронта по всей категории
+# ничего не говорит о цене совместимой позиции — их квоты остаются как в профиле.
+_QUALITY: Dict[str, Callable[[dict], tuple]] = {
+    "cpu": lambda c: (_get(c, "specs", "cores", default=0), _get(c, "specs", "threads", default=0),
+                      _get(c, "specs", "tdp", default=0)),
+    "gpu": lambda g: (_gpu_model_rank(g), _get(g, "specs", "vram_gb", default=0), _get(g, "specs", "gddr", default=0)),
+    "ssd": _ssd_quality,
+}
+
+
+def pareto_prices(items: List[dict], quality: Callable[[dict], tuple]) -> List[int]:
+    """
+    Цены Pareto-фронта категории: позиции, которые лучше всех более дешёвых.
+    Квота между двумя соседними ценами фронта ничего не добавляет к лучшему
+    доступному качеству — она только оставляет остаток или провоцирует перебор.
+    """
+    frontier: List[int] = []
+    best = None
+    for item in sorted(items, key=lambda i: i["price"]):
+        price = item["price"]
+        if price <= 0:
+            continue
+        q = quality(item)
+        if best is None or q > best:
+            best = q
+            if frontier and frontier[-1] == price:
+                continue
+            frontier.append(price)
+    return frontier
+
+
+class PriceTiers:
+    """Цены Pareto-фронта по категориям каталога; в кэше распределений — ключ по identity."""
+
+    def __init__(self, all_parts: dict):
+        self.prices: Dict[str, List[int]] = {
+            cat: pareto_prices(all_parts.get(cat) or [], quality) for cat, quality in _QUALITY.items()
+        }
+
+
+@functools.lru_cache(maxsize=ALLOCATION_CACHE_SIZE)
+def _snapped(total: int, preset: str, profile: BudgetProfile, tiers: PriceTiers) -> Tuple[Tuple[str, int], ...]:
+    """
+    Квоты профиля, поставленные на цены фронта:
+      1. каждая квота опускается до ближайшей цены фронта (не выше квоты);
+      2. если сумма всё же больше бюджета (самая дешёвая позиция дороже квоты) —
+         ступенью ниже спускаются категории, сильнее всех превысившие профиль;
+      3. остаток тратится ступенями вверх: каждый раз — категория, сильнее всех
+         недополучившая относительно профиля, чья следующая ступень влезает.
+    Сумма квот <= total; остаток (меньше любой доступной ступени) не раздаётся.
+    """
+    target = dict(_allocation(total, preset, profile))
+    quotas: Dict[str, int] = {}
+    index: Dict[str, int] = {}
+    for cat, quota in target.items():
+        prices = tiers.prices.get(cat)
+        if not prices:
+            quotas[cat] = quota
+            continue
+        i = max(bisect_right(prices, quota) - 1, 0)
+        index[cat], quotas[cat] = i, prices[i]
+
+    spent = sum(quotas.values())
+    while spent > total:
+        down = [c for c in index if index[c] > 0]
+        if not down:
+            break
+        cat = max(down, key=lambda c: quotas[c] - target[c])
+        index[cat] -= 1
+        price = tiers.prices[cat][index[cat]]
+        spent -= quotas[cat] - price
+        quotas[cat] = price
+
+    while True:
+        up = [c for c in index
+              if index[c] + 1 < len(tiers.prices[c])
+              and tiers.prices[c][index[c] + 1] - quotas[c] <= total - spent]
+        if not up:
+            break
+        cat = max(up, key=lambda c: target[c] - quotas[c])
+        index[cat] += 1
+        price = tiers.prices[cat][index[cat]]
+        spent += price - quotas[cat]
+        quotas[cat] = price
+
+    return tuple(quotas.items())
+
+
+# ══════════════════════════════════════════════════════════
+#  ВЫБОР РЕЖИМА ПО КАТАЛОГУ
+# ══════════════════════════════════════════════════════════
+
+_per_catalog_lock = threading.Lock()
+# вид → (каталог, его версия, значение); пересчёт после reload()
+_per_catalog: Dict[str, Tuple[weakref.ref, int, object]] = {}
+
+
+def _for_catalog(kind: str, all_parts: dict, build: Callable[[dict], object]):
+    version = getattr(all_parts, "version", None)
+    if version is None:
+        # обычный dict без версии — без кэша
+        return build(all_parts)
+    with _per_catalog_lock:
+        entry = _per_catalog.get(kind)
+        if entry is not None and entry[0]() is all_parts and entry[1] == version:
+            return entry[2]
+        value = build(all_parts)
+        _per_catalog[kind] = (weakref.ref(all_parts), version, value)
+        return value
+
+
+def _learn_logged(all_parts: dict) -> BudgetProfile:
+    profile = learn_profile(all_parts)
+    logger.info("Профиль бюджета из каталога v%s: %s", getattr(all_parts, "version", "—"),
+                {p: [b for b, _ in k] for p, k in profile.presets.items()})
+    return profile
+
+
+def profile_for(all_parts: dict) -> BudgetProfile:
+    """Профиль для сборки по all_parts: из файла или (learned) из цен каталога."""
+    if "learned" not in _MODES:
+        return DEFAULT_PROFILE
+    return _for_catalog("profile", all_parts, _learn_logged)
+
+
+def tiers_for(all_parts: dict) -> Optional[PriceTiers]:
+    """Ценовые ступени каталога для режима catalog, иначе None."""
+    if "catalog" not in _MODES:
+        return None
+    return _for_catalog("tiers", all_parts, PriceTiers)
@@ -0,0 +1,340 @@
+"""
+Альтернативные сборки к основной — за один проход.
+
+Пользователи часто просят «подешевле» или «с видеокартой получше», и раньше
+каждый такой вариант означал новый build_pc_with_ai. Теперь вместе с основной
+сборкой (ИИ или build_pc) считаются варианты с другим акцентом:
+
+  • cheaper  — та же сборка на VARIANT_CHEAPER_SHARE бюджета;
+  • balanced — квоты, усреднённые по всем пресетам профиля;
+  • gpu/cpu  — VARIANT_TILT квот остальных категорий переносится в GPU/CPU.
+
+Все варианты — build_pc с готовыми квотами на общих для запроса списках
+категорий (batch_builder._group_parts: бренды — через представления
+каталога, pick_* кэшируются между вариантами), поэтому на все четыре уходит
+2–3 мс. Совпадающие с основной или друг с другом сборки
+отбрасываются. Переключение вариантов в чате — только перерисовка сообщения
+(VariantStore хранит готовые сборки по сообщению).
+
+Готовые результаты (основная сборка + варианты) лежат в ResultCache по тому
+же ключу, что и у коалесинга (бюджет, пресет, предпочтения, версия каталога):
+одинаковый запрос отдаётся без пересчёта, а прогрев (warmup.py) заполняет
+кэш популярными запросами заранее — через тот же SingleFlight, так что живой
+запрос во время прогрева ждёт уже идущий расчёт. Запасная сборка
+стандартным алгоритмом вместо ответа ИИ (сбой LLM) в кэш не попадает.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from Bot.config.storage_config import (
+    RESULT_CACHE_SIZE, RESULT_CACHE_TTL, VARIANTS_CACHE_TTL, VARIANTS_MAX_MESSAGES,
+)
+from Bot.services.ai_pc_builder import _build_key, build_pc_with_ai
+from Bot.services.batch_builder import _group_parts
+from Bot.services.budget_allocator import BudgetAllocator, profile_for, tiers_for
+from Bot.services.pc_builder import _total_price, build_pc
+from Bot.utils.metrics import count, traced
+from Bot.utils.single_flight import SingleFlight
+
+# Доля бюджета варианта «дешевле»
+VARIANT_CHEAPER_SHARE = float(os.getenv("VARIANT_CHEAPER_SHARE", "0.85"))
+# Доля квот остальных категорий, переносимая в GPU / CPU
+VARIANT_TILT = float(os.getenv("VARIANT_TILT", "0.15"))
+
+BEST = "best"
+# Порядок вариантов в клавиатуре; основная сборка — всегда первая
+VARIANTS = ("cheaper", "balanced", "gpu", "cpu")
+
+Build = Dict[str, Optional[Mapping]]
+
+
+# ══════════════════════════════════════════════════════════
+#  КВОТЫ ВАРИАНТОВ
+# ══════════════════════════════════════════════════════════
+
+def _tilted(budgets: Dict[str, int], target: str, tilt: float) -> Dict[str, int]:
+    """Квоты с упором в target: у остальных категорий забирается доля tilt."""
+    out = dict(budgets)
+    moved = 0
+    for cat, quota in budgets.items():
+        if cat != target:
+            cut = int(quota * tilt)
+            out[cat] = quota - cut
+            moved += cut
+    out[target] = out.get(target, 0) + moved
+    return out
+
+
+def _balanced(budget: int, profile, tiers) -> Dict[str, int]:
+    """Среднее квот всех пресетов профиля; остаток округления — GPU."""
+    plans = [BudgetAllocator(budget, p, profile, tiers).get_budgets() for p in profile.presets]
+    out = {cat: sum(plan.get(cat, 0) for plan in plans) // len(plans) for cat in plans[0]}
+    out["gpu"] += budget - sum(out.values())
+    return out
+
+
+def _signature(build: Build) -> Tuple:
+    # сборки ИИ держат кулер в "coolers", build_pc — в "cooler"
+    return tuple(sorted(
+        ("cooler" if cat == "coolers" else cat, item.get("name"))
+        for cat, item in build.items() if isinstance(item, Mapping)
+    ))
+
+
+# ══════════════════════════════════════════════════════════
+#  ВАРИАНТЫ
+# ══════════════════════════════════════════════════════════
+
+@traced()
+def build_variants(
+    budget: int,
+    preset: str,
+    all_parts: dict,
+    preferences: Optional[dict] = None,
+    best: Optional[Build] = None,
+) -> Dict[str, Build]:
+    """
+    Альтернативы к best: {"cheaper" | "balanced" | "gpu" | "cpu": build}.
+    Вариант дороже своего бюджета или совпадающий с best / более ранним
+    вариантом не включается; «дешевле» — только если он действительно дешевле best.
+    """
+    preferences = preferences or {}
+    parts = _group_parts(all_parts, preferences)
+    profile, tiers = profile_for(all_parts), tiers_for(all_parts)
+    base = BudgetAllocator(budget, preset, profile, tiers).get_budgets()
+    cheaper_budget = int(budget * VARIANT_CHEAPER_SHARE)
+
+    plans = {
+        # «дешевле» — обычное распределение, с запасным возвратом build_pc к квотам профиля
+        "cheaper":  (cheaper_budget, None),
+        "balanced": (budget, _balanced(budget, profile, tiers)),
+        "gpu":      (budget, _tilted(base, "gpu", VARIANT_TILT)),
+        "cpu":      (budget, _tilted(base, "cpu", VARIANT_TILT)),
+    }
+    if preferences.get("need_gpu") is False:
+        del plans["gpu"]
+
+    best_total = _total_price(best) if best else budget
+    seen = {_signature(best)} if best else set()
+    variants: Dict[str, Build] = {}
+    for key, (limit, quotas) in plans.items():
+        build = build_pc(limit, preset, parts, budgets=quotas, profile=profile, tiers=tiers)
+        if _total_price(build) > limit:
+            # сдвинутые квоты не уложились и после срезания — готовой альтернативой не показываем
+            count("variants.over_budget")
+            continue
+        signature = _signature(build)
+        if signature in seen or (key == "cheaper" and _total_price(build) >= best_total):
+            continue
+        seen.add(signature)
+        variants[key] = build
+    return variants
+
+
+def build_with_variants(
+    budget: int,
+    preset: str,
+    all_parts: dict,
+    preferences: Optional[dict] = None,
+    enable_ai: bool = True,
+) -> Tuple[Build, bool, str, Dict[str, Build]]:
+    """build_pc_with_ai + альтернативы к её результату: (build, used_ai, explanation, variants)."""
+    build, used_ai, explanation = build_pc_with_ai(
+        budget, preset, all_parts, preferences=preferences, enable_ai=enable_ai,
+    )
+    variants = build_variants(budget, preset, all_parts, preferences, best=build) if build else {}
+    return build, used_ai, explanation, variants
+
+
+# ══════════════════════════════════════════════════════════
+#  КЭШ РЕЗУЛЬТАТОВ
+# ══════════════════════════════════════════════════════════
+
+class ResultCache:
+    """
+    Результаты build_with_variants по ключу запроса: не больше max_size,
+    запись живёт ttl секунд с момента расчёта (ответы ИИ со временем
+    обновляются), смена версии каталога меняет сам ключ.
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE, ttl: int = RESULT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl > 0 and entry[0] < time.time() - self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+results = ResultCache()
+
+_variants_flight = SingleFlight()
+
+
+def in_flight() -> int:
+    """Сколько живых сборок (build_with_variants_async) считается сейчас в процессе."""
+    return len(_variants_flight)
+
+
+def _remember(key: Hashable, result: Tuple, enable_ai: bool) -> bool:
+    build, used_ai = result[0], result[1]
+    # enable_ai без used_ai — запасной build_pc после сбоя ИИ: не держать его часами
+    if not build or (enable_ai and not used_ai):
+        return False
+    results.put(key, result)
+    return True
+
+
+async def warm_build(
+    budget: int,
+    preset: str,
+    all_parts: dict,
+    preferences: Optional[dict] = None,
+    enable_ai: bool = True,
+    executor: Optional[Executor] = None,
+) -> bool:
+    """
+    Считает запрос в кэш результатов, если его там ещё нет (в executor,
+    с коалесингом вместе с живыми запросами). True — посчитан и сохранён сейчас.
+    """
+    key = _build_key(budget, preset, all_parts, preferences, enable_ai)
+    if key in results:
+        return False
+    result = await _variants_flight.run_in(
+        executor, key, build_with_variants, budget, preset, all_parts,
+        preferences=preferences, enable_ai=enable_ai,
+    )
+    return _remember(key, result, enable_ai)
+
+
+async def build_with_variants_async(
+    budget: int,
+    preset: str,
+    all_parts: dict,
+    preferences: Optional[dict] = None,
+    enable_ai: bool = True,
+) -> Tuple[Build, bool, str, Dict[str, Build]]:
+    """
+    build_with_variants из кэша результатов, иначе в пуле потоков с коалесингом
+    одинаковых запросов. Результат общий — не изменять.
+    """
+    key = _build_key(budget, preset, all_parts, preferences, enable_ai)
+    cached = results.get(key)
+    if cached is not None:
+        count("build.cache_hit")
+        return cached
+
+    count("build.cache_miss")
+    result = await _variants_flight.run(
+        key, build_with_variants, budget, preset, all_parts,
+        preferences=preferences, enable_ai=enable_ai,
+    )
+    _remember(key, result, enable_ai)
+    return result
+
+
+# ══════════════════════════════════════════════════════════
+#  ВАРИАНТЫ ПО СООБЩЕНИЯМ
+# ══════════════════════════════════════════════════════════
+
+@dataclass
+class VariantSet:
+    """Сборки одного сообщения: основная (BEST) и альтернативы, показанная сейчас, замены вручную."""
+    budget: int
+    preset: str
+    preferences: dict
+    builds: Dict[str, Build]
+    used_ai: bool = False
+    explanation: str = ""
+    current: str = BEST
+    # отрисованные тексты по ключу: повторный показ варианта — без форматирования
+    texts: Dict[str, str] = field(default_factory=dict)
+    # замены вручную (component_swap): ключ варианта → заменённые категории
+    swapped: Dict[str, List[str]] = field(default_factory=dict)
+    # открытое меню замены: категория, предложенные позиции и каталог, из которого они взяты
+    swap_category: Optional[str] = None
+    swap_choices: List[Mapping] = field(default_factory=list)
+    swap_catalog: Optional[dict] = None
+    touched: float = field(default_factory=time.time)
+
+
+class VariantStore:
+    """
+    Наборы вариантов по (chat_id, message_id): не больше max_size сообщений,
+    запись вытесняется после ttl секунд без обращений. Только в памяти
+    процесса — обновления одного чата всегда приходят в один процесс.
+    """
+
+    def __init__(self, max_size: int = VARIANTS_MAX_MESSAGES, ttl: int = VARIANTS_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[int, int], VariantSet]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        if self.ttl <= 0:
+            return
+        deadline = now - self.ttl
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry.touched >= deadline:
+                break
+            self._entries.popitem(last=False)
+
+    def put(self, chat_id: int, message_id: int, variants: VariantSet) -> None:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            variants.touched = now
+            self._entries[(chat_id, message_id)] = variants
+            self._entries.move_to_end((chat_id, message_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, chat_id: int, message_id: int) -> Optional[VariantSet]:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get((chat_id, message_id))
+            if entry is not None:
+                entry.touched = now
+                self._entries.move_to_end((chat_id, message_id))
+            return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Глобальное хранилище вариантов показанных сборок
+variant_store = VariantStore()
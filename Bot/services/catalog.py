@@ -0,0 +1,290 @@
+"""
+Каталог комплектующих — загруженные компоненты + кэш производных представлений.
+
+Catalog — это тот же dict {category: [items]}, что возвращает load_components(),
+поэтому его можно передавать везде, где ожидается all_parts. Дополнительно он
+хранит отфильтрованные представления (_hard_filter по категории и брендам)
+и статистику рынка по ним (с готовой строкой промпта шага 1) — всё строится
+лениво при первом обращении.
+
+Загруженный каталог не меняется: перезагрузка строит новый экземпляр
+(reloaded()) вне блокировки читателей, а refresh_catalog() / reload_catalog()
+лишь подменяют ссылку на общий каталог под _catalog_lock; get_catalog()
+читает текущую ссылку. Сборки, уже читающие старый экземпляр (пул
+потоков, батчи, прогрев), досчитываются на нём целиком — без пустых или
+смешанных категорий и без сброса представлений посреди расчёта.
+
+После каждой подмены общего каталога вызываются слушатели on_catalog_load
+(например, прогрев кэша популярных сборок — Bot/services/warmup.py).
+"""
+
+import logging
+import os
+import threading
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Bot.services.component_loader import COMPONENTS_DIR, load_components
+from Bot.services.ai_pc_builder import _brand_filter, _hard_filter, _market_row, _market_stats
+from Bot.services.catalog_columns import CategoryColumns, build_columns
+from Bot.utils.metrics import span
+
+logger = logging.getLogger(__name__)
+
+ViewKey = Tuple[str, str, str]
+
+_UNSET = object()
+
+# Вызываются с новым общим каталогом после каждой загрузки (в потоке, который загружал)
+_load_listeners: List[Callable[["Catalog"], None]] = []
+
+
+def on_catalog_load(listener: Callable[["Catalog"], None]) -> None:
+    """Подписывает listener(catalog) на каждую следующую загрузку каталога."""
+    if listener not in _load_listeners:
+        _load_listeners.append(listener)
+
+
+def _normalize_brand(brand: Optional[str]) -> str:
+    return (brand or "").upper()
+
+
+def _normalize_gpu_brand(brand: Optional[str]) -> str:
+    brand = _normalize_brand(brand)
+    # _hard_filter трактует "AMD" и "RADEON" для GPU одинаково
+    return "RADEON" if brand == "AMD" else brand
+
+
+def _view_key(category: str, cpu_brand: str, gpu_brand: str) -> ViewKey:
+    # бренд CPU влияет только на "cpu", бренд GPU — только на "gpu"
+    return (
+        category,
+        _normalize_brand(cpu_brand) if category == "cpu" else "",
+        _normalize_gpu_brand(gpu_brand) if category == "gpu" else "",
+    )
+
+
+def _dir_mtime(path: str) -> float:
+    """Последнее изменение JSON-файлов каталога (0 если каталога нет)."""
+    p = Path(path)
+    if not p.is_dir():
+        return 0.0
+    return max((f.stat().st_mtime for f in p.glob("*.json")), default=0.0)
+
+
+class CatalogView(list):
+    """
+    Позиции категории, отсортированные по цене, + массив цен для bisect.
+    Порядок задаёт load_components() (по возрастанию цены), фильтры его сохраняют.
+    Колонки NumPy для pick_* строятся лениво при первом обращении к .columns.
+    """
+
+    __slots__ = ("prices", "_columns")
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.prices = array("q", (i.get("price", 0) for i in self))
+        self._columns = _UNSET
+
+    @classmethod
+    def shared(cls, items, prices, columns) -> "CatalogView":
+        """Представление поверх готовых цен/колонок (из снапшота в mmap)."""
+        view = cls.__new__(cls)
+        list.__init__(view, items)
+        view.prices = prices
+        view._columns = columns
+        return view
+
+    @property
+    def columns(self) -> Optional[CategoryColumns]:
+        if self._columns is _UNSET:
+            self._columns = build_columns(self)
+        return self._columns
+
+
+class Catalog(dict):
+    """
+    Каталог {category: [items]} с ленивыми кэшированными представлениями.
+    С snapshot= каталог читается из снапшота (catalog_snapshot) вместо JSON.
+    После загрузки не изменяется — новая версия прайса это новый экземпляр.
+    """
+
+    def __init__(self, path: Optional[str] = None, snapshot: Optional[str] = None, version: int = 1):
+        super().__init__()
+        self.path = path or COMPONENTS_DIR
+        self.snapshot = snapshot
+        self.version = version
+        self._mtime = 0.0
+        self._views: Dict[ViewKey, CatalogView] = {}
+        self._brand_views: Dict[ViewKey, CatalogView] = {}
+        self._market: Dict[ViewKey, Tuple[dict, str]] = {}
+        self._lock = threading.RLock()
+        self._load()
+
+    # ── Загрузка ─────────────────────────────────────────────
+
+    def _load(self) -> None:
+        with span("catalog.load"):
+            mtime = self._source_mtime()
+            if self.snapshot:
+                from Bot.services.catalog_snapshot import read_snapshot
+
+                shared = read_snapshot(self.snapshot)
+                parts = {cat: items for cat, (items, _, _) in shared.items()}
+                views = {cat: CatalogView.shared(*entry) for cat, entry in shared.items()}
+            else:
+                parts = load_components(self.path)
+                views = {cat: CatalogView(items) for cat, items in parts.items()}
+            self.update(views)
+            self._mtime = mtime
+        logger.info(
+            "Каталог загружен (v%s): %s",
+            self.version, {k: len(v) for k, v in parts.items()},
+        )
+
+    def reloaded(self) -> "Catalog":
+        """Новый каталог из того же источника со следующей версией; этот не меняется."""
+        return Catalog(self.path, self.snapshot, version=self.version + 1)
+
+    def _source_mtime(self) -> float:
+        if self.snapshot:
+            try:
+                return os.stat(self.snapshot).st_mtime_ns
+            except FileNotFoundError:
+                return 0
+        return _dir_mtime(self.path)
+
+    def is_stale(self) -> bool:
+        return self._source_mtime() != self._mtime
+
+    # ── Представления ────────────────────────────────────────
+
+    def view(self, category: str, cpu_brand: str = "", gpu_brand: str = "") -> CatalogView:
+        """
+        Позиции категории после _hard_filter с учётом брендов.
+        Бренд CPU влияет только на "cpu", бренд GPU — только на "gpu",
+        поэтому ключ кэша не плодит одинаковые представления.
+        Возвращаемый список общий — не изменять.
+        """
+        key = _view_key(category, cpu_brand, gpu_brand)
+        cached = self._views.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            cached = self._views.get(key)
+            if cached is None:
+                prefs = {"cpu_brand": key[1], "gpu_brand": key[2]}
+                cached = CatalogView(_hard_filter(self.get(category, []), category, prefs))
+                self._views[key] = cached
+        return cached
+
+    def brand_view(self, category: str, cpu_brand: str = "", gpu_brand: str = "") -> CatalogView:
+        """
+        Позиции категории только с фильтром бренда (_brand_filter) — для
+        build_pc, который остальные правила _hard_filter не применяет.
+        Возвращаемый список общий — не изменять.
+        """
+        key = _view_key(category, cpu_brand, gpu_brand)
+        cached = self._brand_views.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            cached = self._brand_views.get(key)
+            if cached is None:
+                prefs = {"cpu_brand": key[1], "gpu_brand": key[2]}
+                cached = CatalogView(_brand_filter(self.get(category, []), category, prefs))
+                self._brand_views[key] = cached
+        return cached
+
+    def market(self, category: str, cpu_brand: str = "", gpu_brand: str = "") -> Tuple[dict, str]:
+        """
+        Статистика рынка представления view(...) и её строка для промпта
+        шага 1. Считается один раз на версию каталога; результат общий — не изменять.
+        """
+        key = _view_key(category, cpu_brand, gpu_brand)
+        cached = self._market.get(key)
+        if cached is not None:
+            return cached
+
+        view = self.view(category, cpu_brand, gpu_brand)
+        with self._lock:
+            cached = self._market.get(key)
+            if cached is None:
+                stats = _market_stats(view)
+                cached = self._market[key] = (stats, _market_row(category, stats))
+        return cached
+
+
+# ─── Общий экземпляр ─────────────────────────────────────────────────────────
+
+_catalog: Optional[Catalog] = None
+# _catalog_lock — только подмена ссылки; _reload_lock — по одной загрузке за раз
+# (сама загрузка идёт вне _catalog_lock, читатели её не ждут)
+_catalog_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+# Воркеры супервизора читают каталог из общего снапшота (mmap), а не из JSON
+_snapshot_path: Optional[str] = os.getenv("CATALOG_SNAPSHOT") or None
+
+
+def use_snapshot(path: Optional[str]) -> None:
+    """Переключает общий каталог процесса на снапшот (None — обратно на JSON)."""
+    global _catalog, _snapshot_path
+    with _reload_lock, _catalog_lock:
+        _snapshot_path = path
+        _catalog = None
+
+
+def _notify(catalog: Catalog) -> None:
+    for listener in list(_load_listeners):
+        try:
+            listener(catalog)
+        except Exception as e:
+            logger.error(f"Слушатель загрузки каталога упал: {e}", exc_info=True)
+
+
+def _swap(load: Callable[[Optional[Catalog]], Optional[Catalog]]) -> Catalog:
+    """Строит новый каталог load(текущий) вне _catalog_lock и подменяет ссылку; None — оставить текущий."""
+    global _catalog
+    with _reload_lock:
+        current = _catalog
+        catalog = load(current)
+        if catalog is None or catalog is current:
+            return current
+        with _catalog_lock:
+            _catalog = catalog
+    _notify(catalog)
+    return catalog
+
+
+def get_catalog() -> Catalog:
+    """
+    Текущий общий каталог процесса — только чтение ссылки. Первый вызов
+    загружает каталог; обновление — refresh_catalog() в фоне (runtime/app.py),
+    поэтому из корутин get_catalog() не читает диск.
+    """
+    catalog = _catalog
+    if catalog is not None:
+        return catalog
+    return _swap(lambda current: current or Catalog(snapshot=_snapshot_path))
+
+
+def refresh_catalog() -> Catalog:
+    """
+    Подменяет общий каталог новым, если JSON-файлы (или снапшот) изменились.
+    Обходит и stat-ит все файлы каталога — вызывать вне цикла событий.
+    """
+    def load(current: Optional[Catalog]) -> Optional[Catalog]:
+        if current is None:
+            return Catalog(snapshot=_snapshot_path)
+        return current.reloaded() if current.is_stale() else None
+
+    return _swap(load)
+
+
+def reload_catalog() -> Catalog:
+    """Принудительно перечитывает общий каталог (новый экземпляр вместо текущего)."""
+    return _swap(lambda current: current.reloaded() if current is not None else Catalog(snapshot=_snapshot_path))
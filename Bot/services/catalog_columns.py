@@ -0,0 +1,294 @@
+"""
+Колоночный (NumPy) бэкенд каталога для pick_* функций.
+
+Для категории строятся массивы price / cores / threads / tdp / vram / rank /
+watt / capacity / mhz / socket id / DDR id и т.д.; pick_* из pc_builder_pick
+делегируют сюда, если список позиций — CatalogView с колонками. Фильтры —
+векторные маски, выбор — lexsort/argmin; возвращается исходный dict по индексу.
+
+Порядок выбора повторяет списочную реализацию один в один: при равных ключах
+побеждает позиция, стоящая раньше в списке (как у стабильной sort/min/max).
+
+NumPy опционален: без него (или при CATALOG_COLUMNAR=false) build_columns()
+возвращает None и pick_* работают по спискам.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy приходит вместе с pandas
+    np = None
+
+from Bot.services.pc_builder_pick import (
+    _FF_COMPAT, _FF_RANK, _get, _gpu_model_rank, estimate_system_power,
+)
+from Bot.utils.keyword_matcher import FLAG_WATER, item_flags, psu_cert_rank
+
+COLUMNAR_ENABLED = os.getenv("CATALOG_COLUMNAR", "true").lower() == "true"
+
+COLUMN_NAMES = (
+    "price", "cores", "threads", "tdp", "vram", "gddr", "rank", "watt",
+    "capacity", "mhz", "socket", "ddr", "ddr5", "ff_rank", "iface",
+    "cert", "water", "case_ff", "has_psu", "fans",
+)
+ID_TABLES = ("sockets", "ddrs", "ffs")
+
+
+def columnar_available() -> bool:
+    return np is not None and COLUMNAR_ENABLED
+
+
+# ══════════════════════════════════════════════════════════
+#  ВЫБОР ПО ИНДЕКСАМ
+# ══════════════════════════════════════════════════════════
+
+def _first_min(idx, values) -> int:
+    """Индекс минимума values среди idx (первый при равенстве)."""
+    return int(idx[np.argmin(values[idx])])
+
+
+def _first_max(idx, values) -> int:
+    """Индекс максимума values среди idx (первый при равенстве)."""
+    return int(idx[np.argmax(values[idx])])
+
+
+def _lex_argmax(idx, *keys) -> int:
+    """
+    Индекс лексикографического максимума (keys[0], keys[1], ...) среди idx;
+    при полном равенстве — меньший индекс (как у стабильной sort(reverse=True)).
+    """
+    order = np.lexsort((-idx,) + tuple(k[idx] for k in reversed(keys)))
+    return int(idx[order[-1]])
+
+
+class _Ids:
+    """Интернирование строковых признаков (сокет, DDR, форм-фактор) в int."""
+
+    def __init__(self):
+        self.table: Dict[Optional[str], int] = {None: 0}
+
+    def __call__(self, value: Optional[str]) -> int:
+        if not value:
+            return 0
+        return self.table.setdefault(value, len(self.table))
+
+    def get(self, value: Optional[str]) -> int:
+        return self.table.get(value, -1)
+
+    def values(self) -> List[Optional[str]]:
+        """Значения в порядке id (для снапшота)."""
+        return list(self.table)
+
+    @classmethod
+    def from_values(cls, values: List[Optional[str]]) -> "_Ids":
+        ids = cls()
+        ids.table = {v: i for i, v in enumerate(values)}
+        return ids
+
+
+# ══════════════════════════════════════════════════════════
+#  КОЛОНКИ КАТЕГОРИИ
+# ══════════════════════════════════════════════════════════
+
+class CategoryColumns:
+    """Колонки одной категории + векторные версии pick_*."""
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self.sockets = _Ids()
+        self.ddrs = _Ids()
+        self.ffs = _Ids()
+
+        n = len(items)
+        cols = {name: np.zeros(n, dtype=np.int64) for name in COLUMN_NAMES}
+
+        for i, it in enumerate(items):
+            specs = it.get("specs") or {}
+            cols["price"][i] = it["price"]
+            cols["cores"][i] = specs.get("cores") or 0
+            cols["threads"][i] = specs.get("threads") or 0
+            cols["tdp"][i] = specs.get("tdp") or 0
+            cols["vram"][i] = specs.get("vram_gb") or 0
+            cols["gddr"][i] = specs.get("gddr") or 0
+            cols["rank"][i] = _gpu_model_rank(it)
+            cols["watt"][i] = specs.get("watt") or 0
+            cols["capacity"][i] = specs.get("capacity_gb") or 0
+            cols["mhz"][i] = specs.get("mhz") or 0
+            cols["socket"][i] = self.sockets(specs.get("socket"))
+            # у RAM тип памяти в "ddr", у материнской платы — в "ram_type" (ddr5)
+            cols["ddr"][i] = self.ddrs(specs.get("ddr"))
+            cols["ddr5"][i] = specs.get("ram_type") == "DDR5"
+            mobo_ff = (specs.get("formfactor") or specs.get("form_factor") or "").lower()
+            cols["ff_rank"][i] = _FF_RANK.get(mobo_ff, 0)
+            iface = (specs.get("interface") or "").lower()
+            cols["iface"][i] = 2 if ("nvme" in iface or "pcie" in iface) else 1
+            flags = item_flags(it)
+            cols["cert"][i] = psu_cert_rank(flags)
+            cols["water"][i] = bool(specs.get("water")) or bool(flags & FLAG_WATER)
+            case_ff = (specs.get("form_factor") or specs.get("formfactor") or "").lower()
+            cols["case_ff"][i] = self.ffs(case_ff)
+            cols["has_psu"][i] = bool(specs.get("psu_watts"))
+            cols["fans"][i] = (specs.get("fans_count") or 0) > 0
+
+        for name, arr in cols.items():
+            setattr(self, name, arr)
+        self.index = np.arange(n, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, items: List[Dict], arrays: Dict[str, "np.ndarray"], ids: Dict[str, list]) -> "CategoryColumns":
+        """Колонки из готовых массивов (например, read-only из снапшота в mmap)."""
+        self = cls.__new__(cls)
+        self.items = items
+        for name in ID_TABLES:
+            setattr(self, name, _Ids.from_values(ids[name]))
+        for name in COLUMN_NAMES:
+            setattr(self, name, arrays[name])
+        self.index = np.arange(len(items), dtype=np.int64)
+        return self
+
+    def arrays(self) -> Dict[str, "np.ndarray"]:
+        return {name: getattr(self, name) for name in COLUMN_NAMES}
+
+    def id_tables(self) -> Dict[str, list]:
+        return {name: getattr(self, name).values() for name in ID_TABLES}
+
+    # ── общие хелперы ────────────────────────────────────
+
+    def _item(self, i: int) -> Dict:
+        return self.items[i]
+
+    def _cheapest(self, mask=None) -> Optional[Dict]:
+        idx = self.index if mask is None else np.flatnonzero(mask)
+        if not idx.size:
+            return None
+        return self._item(_first_min(idx, self.price))
+
+    def _usage_score(self, idx, budget: int, center: float):
+        if budget > 0:
+            usage = self.price[idx] / budget
+        else:
+            usage = np.zeros(idx.size)
+        score = np.zeros(len(self.items))
+        score[idx] = -np.abs(center - usage)
+        return score
+
+    # ── pick_* ───────────────────────────────────────────
+
+    def pick_cpu(self, budget: int) -> Optional[Dict]:
+        idx = np.flatnonzero(self.price <= budget)
+        if not idx.size:
+            return self._cheapest()
+        price_score = self._usage_score(idx, budget, 0.9)
+        return self._item(_lex_argmax(idx, self.cores, self.threads, self.tdp, price_score))
+
+    def pick_motherboard(self, cpu: Optional[Dict], budget: int) -> Optional[Dict]:
+        cpu_socket = _get(cpu, "specs", "socket")
+        if cpu_socket:
+            socket_ok = self.socket == self.sockets.get(cpu_socket)
+        else:
+            socket_ok = np.ones(len(self.items), dtype=bool)
+
+        idx = np.flatnonzero(socket_ok & (self.price <= budget))
+        if not idx.size:
+            return self._cheapest(socket_ok) or self._cheapest()
+
+        ddr_rank = np.where(self.ddr5 == 1, 2, 1)
+        price_score = self._usage_score(idx, budget, 0.75)
+        return self._item(_lex_argmax(idx, self.ff_rank, ddr_rank, price_score))
+
+    def pick_ram(self, mobo: Optional[Dict], budget: int) -> Optional[Dict]:
+        mobo_ddr = _get(mobo, "specs", "ram_type")
+        if mobo_ddr:
+            compat = self.ddr == self.ddrs.get(mobo_ddr)
+        else:
+            compat = np.ones(len(self.items), dtype=bool)
+
+        idx = np.flatnonzero(compat & (self.price <= budget))
+        if not idx.size:
+            return self._cheapest(compat) or self._cheapest()
+        return self._item(_lex_argmax(idx, self.capacity, self.mhz, -self.price))
+
+    def pick_gpu(self, budget: int) -> Optional[Dict]:
+        idx = np.flatnonzero(self.price <= budget)
+        if not idx.size:
+            return self._cheapest()
+        return self._item(_lex_argmax(idx, self.rank, self.vram, self.gddr, -self.price))
+
+    def pick_ssd(self, budget: int) -> Optional[Dict]:
+        idx = np.flatnonzero(self.price <= budget)
+        if not idx.size:
+            return self._cheapest()
+        return self._item(_lex_argmax(idx, self.iface, self.capacity, -self.price))
+
+    def pick_psu(self, cpu: Optional[Dict], gpu: Optional[Dict], budget: int) -> Optional[Dict]:
+        required = estimate_system_power(cpu, gpu)
+        enough = self.watt >= required
+
+        idx = np.flatnonzero(enough & (self.price <= budget))
+        if not idx.size:
+            if enough.any():
+                return self._cheapest(enough)
+            return self._item(_first_max(self.index, self.watt))
+
+        best = self.cert[idx].max()
+        top = idx[self.cert[idx] >= best - 1]
+        # min по цене; при равной цене — первый в порядке сортировки (cert, watt) desc
+        cheapest = top[self.price[top] == self.price[top].min()]
+        return self._item(_lex_argmax(cheapest, self.cert, self.watt))
+
+    def pick_cooler(self, cpu: Optional[Dict], budget: int) -> Optional[Dict]:
+        in_budget = self.price <= budget
+        if not cpu:
+            return self._cheapest(in_budget) or self._cheapest()
+
+        cpu_tdp = _get(cpu, "specs", "tdp", default=65)
+        required = int(cpu_tdp * 1.15)
+        water = self.water == 1
+        strong = self.tdp >= required
+
+        # Водянка при TDP > 200
+        if required > 200:
+            picked = self._cheapest(water & strong & in_budget)
+            if picked:
+                return picked
+            idx = np.flatnonzero(water & in_budget)
+            if idx.size:
+                return self._item(_first_max(idx, self.tdp))
+
+        picked = self._cheapest(~water & strong & in_budget)
+        if picked:
+            return picked
+
+        idx = np.flatnonzero(~water & in_budget)
+        if idx.size:
+            return self._item(_first_max(idx, self.tdp))
+
+        return self._cheapest()
+
+    def pick_case(self, mobo: Optional[Dict], budget: int) -> Optional[Dict]:
+        mobo_ff = (_get(mobo, "specs", "formfactor") or _get(mobo, "specs", "form_factor") or "").lower()
+
+        # совместимость считается один раз на каждый встреченный форм-фактор корпуса
+        ff_ok = np.ones(len(self.ffs.table), dtype=bool)
+        if mobo_ff:
+            for ff, ff_id in self.ffs.table.items():
+                if ff:
+                    ff_ok[ff_id] = mobo_ff in _FF_COMPAT.get(ff, set())
+
+        base = (self.price <= budget) & (self.has_psu == 0)
+        idx = np.flatnonzero(base & ff_ok[self.case_ff])
+        if not idx.size:
+            return self._cheapest(base) or self._cheapest()
+
+        target = budget * 0.6
+        closeness = -np.abs(self.price - target)
+        return self._item(_lex_argmax(idx, self.fans, closeness))
+
+
+def build_columns(items: List[Dict]) -> Optional[CategoryColumns]:
+    """Колонки для списка позиций или None, если NumPy недоступен/выключен."""
+    if not columnar_available() or not items:
+        return None
+    return CategoryColumns(items)
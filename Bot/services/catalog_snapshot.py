@@ -0,0 +1,136 @@
+"""
+Снапшот каталога в одном файле для разделения между процессами через mmap.
+
+Супервизор один раз загружает каталог и пишет снапшот; воркеры открывают
+его через mmap. Массивы цен и NumPy-колонки категорий читаются из mmap без
+копирования — страницы файла общие для всех процессов (page cache), а
+JSON-файлы каталога и колонки не разбираются/не строятся в каждом процессе.
+
+Сами позиции (Component) общими не становятся: каждый воркер распаковывает
+из pickle свою копию (объекты Python со счётчиками ссылок в общих страницах
+жить не могут). Снапшот экономит разбор JSON и построение колонок при
+старте воркера, а память под позиции — нет: она растёт с числом процессов.
+
+Формат:
+    MAGIC (8 байт) | длина заголовка (8 байт LE) | заголовок JSON | секции (выровнены по 8)
+Заголовок: {"categories": {cat: {"count", "items", "prices", "columns", "ids"}}},
+где items/prices/колонки — [смещение, длина] от начала области секций;
+items — pickle списка позиций, prices и колонки — int64 в порядке байт машины
+(снапшот живёт рядом с процессами, которые его пишут).
+"""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+MAGIC = b"PCBSNAP1"
+_HEADER = struct.Struct("<8sQ")
+
+# (позиции, массив цен, колонки или None) по категориям
+SnapshotParts = Dict[str, Tuple[list, memoryview, Optional[object]]]
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def write_snapshot(catalog: Dict[str, list], path: str) -> None:
+    """
+    Пишет снапшот каталога {category: CatalogView}. Запись атомарная
+    (временный файл + os.replace): уже открытые mmap продолжают видеть
+    старую версию, новые открытия — новую.
+    """
+    sections: List[bytes] = []
+    offset = 0
+
+    def add(blob: bytes) -> List[int]:
+        nonlocal offset
+        pos = offset
+        padded = blob + b"\0" * (_align(len(blob)) - len(blob))
+        sections.append(padded)
+        offset += len(padded)
+        return [pos, len(blob)]
+
+    categories = {}
+    for cat, view in catalog.items():
+        items = list(view)
+        prices = getattr(view, "prices", None)
+        prices_blob = bytes(prices) if prices is not None else struct.pack(
+            f"={len(items)}q", *(i.get("price", 0) for i in items)
+        )
+        entry = {
+            "count": len(items),
+            "items": add(pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)),
+            "prices": add(prices_blob),
+            "columns": None,
+            "ids": None,
+        }
+        cols = getattr(view, "columns", None)
+        if cols is not None:
+            entry["columns"] = {
+                name: add(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+                for name, arr in cols.arrays().items()
+            }
+            entry["ids"] = cols.id_tables()
+        categories[cat] = entry
+
+    header = json.dumps({"categories": categories}, ensure_ascii=False).encode("utf-8")
+    head = _HEADER.pack(MAGIC, len(header)) + header
+    head += b"\0" * (_align(len(head)) - len(head))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(head)
+            for blob in sections:
+                f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_snapshot(path: str) -> SnapshotParts:
+    """
+    Открывает снапшот через mmap. Позиции распаковываются в память процесса
+    (копия на воркер), цены (memoryview 'q') и колонки (read-only np.ndarray)
+    ссылаются на mmap.
+    """
+    from Bot.services.catalog_columns import CategoryColumns, columnar_available
+
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, header_len = _HEADER.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: не снапшот каталога")
+    header = json.loads(mm[_HEADER.size:_HEADER.size + header_len])
+    base = _align(_HEADER.size + header_len)
+    buf = memoryview(mm)
+
+    parts: SnapshotParts = {}
+    for cat, entry in header["categories"].items():
+        off, size = entry["items"]
+        items = pickle.loads(buf[base + off:base + off + size])
+        off, size = entry["prices"]
+        prices = buf[base + off:base + off + size].cast("q")
+
+        columns = None
+        if entry["columns"] is not None and columnar_available():
+            arrays = {
+                name: np.frombuffer(mm, dtype=np.int64, count=entry["count"], offset=base + c_off)
+                for name, (c_off, _) in entry["columns"].items()
+            }
+            columns = CategoryColumns.from_arrays(items, arrays, entry["ids"])
+        parts[cat] = (items, prices, columns)
+    return parts
@@ -0,0 +1,187 @@
+"""
+Компактные записи компонентов каталога.
+
+Позиция каталога раньше была dict {name, price, category, specs, flags, _raw},
+где _raw держал живым весь исходный словарь прайса. Теперь:
+
+  • Component — объект с __slots__ (name, price, category, specs, flags) и
+    интерфейсом Mapping: item["price"], item.get("specs"), dict(item) и
+    сравнение работают как у словаря, поэтому pick_*, форматтеры и ИИ-конвейер
+    не меняются; проверки isinstance(x, dict) для компонентов заменены на Mapping;
+  • Specs — характеристики: общий для всех позиций с тем же набором ключей
+    «макет» {ключ: индекс} + кортеж значений вместо отдельного dict;
+  • строковые значения характеристик (сокет, DDR, форм-фактор, интерфейс…)
+    интернируются — «AM4» во всём каталоге один объект;
+  • _raw не хранится (нигде не читался);
+  • NameForms — формы названия (lower, upper, ключ дедупликации, короткое
+    имя для промптов), посчитанные один раз на название: одинаковые названия
+    в каталоге делят одну запись, а горячие циклы (дедупликация альтернатив,
+    ранги GPU, статистика рынка) берут готовые строки из item.forms и не
+    создают новых.
+
+Записи неизменяемы по соглашению (как и раньше словари каталога).
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+DEDUPE_LEN = 45   # длина ключа дедупликации (upper) в подборе альтернатив
+SHORT_LEN = 55    # длина названия в статистике рынка для промптов
+
+
+# ══════════════════════════════════════════════════════════
+#  ФОРМЫ НАЗВАНИЙ
+# ══════════════════════════════════════════════════════════
+
+class NameForms:
+    """
+    Формы одного названия. lower считается сразу (им пользуются экстракторы
+    характеристик, флаги и pick_*), upper/key/short — при первом обращении и
+    остаются в записи: на весь каталог это несколько сотен строк, а не
+    по строке на каждый проход цикла.
+    """
+
+    __slots__ = ("name", "lower", "_upper", "_key", "_short")
+
+    def __init__(self, name: str):
+        lower = name.lower()
+        self.name = name
+        self.lower = name if lower == name else lower
+        self._upper = self._key = self._short = None
+
+    @property
+    def upper(self) -> str:
+        if self._upper is None:
+            upper = self.name.upper()
+            self._upper = self.name if upper == self.name else upper
+        return self._upper
+
+    @property
+    def key(self) -> str:
+        """Ключ дедупликации: первые DEDUPE_LEN символов upper."""
+        if self._key is None:
+            upper = self.upper
+            self._key = upper if len(upper) <= DEDUPE_LEN else upper[:DEDUPE_LEN]
+        return self._key
+
+    @property
+    def short(self) -> str:
+        if self._short is None:
+            name = self.name
+            self._short = name if len(name) <= SHORT_LEN else name[:SHORT_LEN]
+        return self._short
+
+    def __repr__(self) -> str:
+        return f"NameForms({self.name!r})"
+
+    def __reduce__(self):
+        return NameForms, (self.name,)
+
+
+def intern_name(name: str, table: Optional[Dict[str, NameForms]] = None) -> NameForms:
+    """
+    Формы названия. table — таблица одной загрузки каталога: одинаковые
+    названия (разные цены одного SKU, дубли прайсов) получают одну запись
+    и одну строку. sys.intern здесь не нужен: названия длинные и почти все
+    уникальны, а глобальная таблица интернирования только раздувается.
+    """
+    if table is None:
+        return NameForms(name)
+    forms = table.get(name)
+    if forms is None:
+        forms = table[name] = NameForms(name)
+    return forms
+
+
+def item_forms(item: Mapping) -> NameForms:
+    """Формы названия позиции: готовые у Component, иначе по item["name"] (сборки ИИ — dict)."""
+    forms = getattr(item, "forms", None)
+    return forms if forms is not None else NameForms(item.get("name") or "")
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАПИСИ
+# ══════════════════════════════════════════════════════════
+
+class Specs(Mapping):
+    __slots__ = ("_layout", "_values")
+
+    # макеты по кортежу ключей — один dict на все позиции с тем же набором характеристик
+    _layouts: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+    def __init__(self, specs: Dict[str, Any]):
+        keys = tuple(specs)
+        layout = Specs._layouts.get(keys)
+        if layout is None:
+            layout = Specs._layouts.setdefault(
+                tuple(sys.intern(k) for k in keys), {sys.intern(k): i for i, k in enumerate(keys)})
+        self._layout = layout
+        self._values = tuple(sys.intern(v) if type(v) is str else v for v in specs.values())
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._layout[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self._layout.get(key)
+        return default if i is None else self._values[i]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._layout
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"Specs({dict(self)!r})"
+
+    def __reduce__(self):
+        return Specs, (dict(self),)
+
+
+_FIELDS = ("name", "price", "category", "specs", "flags")
+_FIELD_SET = frozenset(_FIELDS)
+
+
+class Component(Mapping):
+    # forms — не ключ Mapping: dict(item) и сравнение видят только _FIELDS
+    __slots__ = _FIELDS + ("forms",)
+
+    def __init__(self, name: str, price: int, category: str, specs: Dict[str, Any], flags: int = 0,
+                 forms: Optional[NameForms] = None):
+        self.forms = forms if forms is not None else intern_name(name)
+        self.name = self.forms.name
+        self.price = price
+        self.category = sys.intern(category)
+        self.specs = specs if isinstance(specs, Specs) else Specs(specs)
+        self.flags = flags
+
+    # ── Mapping ──────────────────────────────────────────────
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELD_SET
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Component({self.name!r}, {self.price})"
+
+    def __reduce__(self):
+        return Component, (self.name, self.price, self.category, self.specs, self.flags, self.forms)
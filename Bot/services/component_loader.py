@@ -1,6 +1,6 @@
 # Bot/services/component_loader.py
 # Component loader + lightweight feature extractor for Pulser-like JSONs.
-# Purpose: normalize raw JSON entries into consistent Component dicts.
+# Purpose: normalize raw JSON entries into compact Component records.
 
 import json
 import os
@@ -8,18 +8,17 @@ import re
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from Bot.services.component import Component, NameForms, intern_name
+from Bot.utils.keyword_matcher import (
+    FLAG_TRASH, FLAG_WATER, NAME_MATCHER,
+)
+from Bot.utils.profiling import memory_profiled
+
 COMPONENTS_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "components")
 
 # categories expected (file names without .json)
 CATEGORIES = {"cpu", "gpu", "ram", "motherboard", "psu", "ssd", "hdd", "case", "coolers"}
 
-# keywords that indicate the item is NOT a real component (accessory / mount / bracket / holder)
-TRASH_KEYWORDS = [
-    "holder", "bracket", "mount", "pole", "stand", "frame", "plate",
-    "крепеж", "крепёж", "кронштейн", "держатель", "переходник", "adapter",
-    "holder", "rack", "panel", "Уц.", "серверн", "Cable", "райзер", "уц", "Уц", "cable"
-]
-
 def _safe_int(v: Any) -> int:
     try:
         if v is None: return 0
@@ -39,21 +38,9 @@ def _clean_name(n: Any) -> str:
     s = re.sub(r"\s+", " ", s).strip()
     return s
 
-def _is_trash_name(name: str) -> bool:
-    if not name:
-        return True
-    name_l = name.lower()
-    for kw in TRASH_KEYWORDS:
-        if kw in name_l:
-            return True
-    # small heuristic: if name mentions "so-dimm" — likely laptop RAM (we filter desktop SO-DIMM out)
-    if "so-dimm" in name_l or "so-dimm" in name_l.replace(" ", "-"):
-        return True
-    return False
-
 # ----- Feature extractors -----
-def extract_cpu_specs(name: str) -> Dict[str, Any]:
-    s = name.lower()
+# Each extractor takes the lowercased name (NameForms.lower), computed once per item.
+def extract_cpu_specs(s: str) -> Dict[str, Any]:
     specs = {}
 
     # socket
@@ -81,8 +68,7 @@ def extract_cpu_specs(name: str) -> Dict[str, Any]:
 
     return specs
 
-def extract_mobo_specs(name: str) -> Dict[str, Any]:
-    s = name.lower()
+def extract_mobo_specs(s: str) -> Dict[str, Any]:
     specs = {}
 
     # ---- SOCKET ----
@@ -113,8 +99,7 @@ def extract_mobo_specs(name: str) -> Dict[str, Any]:
 
     return specs
 
-def extract_ram_specs(name: str) -> Dict[str, Any]:
-    s = name.lower()
+def extract_ram_specs(s: str) -> Dict[str, Any]:
     specs = {}
     # ddr
     m = re.search(r"(ddr[345])", s)
@@ -132,8 +117,7 @@ def extract_ram_specs(name: str) -> Dict[str, Any]:
     if m4: specs["mhz"] = int(m4.group(1))
     return specs
 
-def extract_gpu_specs(name: str) -> Dict[str, Any]:
-    s = name.lower()
+def extract_gpu_specs(s: str) -> Dict[str, Any]:
     specs = {}
 
     # VRAM
@@ -153,15 +137,13 @@ def extract_gpu_specs(name: str) -> Dict[str, Any]:
 
     return specs
 
-def extract_psu_specs(name: str) -> Dict[str, Any]:
-    s = name.lower()
+def extract_psu_specs(s: str) -> Dict[str, Any]:
     specs = {}
     m = re.search(r"(\d{3,4})\s*w", s)
     if m: specs["watt"] = int(m.group(1))
     return specs
 
-def extract_ssd_specs(name: str) -> Dict[str, Any]:
-    s = name.lower()
+def extract_ssd_specs(s: str) -> Dict[str, Any]:
     specs = {}
     m = re.search(r"(\d{2,4})\s*gb", s)
     if m:
@@ -172,17 +154,12 @@ def extract_ssd_specs(name: str) -> Dict[str, Any]:
         specs["interface"] = "SATA"
     return specs
 
-def extract_cooler_specs(name: str) -> Dict[str, Any]:
-    # Detect if cooler is water cooling
-    water_keywords = [
-        "aio", "water", "liquid", "lss", "hydro",
-        "водян", "жидк", "сво"
-    ]
-    lower_name = name.lower()
-    is_water = any(k in lower_name for k in water_keywords)
+def extract_cooler_specs(s: str) -> Dict[str, Any]:
+    # Detect if cooler is water cooling (WATER_KEYWORDS via the keyword automaton)
+    is_water = bool(NAME_MATCHER.scan(s) & FLAG_WATER)
 
     # Extract TDP if present
-    tdp_match = re.search(r"(\d+)\s*W", name, re.IGNORECASE)
+    tdp_match = re.search(r"(\d+)\s*w", s)
     tdp = int(tdp_match.group(1)) if tdp_match else None
 
     return {
@@ -190,8 +167,7 @@ def extract_cooler_specs(name: str) -> Dict[str, Any]:
         "water": is_water
     }
 
-def extract_case_specs(name: str) -> Dict[str, Any]:
-    s = name.lower()
+def extract_case_specs(s: str) -> Dict[str, Any]:
     specs: Dict[str, Any] = {}
 
     # --- 1. Form-factor (ATX, mATX, ITX) ---
@@ -257,23 +233,30 @@ def extract_case_specs(name: str) -> Dict[str, Any]:
 
 
 # ----- Normalizer for a raw item -----
-def normalize_raw_item(raw: Dict[str, Any], category: str) -> Optional[Dict[str, Any]]:
+def normalize_raw_item(
+    raw: Dict[str, Any], category: str, names: Optional[Dict[str, NameForms]] = None
+) -> Optional[Component]:
     """
-    Returns normalized component dict or None if invalid/trash.
-    Normalized format:
+    Returns normalized Component (read-only Mapping, see Bot.services.component)
+    or None if invalid/trash. Keys:
       {
         "name": str,
         "price": int,
         "category": category,
         "specs": {...},
-        "_raw": raw
+        "flags": int,   # keyword flags (Bot.utils.keyword_matcher), computed once here
       }
+    The raw price-list entry is not kept. names — name table of the current
+    load (see intern_name): equal names share one NameForms record.
     """
     name = _clean_name(raw.get("name") or raw.get("title") or raw.get("Наименование") or "")
     if not name:
         return None
+    # name forms (lower/upper/dedupe key/short) are computed once per name
+    forms = intern_name(name, names)
     # drop trash by name heuristics
-    if _is_trash_name(name):
+    flags = NAME_MATCHER.scan(forms.lower)
+    if flags & FLAG_TRASH:
         return None
 
     # price pick priority: price -> price_reseller -> price_wholesale -> ...
@@ -305,22 +288,17 @@ def normalize_raw_item(raw: Dict[str, Any], category: str) -> Optional[Dict[str,
         "coolers": extract_cooler_specs
     }
     extractor = extractor_map.get(category, lambda _: {})
-    specs = extractor(name)
+    specs = extractor(forms.lower)
 
-    normalized = {
-        "name": name,
-        "price": int(price),
-        "category": category,
-        "specs": specs,
-        "_raw": raw
-    }
-    return normalized
+    return Component(name, int(price), category, specs, flags, forms)
 
 # ----- Main loader function -----
+@memory_profiled
 def load_components(path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
     if path is None:
         path = COMPONENTS_DIR
     out: Dict[str, List[Dict[str, Any]]] = {c: [] for c in CATEGORIES}
+    names: Dict[str, NameForms] = {}
     p = Path(path)
     if not p.exists() or not p.is_dir():
         raise FileNotFoundError(f"components dir not found: {path}")
@@ -338,13 +316,13 @@ def load_components(path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]
         # raw can be list or dict
         iterable = raw if isinstance(raw, list) else (list(raw.values()) if isinstance(raw, dict) else [])
         for item in iterable:
-            norm = normalize_raw_item(item, key)
+            norm = normalize_raw_item(item, key, names)
             if norm:
                 out[key].append(norm)
 
     # sort each category by price ascending
     for k in out:
-        out[k] = sorted(out[k], key=lambda x: x["price"])
+        out[k] = sorted(out[k], key=lambda x: x.price)
     return out
 
 # -----------------------------
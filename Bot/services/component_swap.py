@@ -0,0 +1,178 @@
+"""
+Замена одного компонента в показанной сборке — без ИИ и без пересборки.
+
+  • swap_options   — ближайшие по цене к текущей позиции альтернативы
+                     (представления каталога с учётом брендов, bisect по
+                     готовому массиву цен — _pick_around_price), только
+                     совместимые с остальной сборкой;
+  • swap_component — ставит выбранную позицию и перепроверяет лишь зависимые
+                     категории (как шаг 4 build_pc: GPU → БП; CPU → плата,
+                     ОЗУ, кулер, БП; плата → ОЗУ, корпус). Несовместимая
+                     позиция подбирается заново pick_* с квотой = её цене.
+
+Позиции сборок ИИ — словари без характеристик; перед заменой они
+сопоставляются с каталогом по названию и цене (resolve_build); неоднозначные
+остаются словарями (зависимую категорию с таким элементом swap_component
+подбирает заново и сообщает в списке изменённых).
+"""
+
+import os
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from Bot.services.ai_pc_builder import _filtered, _pick_around_price
+from Bot.services.component import item_forms
+from Bot.services.pc_builder_pick import (
+    _FF_COMPAT, _get, estimate_system_power,
+    pick_motherboard, pick_ram, pick_psu, pick_cooler, pick_case,
+)
+from Bot.utils.metrics import traced
+
+# Сколько альтернатив показывать в меню замены
+SWAP_OPTIONS = int(os.getenv("SWAP_OPTIONS", "6"))
+
+# Что перепроверяется после замены; порядок важен — плата раньше ОЗУ и корпуса
+DEPENDENTS: Dict[str, Tuple[str, ...]] = {
+    "cpu":         ("motherboard", "ram", "cooler", "psu", "case"),
+    "gpu":         ("psu",),
+    "motherboard": ("ram", "case"),
+}
+
+# Категории, доступные для замены (ключи сборки build_pc)
+SWAPPABLE = ("cpu", "gpu", "motherboard", "ram", "ssd", "psu", "cooler", "case")
+
+Build = Dict[str, Optional[Mapping]]
+
+
+def _catalog_category(category: str) -> str:
+    return "coolers" if category == "cooler" else category
+
+
+def _build_key(build: Build, category: str) -> str:
+    # сборки ИИ держат кулер в "coolers", build_pc — в "cooler"
+    if category == "cooler" and "cooler" not in build and "coolers" in build:
+        return "coolers"
+    return category
+
+
+def _part(build: Build, category: str) -> Optional[Mapping]:
+    return build.get(_build_key(build, category))
+
+
+# ══════════════════════════════════════════════════════════
+#  СОВМЕСТИМОСТЬ
+# ══════════════════════════════════════════════════════════
+
+def _form_factor(item: Optional[Mapping]) -> str:
+    return (_get(item, "specs", "formfactor") or _get(item, "specs", "form_factor") or "").lower()
+
+
+def _compatible(category: str, item: Mapping, build: Build) -> bool:
+    """
+    Совместима ли позиция с остальной сборкой — те же правила, что у pick_*.
+    Неизвестная характеристика (нет в названии) совместимости не нарушает.
+    """
+    if category == "motherboard":
+        socket, cpu_socket = _get(item, "specs", "socket"), _get(_part(build, "cpu"), "specs", "socket")
+        return not socket or not cpu_socket or socket == cpu_socket
+    if category == "ram":
+        ddr, mobo_ddr = _get(item, "specs", "ddr"), _get(_part(build, "motherboard"), "specs", "ram_type")
+        return not ddr or not mobo_ddr or ddr == mobo_ddr
+    if category == "psu":
+        required = estimate_system_power(_part(build, "cpu"), _part(build, "gpu"))
+        return _get(item, "specs", "watt", default=0) >= required
+    if category == "cooler":
+        tdp = _get(item, "specs", "tdp", default=0)
+        return not tdp or tdp >= int(_get(_part(build, "cpu"), "specs", "tdp", default=65) * 1.15)
+    if category == "case":
+        ff, mobo_ff = _form_factor(item), _form_factor(_part(build, "motherboard"))
+        return not ff or not mobo_ff or mobo_ff in _FF_COMPAT.get(ff, set())
+    return True
+
+
+def _repick(all_parts: dict, category: str, build: Build, quota: int) -> Optional[Mapping]:
+    cpu, gpu, mobo = _part(build, "cpu"), _part(build, "gpu"), _part(build, "motherboard")
+    items = all_parts.get(_catalog_category(category)) or []
+    if category == "motherboard":
+        return pick_motherboard(items, cpu, quota)
+    if category == "ram":
+        return pick_ram(items, mobo, quota)
+    if category == "psu":
+        return pick_psu(items, cpu, gpu, quota)
+    if category == "cooler":
+        return pick_cooler(items, cpu, quota)
+    if category == "case":
+        return pick_case(items, mobo, quota)
+    return None
+
+
+# ══════════════════════════════════════════════════════════
+#  СБОРКА ИИ → ПОЗИЦИИ КАТАЛОГА
+# ══════════════════════════════════════════════════════════
+
+def _resolve(all_parts: dict, category: str, item: Optional[Mapping]) -> Optional[Mapping]:
+    """
+    Позиция каталога для элемента сборки ИИ: ключ названия совпадает, полное
+    название начинается с названия ИИ (модель видит name[:50]) и цена равна.
+    Ключ короче названия и у соседних SKU одинаковый, поэтому неоднозначное
+    совпадение не разрешается — элемент остаётся как есть.
+    """
+    if item is None or _get(item, "specs") is not None:
+        return item
+    forms = item_forms(item)
+    price = item.get("price")
+    matches = [
+        candidate for candidate in all_parts.get(_catalog_category(category)) or []
+        if item_forms(candidate).key == forms.key
+        and item_forms(candidate).upper.startswith(forms.upper)
+        and candidate["price"] == price
+    ]
+    return matches[0] if len(matches) == 1 else item
+
+
+def resolve_build(all_parts: dict, build: Build) -> Build:
+    """Копия сборки, где элементы-словари (сборки ИИ) заменены позициями каталога."""
+    return {cat: _resolve(all_parts, "cooler" if cat == "coolers" else cat, item) for cat, item in build.items()}
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАМЕНА
+# ══════════════════════════════════════════════════════════
+
+@traced()
+def swap_options(
+    all_parts: dict, build: Build, category: str,
+    preferences: Optional[dict] = None, count: int = SWAP_OPTIONS,
+) -> List[Mapping]:
+    """Ближайшие по цене к текущей позиции совместимые альтернативы (без неё самой)."""
+    current = _part(build, category)
+    items = _filtered(all_parts, _catalog_category(category), preferences or {})
+    if category not in ("cpu", "gpu", "ssd"):
+        # зависимые категории — только совместимые с остальной сборкой
+        items = [i for i in items if _compatible(category, i, build)]
+    exclude = {item_forms(current).key} if current else None
+    target = current["price"] if current else 0
+    return _pick_around_price(items, target, count, exclude=exclude)
+
+
+@traced()
+def swap_component(
+    all_parts: dict, build: Build, category: str, item: Mapping,
+) -> Tuple[Build, List[str]]:
+    """
+    Сборка с item вместо текущей позиции category и список зависимых категорий,
+    которые пришлось заменить. Исходная сборка не изменяется.
+    """
+    build = resolve_build(all_parts, build)
+    build[_build_key(build, category)] = item
+
+    changed = []
+    for dep in DEPENDENTS.get(category, ()):
+        current = _part(build, dep)
+        if current is not None and _get(current, "specs") is not None and _compatible(dep, current, build):
+            continue
+        picked = _repick(all_parts, dep, build, current["price"] if current else 0)
+        if picked is not None and picked is not current:
+            build[_build_key(build, dep)] = picked
+            changed.append(dep)
+    return build, changed
@@ -0,0 +1,83 @@
+"""
+Redis-бэкенд FSM с пакетной записью (нужен пакет redis).
+
+Раскладка ключей и форматы совпадают с aiogram RedisStorage при том же
+key_builder (по умолчанию — его DefaultKeyBuilder(): <prefix>:<chat>:<user>
+:state / :data, data — JSON), поэтому процессы со старым RedisStorage и с
+этим классом видят одни и те же диалоги. Отличие —
+set_state/set_data копятся в WriteBuffer и уходят одним pipeline
+(SET ... EX ttl / DEL), а не отдельным запросом на каждое изменение.
+"""
+
+from typing import Any, Dict, Mapping, Optional
+
+from aiogram.fsm.storage.base import StateType, StorageKey
+from aiogram.fsm.storage.redis import RedisStorage
+
+from Bot.config.storage_config import FSM_FLUSH_BATCH, FSM_FLUSH_INTERVAL, FSM_TTL
+from Bot.services.fsm_storage import _MISSING, Batch, WriteBuffer, check_data, state_name
+
+
+class BufferedRedisStorage(RedisStorage):
+    """RedisStorage с отложенной записью пачками и TTL брошенных диалогов."""
+
+    def __init__(
+        self,
+        redis,
+        key_builder=None,
+        state_ttl: Optional[int] = None,
+        data_ttl: Optional[int] = None,
+        flush_interval: float = FSM_FLUSH_INTERVAL,
+        flush_batch: int = FSM_FLUSH_BATCH,
+        **kwargs: Any,
+    ):
+        ttl = FSM_TTL or None
+        super().__init__(
+            redis,
+            key_builder=key_builder,
+            state_ttl=state_ttl if state_ttl is not None else ttl,
+            data_ttl=data_ttl if data_ttl is not None else ttl,
+            **kwargs,
+        )
+        self._buffer = WriteBuffer(self._write, flush_interval, flush_batch)
+
+    async def _write(self, batch: Batch) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for key, fields in batch.items():
+            if "state" in fields:
+                redis_key = self.key_builder.build(key, "state")
+                if fields["state"] is None:
+                    pipe.delete(redis_key)
+                else:
+                    pipe.set(redis_key, fields["state"], ex=self.state_ttl)
+            if "data" in fields:
+                redis_key = self.key_builder.build(key, "data")
+                if not fields["data"]:
+                    pipe.delete(redis_key)
+                else:
+                    pipe.set(redis_key, self.json_dumps(fields["data"]), ex=self.data_ttl)
+        await pipe.execute()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._buffer.put(key, "state", state_name(state))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        value = self._buffer.get(key, "state")
+        if value is not _MISSING:
+            return value
+        return await super().get_state(key)
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._buffer.put(key, "data", check_data(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        value = self._buffer.get(key, "data")
+        if value is not _MISSING:
+            return (value or {}).copy()
+        return await super().get_data(key)
+
+    async def close(self) -> None:
+        try:
+            await self._buffer.close()
+        finally:
+            await super().close()
@@ -0,0 +1,284 @@
+"""
+Персистентное хранилище FSM для aiogram.
+
+По умолчанию Dispatcher() держит состояния в MemoryStorage: диалоги
+BuildPC / PreferencesState теряются при рестарте, а второй процесс бота
+их не видит. Здесь — подключаемые бэкенды:
+
+  • SQLiteStorage  — локальный файл в режиме WAL; несколько процессов на
+                     одной машине читают/пишут одну базу;
+  • BufferedRedisStorage (fsm_redis_storage) — Redis-протокол, общий для
+                     процессов на разных машинах.
+
+Оба пишут пачками: изменения копятся в WriteBuffer и сбрасываются раз в
+FSM_FLUSH_INTERVAL секунд (или при FSM_FLUSH_BATCH ключах) одной транзакцией
+/ одним pipeline. Чтение сначала смотрит в буфер, поэтому процесс всегда
+видит свои последние записи. Диалоги, не менявшиеся FSM_TTL секунд, истекают.
+
+Выбор бэкенда — create_storage() по FSM_STORAGE (memory / sqlite / redis).
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from Bot.config.storage_config import (
+    FSM_FLUSH_BATCH, FSM_FLUSH_INTERVAL, FSM_REDIS_URL, FSM_SQLITE_PATH, FSM_STORAGE, FSM_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+# Поле записи в буфере: "state" или "data"
+Batch = Dict[StorageKey, Dict[str, Any]]
+
+_MISSING = object()
+
+
+def state_name(state: StateType) -> Optional[str]:
+    return state.state if isinstance(state, State) else state
+
+
+def check_data(data: Mapping[str, Any]) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise DataNotDictLikeError(
+            f"Data must be a dict or dict-like object, got {type(data).__name__}"
+        )
+    return data.copy()
+
+
+# ══════════════════════════════════════════════════════════
+#  ОТЛОЖЕННАЯ ЗАПИСЬ
+# ══════════════════════════════════════════════════════════
+
+class WriteBuffer:
+    """
+    Последние state/data по ключу до сброса пачкой.
+
+    flush_batch(batch) — корутина бэкенда, записывающая {key: {field: value}}.
+    Пока пачка пишется, её значения остаются видимыми для чтения (_flushing).
+    При ошибке записи пачка возвращается в буфер (новые значения важнее).
+    """
+
+    def __init__(
+        self,
+        flush_batch: Callable[[Batch], Awaitable[None]],
+        interval: float = FSM_FLUSH_INTERVAL,
+        max_pending: int = FSM_FLUSH_BATCH,
+    ):
+        self._flush_batch = flush_batch
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Batch = {}
+        self._flushing: Batch = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, key: StorageKey, field: str) -> Any:
+        """Значение из буфера или _MISSING."""
+        for batch in (self._pending, self._flushing):
+            fields = batch.get(key)
+            if fields is not None and field in fields:
+                return fields[field]
+        return _MISSING
+
+    async def put(self, key: StorageKey, field: str, value: Any) -> None:
+        self._pending.setdefault(key, {})[field] = value
+        if self.interval <= 0 or len(self._pending) >= self.max_pending:
+            await self.flush()
+        elif self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            self._flushing, self._pending = self._pending, {}
+            try:
+                await self._flush_batch(self._flushing)
+            except Exception as e:
+                logger.error(f"Ошибка записи FSM ({len(self._flushing)} ключей): {e}")
+                for key, fields in self._flushing.items():
+                    fields.update(self._pending.get(key, {}))
+                    self._pending[key] = fields
+                raise
+            finally:
+                self._flushing = {}
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                pass  # уже залогировано, повторим на следующем тике
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+# ══════════════════════════════════════════════════════════
+#  SQLITE (WAL)
+# ══════════════════════════════════════════════════════════
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fsm (
+    key     TEXT PRIMARY KEY,
+    state   TEXT,
+    data    TEXT,
+    expires REAL
+)
+"""
+
+_UPSERT = """
+INSERT INTO fsm (key, state, data, expires) VALUES (:key, :state, :data, :expires)
+ON CONFLICT(key) DO UPDATE SET
+    state   = CASE WHEN :has_state THEN excluded.state ELSE fsm.state END,
+    data    = CASE WHEN :has_data  THEN excluded.data  ELSE fsm.data  END,
+    expires = excluded.expires
+"""
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Хранилище FSM в SQLite: одна таблица key → (state, data JSON, expires).
+
+    WAL позволяет нескольким процессам бота на одной машине работать с одним
+    файлом (читатели не блокируют писателя). Все обращения к соединению идут
+    через один поток, чтобы не блокировать event loop.
+    """
+
+    def __init__(
+        self,
+        path: str = FSM_SQLITE_PATH,
+        ttl: int = FSM_TTL,
+        key_builder: Optional[KeyBuilder] = None,
+        flush_interval: float = FSM_FLUSH_INTERVAL,
+        flush_batch: int = FSM_FLUSH_BATCH,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fsm-sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._buffer = WriteBuffer(self._write, flush_interval, flush_batch)
+        self._last_sweep = 0.0
+
+    # ── соединение (только в потоке executor) ─────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS fsm_expires ON fsm (expires)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _expires(self, now: float) -> Optional[float]:
+        return now + self.ttl if self.ttl > 0 else None
+
+    def _write_sync(self, rows: List[dict], now: float) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany(_UPSERT, rows)
+            conn.execute("DELETE FROM fsm WHERE state IS NULL AND data IS NULL")
+            # брошенные диалоги — не чаще раза в минуту
+            if self.ttl > 0 and now - self._last_sweep > 60:
+                conn.execute("DELETE FROM fsm WHERE expires < ?", (now,))
+                self._last_sweep = now
+
+    def _read_sync(self, key: str, column: str, now: float) -> Optional[str]:
+        row = self._connect().execute(
+            f"SELECT {column} FROM fsm WHERE key = ? AND (expires IS NULL OR expires >= ?)",
+            (key, now),
+        ).fetchone()
+        return row[0] if row else None
+
+    # ── пачка из буфера ──────────────────────────────────────
+
+    async def _write(self, batch: Batch) -> None:
+        now = time.time()
+        expires = self._expires(now)
+        rows = []
+        for key, fields in batch.items():
+            data = fields.get("data")
+            rows.append({
+                "key": self.key_builder.build(key),
+                "state": fields.get("state"),
+                "data": json.dumps(data, ensure_ascii=False) if data else None,
+                "expires": expires,
+                "has_state": "state" in fields,
+                "has_data": "data" in fields,
+            })
+        await self._call(self._write_sync, rows, now)
+
+    # ── BaseStorage ──────────────────────────────────────────
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._buffer.put(key, "state", state_name(state))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        value = self._buffer.get(key, "state")
+        if value is not _MISSING:
+            return value
+        return await self._call(self._read_sync, self.key_builder.build(key), "state", time.time())
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._buffer.put(key, "data", check_data(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        value = self._buffer.get(key, "data")
+        if value is not _MISSING:
+            return (value or {}).copy()
+        raw = await self._call(self._read_sync, self.key_builder.build(key), "data", time.time())
+        return json.loads(raw) if raw else {}
+
+    async def close(self) -> None:
+        try:
+            await self._buffer.close()
+        finally:
+            if self._conn is not None:
+                await self._call(self._conn.close)
+                self._conn = None
+            self._executor.shutdown(wait=True)
+
+
+# ══════════════════════════════════════════════════════════
+#  ВЫБОР БЭКЕНДА
+# ══════════════════════════════════════════════════════════
+
+def create_storage(kind: Optional[str] = None) -> BaseStorage:
+    """
+    Хранилище FSM по FSM_STORAGE: "memory", "sqlite" (по умолчанию) или "redis".
+    Redis-бэкенд требует пакет redis (pip install redis).
+    """
+    kind = (kind or FSM_STORAGE).lower()
+    if kind == "memory":
+        return MemoryStorage()
+    if kind == "sqlite":
+        logger.info(f"FSM: SQLite ({FSM_SQLITE_PATH}), TTL {FSM_TTL} c")
+        return SQLiteStorage()
+    if kind == "redis":
+        from Bot.services.fsm_redis_storage import BufferedRedisStorage
+
+        logger.info(f"FSM: Redis ({FSM_REDIS_URL}), TTL {FSM_TTL} c")
+        return BufferedRedisStorage.from_url(FSM_REDIS_URL)
+    raise ValueError(f"Неизвестный FSM_STORAGE: {kind!r} (memory / sqlite / redis)")
@@ -11,13 +11,15 @@ PC Builder v2 — главный оркестратор сборки.
 """
 
 import re
+from collections.abc import Mapping
 from typing import Dict, Optional, Any
 
-from Bot.services.budget_allocator import BudgetAllocator
+from Bot.services.budget_allocator import BudgetAllocator, BudgetProfile, PriceTiers, profile_for, tiers_for
 from Bot.services.pc_builder_pick import (
     pick_cpu, pick_motherboard, pick_ram, pick_gpu,
     pick_ssd, pick_psu, pick_cooler, pick_case,
 )
+from Bot.utils.metrics import count, traced
 
 
 def escape_md(text: str) -> str:
@@ -29,7 +31,7 @@ def _total_price(build: Dict[str, Optional[Dict]]) -> int:
     """Считает суммарную стоимость сборки."""
     total = 0
     for item in build.values():
-        if item and isinstance(item, dict):
+        if item and isinstance(item, Mapping):
             total += item.get("price", 0)
     return total
 
@@ -75,7 +77,15 @@ def _assemble(all_parts: dict, budgets: Dict[str, int]) -> Dict[str, Optional[Di
     }
 
 
-def build_pc(budget: int, preset: str, all_parts: dict) -> dict:
+@traced()
+def build_pc(
+    budget: int,
+    preset: str,
+    all_parts: dict,
+    budgets: Optional[Dict[str, int]] = None,
+    profile: Optional[BudgetProfile] = None,
+    tiers: Optional[PriceTiers] = None,
+) -> dict:
     """
     Главная функция сборки ПК.
 
@@ -88,17 +98,35 @@ def build_pc(budget: int, preset: str, all_parts: dict) -> dict:
       budget:    int — бюджет в тенге
       preset:    str — "gaming" / "work" / "universal"
       all_parts: dict — загруженные компоненты {category: [items]}
+      budgets:   dict — готовые квоты (не изменяются); без запасного
+                 распределения — перебор только срезается (шаг 3)
+      profile:   BudgetProfile и tiers — PriceTiers для BudgetAllocator;
+                 по умолчанию profile_for / tiers_for(all_parts). Пакетная
+                 сборка передаёт посчитанные по всему каталогу, а не по
+                 спискам группы
 
     Возвращает: dict {category: component_dict}
     """
     # ── Шаг 1: Распределяем бюджет ──────────────────────
-    allocator = BudgetAllocator(total_budget=budget, preset=preset)
-    budgets = allocator.get_budgets()
+    if budgets is None:
+        if profile is None:
+            profile, tiers = profile_for(all_parts), tiers_for(all_parts)
+        budgets = BudgetAllocator(total_budget=budget, preset=preset, profile=profile, tiers=tiers).get_budgets()
+    else:
+        budgets, tiers = dict(budgets), None
 
     # ── Шаг 2: Первая сборка ────────────────────────────
     build = _assemble(all_parts, budgets)
     total = _total_price(build)
 
+    if tiers is not None and total > budget:
+        # квоты по ценам каталога не учитывают цену совместимых платы/ОЗУ/БП —
+        # если не уложились, возвращаемся к квотам профиля с их запасом
+        count("build_pc.tiers_fallback")
+        budgets = BudgetAllocator(total_budget=budget, preset=preset, profile=profile).get_budgets()
+        build = _assemble(all_parts, budgets)
+        total = _total_price(build)
+
     # ── Шаг 3: Если сумма > бюджет → понижаем ──────────
     MAX_ITERATIONS = 10
     iteration = 0
@@ -132,6 +160,12 @@ def build_pc(budget: int, preset: str, all_parts: dict) -> dict:
         build = _assemble(all_parts, budgets)
         total = _total_price(build)
 
+    # сколько раз первая сборка не уложилась в бюджет (см. BUDGET_ALLOCATOR=catalog)
+    count("build_pc.builds")
+    if iteration:
+        count("build_pc.shaved")
+        count("build_pc.shave_iterations", iteration)
+
     # ── Шаг 4: Если сумма < бюджет → пробуем улучшить ──
     remaining = budget - total
     if remaining > 5000:
@@ -2,9 +2,14 @@
 PC Builder Pick v3 — строгий подбор с учётом ранга GPU-серий.
 """
 
+from collections.abc import Mapping
 from typing import List, Dict, Optional
 import re
 
+from Bot.services.component import item_forms
+from Bot.utils.keyword_matcher import FLAG_WATER, item_flags, psu_cert_rank
+from Bot.utils.metrics import traced
+
 
 # ══════════════════════════════════════════════════════════
 #  ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ
@@ -15,7 +20,7 @@ def _get(component: Optional[Dict], *keys, default=None):
         return default
     cur = component
     for k in keys:
-        if isinstance(cur, dict):
+        if isinstance(cur, Mapping):
             cur = cur.get(k)
         else:
             return default
@@ -34,6 +39,23 @@ def _cheapest(items: List[Dict]) -> Optional[Dict]:
     return min(items, key=lambda x: x["price"])
 
 
+def _columns(items: List[Dict]):
+    """Колоночное представление категории (CatalogView + NumPy) или None."""
+    return getattr(items, "columns", None)
+
+
+# Ранг форм-фактора материнской платы
+_FF_RANK: dict[str, int] = {"atx": 3, "matx": 2, "m-atx": 2, "itx": 1}
+
+# Какие форм-факторы плат влезают в корпус данного форм-фактора
+_FF_COMPAT: dict[str, set] = {
+    "atx": {"atx", "matx", "m-atx", "itx"},
+    "matx": {"matx", "m-atx", "itx"},
+    "m-atx": {"matx", "m-atx", "itx"},
+    "itx": {"itx"},
+}
+
+
 # ══════════════════════════════════════════════════════════
 #  РАНГ GPU ПО МОДЕЛИ (чем выше — тем мощнее)
 # ══════════════════════════════════════════════════════════
@@ -59,7 +81,7 @@ _GPU_RANK_TABLE: dict[str, int] = {
 
 def _gpu_model_rank(gpu: Dict) -> int:
     """Извлекает ранг GPU из названия."""
-    name = gpu.get("name", "").lower()
+    name = item_forms(gpu).lower
 
     # Пробуем найти серию вида RTX 5070 Ti, RX 9060 XT и т.д.
     # Сначала ищем с суффиксом Ti/XT
@@ -87,10 +109,15 @@ def _gpu_model_rank(gpu: Dict) -> int:
 #  CPU
 # ══════════════════════════════════════════════════════════
 
+@traced()
 def pick_cpu(cpus: List[Dict], budget: int) -> Optional[Dict]:
     if not cpus:
         return None
 
+    cols = _columns(cpus)
+    if cols is not None:
+        return cols.pick_cpu(budget)
+
     candidates = _in_budget(cpus, budget)
     if not candidates:
         return _cheapest(cpus)
@@ -112,10 +139,15 @@ def pick_cpu(cpus: List[Dict], budget: int) -> Optional[Dict]:
 #  MOTHERBOARD
 # ══════════════════════════════════════════════════════════
 
+@traced()
 def pick_motherboard(mobos: List[Dict], cpu: Optional[Dict], budget: int) -> Optional[Dict]:
     if not mobos:
         return None
 
+    cols = _columns(mobos)
+    if cols is not None:
+        return cols.pick_motherboard(cpu, budget)
+
     cpu_socket = _get(cpu, "specs", "socket")
 
     socket_ok = ([m for m in mobos if _get(m, "specs", "socket") == cpu_socket]
@@ -129,7 +161,7 @@ def pick_motherboard(mobos: List[Dict], cpu: Optional[Dict], budget: int) -> Opt
     def score(m: Dict) -> tuple:
         specs = m.get("specs") or {}
         ff = (specs.get("formfactor") or specs.get("form_factor") or "").lower()
-        ff_rank = {"atx": 3, "matx": 2, "m-atx": 2, "itx": 1}.get(ff, 0)
+        ff_rank = _FF_RANK.get(ff, 0)
         ddr_rank = 2 if specs.get("ram_type") == "DDR5" else 1
         usage = m["price"] / budget if budget > 0 else 0
         return (ff_rank, ddr_rank, -abs(0.75 - usage))
@@ -142,10 +174,15 @@ def pick_motherboard(mobos: List[Dict], cpu: Optional[Dict], budget: int) -> Opt
 #  RAM
 # ══════════════════════════════════════════════════════════
 
+@traced()
 def pick_ram(rams: List[Dict], mobo: Optional[Dict], budget: int) -> Optional[Dict]:
     if not rams:
         return None
 
+    cols = _columns(rams)
+    if cols is not None:
+        return cols.pick_ram(mobo, budget)
+
     mobo_ddr = _get(mobo, "specs", "ram_type")
     compat = ([r for r in rams if _get(r, "specs", "ddr") == mobo_ddr]
               if mobo_ddr else list(rams))
@@ -167,6 +204,7 @@ def pick_ram(rams: List[Dict], mobo: Optional[Dict], budget: int) -> Optional[Di
 #  GPU — с рангом серии
 # ══════════════════════════════════════════════════════════
 
+@traced()
 def pick_gpu(gpus: List[Dict], budget: int) -> Optional[Dict]:
     """
     Выбирает GPU:
@@ -176,6 +214,10 @@ def pick_gpu(gpus: List[Dict], budget: int) -> Optional[Dict]:
     if not gpus:
         return None
 
+    cols = _columns(gpus)
+    if cols is not None:
+        return cols.pick_gpu(budget)
+
     candidates = _in_budget(gpus, budget)
     if not candidates:
         return _cheapest(gpus)
@@ -195,10 +237,15 @@ def pick_gpu(gpus: List[Dict], budget: int) -> Optional[Dict]:
 #  SSD
 # ══════════════════════════════════════════════════════════
 
+@traced()
 def pick_ssd(ssds: List[Dict], budget: int) -> Optional[Dict]:
     if not ssds:
         return None
 
+    cols = _columns(ssds)
+    if cols is not None:
+        return cols.pick_ssd(budget)
+
     candidates = _in_budget(ssds, budget)
     if not candidates:
         return _cheapest(ssds)
@@ -241,23 +288,22 @@ def estimate_system_power(cpu: Optional[Dict], gpu: Optional[Dict]) -> int:
     return max(recommended, 400)
 
 
+@traced()
 def pick_psu(psus: List[Dict], cpu: Optional[Dict], gpu: Optional[Dict], budget: int) -> Optional[Dict]:
     if not psus:
         return None
 
+    cols = _columns(psus)
+    if cols is not None:
+        return cols.pick_psu(cpu, gpu, budget)
+
     required = estimate_system_power(cpu, gpu)
 
     def get_watt(p: Dict) -> int:
         return _get(p, "specs", "watt", default=0)
 
     def cert(p: Dict) -> int:
-        n = p.get("name", "").lower()
-        if "titanium" in n: return 5
-        if "platinum" in n: return 4
-        if "gold" in n: return 3
-        if "silver" in n: return 2
-        if "bronze" in n: return 1
-        return 0
+        return psu_cert_rank(item_flags(p))
 
     good = [p for p in psus if get_watt(p) >= required and p["price"] <= budget]
 
@@ -277,9 +323,14 @@ def pick_psu(psus: List[Dict], cpu: Optional[Dict], gpu: Optional[Dict], budget:
 #  COOLER
 # ══════════════════════════════════════════════════════════
 
+@traced()
 def pick_cooler(coolers: List[Dict], cpu: Optional[Dict], budget: int) -> Optional[Dict]:
     if not coolers:
         return None
+
+    cols = _columns(coolers)
+    if cols is not None:
+        return cols.pick_cooler(cpu, budget)
     if not cpu:
         return _cheapest(_in_budget(coolers, budget)) or _cheapest(coolers)
 
@@ -289,8 +340,7 @@ def pick_cooler(coolers: List[Dict], cpu: Optional[Dict], budget: int) -> Option
     def is_water(c: Dict) -> bool:
         if _get(c, "specs", "water", default=False):
             return True
-        n = c.get("name", "").lower()
-        return "water" in n or "liquid" in n or "aio" in n
+        return bool(item_flags(c) & FLAG_WATER)
 
     def tdp(c: Dict) -> int:
         return _get(c, "specs", "tdp", default=0)
@@ -319,24 +369,22 @@ def pick_cooler(coolers: List[Dict], cpu: Optional[Dict], budget: int) -> Option
 #  CASE
 # ══════════════════════════════════════════════════════════
 
+@traced()
 def pick_case(cases: List[Dict], mobo: Optional[Dict], budget: int) -> Optional[Dict]:
     if not cases:
         return None
 
-    mobo_ff = (_get(mobo, "specs", "formfactor") or _get(mobo, "specs", "form_factor") or "").lower()
+    cols = _columns(cases)
+    if cols is not None:
+        return cols.pick_case(mobo, budget)
 
-    FF_COMPAT = {
-        "atx": {"atx", "matx", "m-atx", "itx"},
-        "matx": {"matx", "m-atx", "itx"},
-        "m-atx": {"matx", "m-atx", "itx"},
-        "itx": {"itx"},
-    }
+    mobo_ff = (_get(mobo, "specs", "formfactor") or _get(mobo, "specs", "form_factor") or "").lower()
 
     def compat(c: Dict) -> bool:
         ff = (_get(c, "specs", "form_factor") or _get(c, "specs", "formfactor") or "").lower()
         if not mobo_ff or not ff:
             return True
-        return mobo_ff in FF_COMPAT.get(ff, set())
+        return mobo_ff in _FF_COMPAT.get(ff, set())
 
     filtered = [c for c in cases
                 if c["price"] <= budget
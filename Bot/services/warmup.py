@@ -0,0 +1,211 @@
+"""
+Прогрев кэша сборок после каждой загрузки каталога.
+
+После деплоя или обновления прайса первые пользователи платили полную цену
+самых частых запросов (ИИ-конвейер + варианты). Теперь после каждой загрузки
+каталога (on_catalog_load) фоновый поток считает top-N запросов в кэш
+результатов (build_variants.results):
+
+  • запросы — самые частые среди последних сборок пользователей
+    (popular_requests, бюджет — ровно введённый: ключ кэша точный), затем
+    список из WARMUP_COMBOS_PATH; без повторов, не больше WARMUP_TOP_N;
+  • ключ — тот же, что у живого запроса (бюджет, пресет, предпочтения в виде
+    обработчика, версия каталога), и расчёт идёт через тот же SingleFlight:
+    пользователь с тем же запросом получает готовый результат или ждёт уже
+    идущий расчёт;
+  • низкий приоритет: сборки — в отдельном потоке с nice 19 (Linux — на
+    поток), пауза WARMUP_PAUSE между сборками, а пока в процессе считаются
+    живые сборки (build_variants.in_flight) — ждём; новая загрузка каталога
+    прерывает прогрев и начинает его заново для новой версии.
+
+С включённым ИИ каждый прогреваемый запрос — это настоящие вызовы LLM
+(около пяти на запрос) после каждой загрузки каталога, поэтому прогрев
+выключен по умолчанию (WARMUP_TOP_N=0). Под супервизором прогревает только
+первый воркер (BOT_WORKER_INDEX=1): кэш у воркеров свой, и готовые
+результаты получают чаты этого воркера — зато вызовы LLM не умножаются
+на число процессов.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from Bot.data.user_preferences import UserPreferences, popular_requests
+from Bot.services.build_variants import in_flight, warm_build
+from Bot.services.catalog import Catalog, get_catalog, on_catalog_load
+from Bot.utils.metrics import count, span
+
+logger = logging.getLogger(__name__)
+
+WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", "0"))
+WARMUP_PAUSE = float(os.getenv("WARMUP_PAUSE", "0.2"))  # секунд между сборками
+WARMUP_COMBOS_PATH = os.getenv(
+    "WARMUP_COMBOS_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "warmup_combos.json"),
+)
+
+# Бюджет ниже минимума обработчика не прогревается
+_MIN_BUDGET = 100_000
+
+Combo = Tuple[int, str, dict]
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАПРОСЫ
+# ══════════════════════════════════════════════════════════
+
+def _preferences(prefs: UserPreferences) -> dict:
+    """Предпочтения в том виде, в каком их собирает обработчик сборки (ключ кэша тот же)."""
+    out = {}
+    if prefs.cpu_brand:
+        out["cpu_brand"] = prefs.cpu_brand.upper()
+    if prefs.gpu_brand:
+        out["gpu_brand"] = prefs.gpu_brand.upper()
+    if prefs.need_gpu is not None:
+        out["need_gpu"] = prefs.need_gpu
+    return out
+
+
+def _configured(path: str) -> List[UserPreferences]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            combos = json.load(f)["combos"]
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Список прогрева {path} не прочитан: {e}")
+        return []
+    fields = ("budget", "usage", "cpu_brand", "gpu_brand", "need_gpu")
+    return [UserPreferences(**{k: c[k] for k in fields if k in c}) for c in combos]
+
+
+def warmup_combos(limit: int = WARMUP_TOP_N, path: str = WARMUP_COMBOS_PATH) -> List[Combo]:
+    """Top-limit запросов для прогрева: (бюджет, пресет, предпочтения), частые — первыми."""
+    combos: List[Combo] = []
+    seen = set()
+    for prefs in [*popular_requests(limit), *_configured(path)]:
+        preferences = _preferences(prefs)
+        key = (prefs.budget, prefs.usage, tuple(sorted(preferences.items())))
+        if prefs.budget < _MIN_BUDGET or key in seen:
+            continue
+        seen.add(key)
+        combos.append((prefs.budget, prefs.usage, preferences))
+        if len(combos) >= limit:
+            break
+    return combos
+
+
+# ══════════════════════════════════════════════════════════
+#  ФОНОВЫЙ ПОТОК
+# ══════════════════════════════════════════════════════════
+
+def _lower_priority() -> None:
+    # в Linux nice задаётся на поток (tid); в остальных ОС — не трогаем
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+def _warms_here() -> bool:
+    # один процесс или первый воркер супервизора
+    return os.getenv("BOT_WORKER_INDEX", "0") in ("0", "1")
+
+
+class Warmer:
+    """Поток прогрева: schedule(catalog) — прогреть под эту версию каталога."""
+
+    def __init__(self, limit: int = WARMUP_TOP_N, pause: float = WARMUP_PAUSE):
+        self.limit = limit
+        self.pause = pause
+        self.warmed = 0
+        self._pending: Optional[Catalog] = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Запускает поток прогрева (вызывать из цикла: расчёты идут через его SingleFlight)."""
+        if self.running or self.limit <= 0 or not _warms_here():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-warmup-build",
+                                            initializer=_lower_priority)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-warmup", daemon=True)
+        self._thread.start()
+        on_catalog_load(self.schedule)
+        logger.info(f"Прогрев кэша сборок включён: top-{self.limit}")
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def schedule(self, catalog: Optional[Catalog] = None) -> None:
+        """Прогреть кэш под catalog (None — общий каталог процесса)."""
+        self._pending = catalog
+        self._wake.set()
+
+    # ── Поток ────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        _lower_priority()
+        while not self._stopped.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            catalog, self._pending = self._pending, None
+            try:
+                if catalog is None:
+                    catalog = get_catalog()
+                    # первая загрузка каталога только что позвала schedule(catalog) — это тот же прогрев
+                    if self._pending is catalog:
+                        self._pending = None
+                        self._wake.clear()
+                self._warm(catalog)
+            except Exception as e:
+                logger.error(f"Прогрев кэша упал: {e}", exc_info=True)
+
+    def _idle(self) -> bool:
+        """Ждёт, пока в процессе нет живых сборок; False — прогрев пора прервать."""
+        while in_flight():
+            if self._stopped.wait(self.pause) or self._wake.is_set():
+                return False
+        return not (self._stopped.wait(self.pause) or self._wake.is_set())
+
+    def _warm(self, catalog: Catalog) -> None:
+        version = catalog.version
+        combos = warmup_combos(self.limit)
+        built = 0
+        with span("warmup.run"):
+            for budget, preset, preferences in combos:
+                # новая загрузка каталога (schedule) или остановка — этот прогрев уже не нужен
+                if not self._idle():
+                    logger.info(f"Прогрев v{version} прерван после {built} сборок")
+                    return
+                future = asyncio.run_coroutine_threadsafe(
+                    warm_build(budget, preset, catalog, preferences, executor=self._executor), self._loop,
+                )
+                if future.result():
+                    built += 1
+                    count("warmup.builds")
+        self.warmed += built
+        logger.info(f"Прогрев кэша (каталог v{version}): {built} из {len(combos)} запросов посчитано и сохранено")
+
+
+WARMER = Warmer()
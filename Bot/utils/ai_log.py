@@ -0,0 +1,202 @@
+"""
+Журнал запросов к LLM: асинхронный, буферизованный, в JSON Lines.
+
+    log_ai_call(model, prompt, response, duration, status="ok", attempt=1, step="step3")
+
+В рабочем потоке вызов только решает, попадает ли запись в выборку, и
+кладёт её в очередь (QueueHandler). Всё остальное — в фоновом потоке
+QueueListener:
+  • редактирование: ключи API, токены ботов, Bearer, e-mail и шаблоны
+    AI_LOG_REDACT заменяются на [REDACTED];
+  • тела промптов и ответов хранятся один раз — строкой {"body": hash,
+    "text": ...}, а события ссылаются на них по sha256 (в пределах файла:
+    после ротации тело пишется заново, каждый файл самодостаточен);
+  • ротация по AI_LOG_MAX_BYTES, старые файлы сжимаются в .gz.
+
+Выборка — по шагу конвейера (step1…step5: передаёт AIPcBuilder, без него —
+из текущего span'а метрик, если они включены), доли в AI_LOG_SAMPLE:
+"step1=1,step3=0.1,*=1". Ошибочные вызовы пишутся всегда.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import shutil
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from Bot.config.ai_config import (
+    AI_LOG_BACKUPS, AI_LOG_MAX_BYTES, AI_LOG_PATH, AI_LOG_REDACT, AI_LOG_SAMPLE,
+    LOG_AI_PERFORMANCE, LOG_AI_REQUESTS, LOG_AI_RESPONSES,
+)
+from Bot.utils.metrics import current_stage
+
+_STEP = re.compile(r"_(step\d)")
+
+_REDACT = [
+    re.compile(r"gsk_[A-Za-z0-9]{20,}"),                   # ключ Groq
+    re.compile(r"sk-[A-Za-z0-9_-]{20,}"),                  # ключ OpenAI
+    re.compile(r"\b\d{6,12}:[A-Za-z0-9_-]{30,}\b"),        # токен Telegram-бота
+    re.compile(r"(?i)bearer\s+[A-Za-z0-9._~+/=-]+"),
+    re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"),               # e-mail
+] + [re.compile(p) for p in AI_LOG_REDACT]
+
+
+def _parse_sample(spec: str) -> Dict[str, float]:
+    rates = {"*": 1.0}
+    for part in spec.replace(" ", "").split(","):
+        step, sep, rate = part.partition("=")
+        if sep:
+            rates[step] = float(rate)
+    return rates
+
+
+_SAMPLE = _parse_sample(AI_LOG_SAMPLE)
+
+
+def redact(text: str) -> str:
+    for pattern in _REDACT:
+        text = pattern.sub("[REDACTED]", text)
+    return text
+
+
+def body_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+# ══════════════════════════════════════════════════════════
+#  ФОНОВЫЙ ПИСАТЕЛЬ
+# ══════════════════════════════════════════════════════════
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class JsonLinesHandler(logging.handlers.RotatingFileHandler):
+    """Пишет события LLM строками JSON; тела — один раз на файл, по хэшу."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self.namer = lambda name: name + ".gz"
+        self.rotator = _gzip_rotator
+        self._seen: Set[str] = set()
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        if self.stream is None:  # delay=True: базовый класс не открывает новый файл
+            self.stream = self._open()
+        self._seen.clear()
+
+    def _body(self, text: Optional[str], lines: list) -> Optional[str]:
+        if text is None:
+            return None
+        text = redact(text)
+        h = body_hash(text)
+        if h not in self._seen:
+            self._seen.add(h)
+            lines.append(json.dumps({"body": h, "text": text}, ensure_ascii=False))
+        return h
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            event = dict(record.ai_event)
+            size = len(event.get("prompt") or "") + len(event.get("response") or "")
+            if self.maxBytes and self.stream.tell() + size >= self.maxBytes:
+                self.doRollover()
+
+            lines: list = []
+            event["prompt"] = self._body(event["prompt"], lines)
+            event["response"] = self._body(event["response"], lines)
+            lines.append(json.dumps(event, ensure_ascii=False))
+            self.stream.write("\n".join(lines) + "\n")
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+# ══════════════════════════════════════════════════════════
+#  ОЧЕРЕДЬ
+# ══════════════════════════════════════════════════════════
+
+_logger = logging.getLogger("pcbuilder.ai_calls")
+_logger.propagate = False
+_listener: Optional[logging.handlers.QueueListener] = None
+_start_lock = threading.Lock()
+
+
+def _ensure_started() -> None:
+    global _listener
+    with _start_lock:
+        if _listener is not None:
+            return
+        q: queue.SimpleQueue = queue.SimpleQueue()
+        _logger.addHandler(logging.handlers.QueueHandler(q))
+        _logger.setLevel(logging.INFO)
+        _listener = logging.handlers.QueueListener(q, JsonLinesHandler(AI_LOG_PATH, AI_LOG_MAX_BYTES, AI_LOG_BACKUPS))
+        _listener.start()
+        atexit.register(stop)
+
+
+def stop() -> None:
+    """Дописывает очередь и закрывает файл (вызывается и при выходе)."""
+    global _listener
+    with _start_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+        _listener = None
+
+
+def log_ai_call(
+    model: str,
+    prompt: str,
+    response: Optional[str],
+    duration: float,
+    status: str = "ok",
+    attempt: int = 1,
+    json_mode: bool = True,
+    step: Optional[str] = None,
+) -> None:
+    """Ставит событие вызова LLM в очередь журнала (если оно попало в выборку)."""
+    if not AI_LOG_PATH:
+        return
+    if step is None:
+        # span'ы есть только при METRICS_ENABLED — шаг лучше передавать явно
+        m = _STEP.search(current_stage() or "")
+        step = m.group(1) if m else "other"
+    if status == "ok" and random.random() >= _SAMPLE.get(step, _SAMPLE["*"]):
+        return
+
+    _ensure_started()
+    event = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        "step": step,
+        "model": model,
+        "status": status,
+        "attempt": attempt,
+        "json": json_mode,
+        "prompt_chars": len(prompt),
+        "response_chars": len(response) if response is not None else None,
+        "prompt": prompt if LOG_AI_REQUESTS else None,
+        "response": response if LOG_AI_RESPONSES else None,
+    }
+    if LOG_AI_PERFORMANCE:
+        event["duration_ms"] = round(duration * 1000, 1)
+    _logger.info("ai_call", extra={"ai_event": event})
@@ -4,8 +4,10 @@
 
 from typing import Dict, Optional
 from Bot.utils.formatter import format_build_message
+from Bot.utils.metrics import traced
 
 
+@traced()
 def format_enhanced_ai_build_message(
     build: Dict[str, Optional[Dict]], 
     budget: int, 
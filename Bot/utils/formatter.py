@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from typing import Any
 
 _NICE_NAMES: dict[str, str] = {
@@ -31,7 +32,7 @@ def format_build_message(
     if not result or not isinstance(result, dict):
         return "❌ Не удалось подобрать сборку."
 
-    build = {k: v for k, v in result.items() if isinstance(v, dict)}
+    build = {k: v for k, v in result.items() if isinstance(v, Mapping)}
     total = sum(int(v.get("price", 0)) for v in build.values())
 
     usage_nice = {"gaming": "🎮 Игры", "work": "💼 Работа", "universal": "🔄 Универсальный"}
@@ -59,7 +60,7 @@ def format_build_message(
         if key in seen:
             continue
         item = build.get(key)
-        if not item or not isinstance(item, dict):
+        if not item or not isinstance(item, Mapping):
             continue
         seen.add(key)
         if key in ("cooler", "coolers"):
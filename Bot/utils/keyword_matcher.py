@@ -0,0 +1,191 @@
+"""
+Мульти-шаблонный поиск ключевых слов (Aho–Corasick) для фильтров по названию.
+
+Все наборы ключевых слов (мусор, б/у, водянки, сертификаты БП, бренды,
+стоп-листы AI-фильтра) компилируются один раз в общий автомат. Каждый
+шаблон несёт битовую маску флагов; скан названия возвращает OR всех
+сработавших флагов. Загрузчик каталога сохраняет маску в item["flags"],
+после чего любой фильтр — это проверка бита.
+
+Сравнение регистронезависимое: шаблоны и текст приводятся к lowercase.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ══════════════════════════════════════════════════════════
+#  ФЛАГИ
+# ══════════════════════════════════════════════════════════
+
+FLAG_TRASH       = 1 << 0   # аксессуары, крепёж, уценка, SO-DIMM
+FLAG_BAD_NAME    = 1 << 1   # строки-подсказки прайса, б/у
+FLAG_WATER       = 1 << 2   # жидкостное охлаждение
+FLAG_CERT_BRONZE   = 1 << 3
+FLAG_CERT_SILVER   = 1 << 4
+FLAG_CERT_GOLD     = 1 << 5
+FLAG_CERT_PLATINUM = 1 << 6
+FLAG_CERT_TITANIUM = 1 << 7
+FLAG_SKIP_CPU    = 1 << 8   # Celeron / Pentium
+FLAG_SKIP_GPU    = 1 << 9   # GT 710 / 730 / 1030
+FLAG_SKIP_MB     = 1 << 10  # H610 / A320 / A520
+FLAG_AMD         = 1 << 11
+FLAG_INTEL       = 1 << 12
+FLAG_RADEON      = 1 << 13
+FLAG_GEFORCE     = 1 << 14  # GTX / RTX
+FLAG_RAM_SMALL   = 1 << 15  # 4-8 GB модули
+FLAG_SSD_SMALL   = 1 << 16  # SSD до 480 GB
+
+
+# ══════════════════════════════════════════════════════════
+#  НАБОРЫ КЛЮЧЕВЫХ СЛОВ
+# ══════════════════════════════════════════════════════════
+
+# keywords that indicate the item is NOT a real component (accessory / mount / bracket / holder)
+TRASH_KEYWORDS = [
+    "holder", "bracket", "mount", "pole", "stand", "frame", "plate",
+    "крепеж", "крепёж", "кронштейн", "держатель", "переходник", "adapter",
+    "holder", "rack", "panel", "Уц.", "серверн", "Cable", "райзер", "уц", "Уц", "cable"
+]
+
+# "so-dimm" / "so dimm" — память для ноутбуков
+SODIMM_KEYWORDS = ["so-dimm", "so dimm"]
+
+# строки прайса вида "Память для серверов смотрите в разделе...", ссылки, б/у
+BAD_NAME_KEYWORDS = ["смотрите в разделе", "для серверов", "серверные", "http", "б/у", "used"]
+
+WATER_KEYWORDS = ["aio", "water", "liquid", "lss", "hydro", "водян", "жидк", "сво"]
+
+SKIP_GPU = {"GT 710", "GT 730", "GT 1030"}
+SKIP_CPU = {"CELERON", "PENTIUM"}
+SKIP_MB  = {"H610", "A320", "A520"}
+
+_KEYWORD_SETS: List[Tuple[Iterable[str], int]] = [
+    (TRASH_KEYWORDS,                          FLAG_TRASH),
+    (SODIMM_KEYWORDS,                         FLAG_TRASH),
+    (BAD_NAME_KEYWORDS,                       FLAG_BAD_NAME),
+    (WATER_KEYWORDS,                          FLAG_WATER),
+    (["bronze"],                              FLAG_CERT_BRONZE),
+    (["silver"],                              FLAG_CERT_SILVER),
+    (["gold"],                                FLAG_CERT_GOLD),
+    (["platinum"],                            FLAG_CERT_PLATINUM),
+    (["titanium"],                            FLAG_CERT_TITANIUM),
+    (SKIP_CPU,                                FLAG_SKIP_CPU),
+    (SKIP_GPU,                                FLAG_SKIP_GPU),
+    (SKIP_MB,                                 FLAG_SKIP_MB),
+    (["AMD"],                                 FLAG_AMD),
+    (["INTEL", "CORE I"],                     FLAG_INTEL),
+    (["RADEON", " RX "],                      FLAG_RADEON),
+    (["GTX", "RTX"],                          FLAG_GEFORCE),
+    (["4GB", "8GB", " 4 GB", " 8 GB"],        FLAG_RAM_SMALL),
+    (["120GB", "128GB", "240GB", "256GB", "480GB"], FLAG_SSD_SMALL),
+]
+
+
+# ══════════════════════════════════════════════════════════
+#  АВТОМАТ
+# ══════════════════════════════════════════════════════════
+
+class KeywordMatcher:
+    """
+    Автомат Aho–Corasick: один проход по тексту находит все шаблоны.
+
+    patterns — {шаблон: маска флагов}. Переходы достраиваются до полного
+    DFA при компиляции, так что scan() — один dict-lookup на символ.
+    """
+
+    def __init__(self, patterns: Dict[str, int]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[int] = [0]
+        for pattern, flags in patterns.items():
+            self._add(pattern.lower(), flags)
+        self._compile()
+
+    def _add(self, pattern: str, flags: int) -> None:
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._out.append(0)
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] |= flags
+
+    def _compile(self) -> None:
+        goto, out = self._goto, self._out
+        fail = [0] * len(goto)
+
+        # BFS: fail-ссылки + наследование выходов и переходов по fail
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            out[state] |= out[fail[state]]
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                cand = goto[f].get(ch, 0)
+                fail[nxt] = cand if cand != nxt else 0
+                queue.append(nxt)
+            # переходы, которых нет у состояния, берём у fail-состояния (уже достроенного)
+            if state:
+                for ch, nxt in goto[fail[state]].items():
+                    goto[state].setdefault(ch, nxt)
+
+    def scan(self, text: str) -> int:
+        """Возвращает OR флагов всех шаблонов, встреченных в тексте (text уже в lowercase)."""
+        goto, out = self._goto, self._out
+        root = goto[0]
+        state, flags = 0, 0
+        for ch in text:
+            state = goto[state].get(ch) or root.get(ch, 0)
+            flags |= out[state]
+        return flags
+
+
+def _build_matcher() -> KeywordMatcher:
+    patterns: Dict[str, int] = {}
+    for keywords, flag in _KEYWORD_SETS:
+        for kw in keywords:
+            key = kw.lower()
+            patterns[key] = patterns.get(key, 0) | flag
+    return KeywordMatcher(patterns)
+
+
+NAME_MATCHER = _build_matcher()
+
+
+# ══════════════════════════════════════════════════════════
+#  ПУБЛИЧНЫЕ ХЕЛПЕРЫ
+# ══════════════════════════════════════════════════════════
+
+def name_flags(name: Optional[str]) -> int:
+    """Маска флагов для названия."""
+    if not name:
+        return 0
+    return NAME_MATCHER.scan(name.lower())
+
+
+def item_flags(item: Optional[dict]) -> int:
+    """Маска флагов компонента: берётся из item["flags"], иначе считается по имени."""
+    if not item:
+        return 0
+    flags = item.get("flags")
+    if flags is None:
+        flags = name_flags(item.get("name"))
+    return flags
+
+
+def psu_cert_rank(flags: int) -> int:
+    """Ранг сертификата 80 PLUS по флагам: titanium=5 … bronze=1, нет=0."""
+    if flags & FLAG_CERT_TITANIUM: return 5
+    if flags & FLAG_CERT_PLATINUM: return 4
+    if flags & FLAG_CERT_GOLD: return 3
+    if flags & FLAG_CERT_SILVER: return 2
+    if flags & FLAG_CERT_BRONZE: return 1
+    return 0
@@ -0,0 +1,140 @@
+"""
+Сторож event loop: лаг цикла и поиск блокирующих вызовов.
+
+  • пульс — корутина в цикле: спит interval и замеряет, насколько позже
+    проснулась; переспанное время пишется в метрику "loop.lag";
+  • сторож — отдельный поток: если пульса нет дольше threshold, цикл прямо
+    сейчас чем-то занят — снимается стек потока цикла (sys._current_frames),
+    из него берутся обработчик (кадр из Bot/handlers) и самый глубокий кадр
+    проекта, то есть виновник (time.sleep, синхронный HTTP, тяжёлый расчёт);
+  • когда цикл отпускает, в лог уходит одна запись WARNING: сколько стоял,
+    какой обработчик и стек.
+
+Включение: LOOP_WATCHDOG=true или на ходу — WATCHDOG.start()/stop(),
+у администраторов команда /watchdog on|off|<порог мс>.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import List, Optional
+
+from Bot.config.runtime_config import LOOP_LAG_THRESHOLD_MS, LOOP_WATCHDOG_INTERVAL
+from Bot.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_HANDLERS_DIR = os.path.join(_BOT_DIR, "handlers")
+_ASYNCIO_EVENTS = asyncio.events.__file__
+
+
+def _describe(frame) -> tuple[Optional[str], Optional[str], List[str]]:
+    """(обработчик, виновник, стек) по кадру потока цикла."""
+    stack = traceback.extract_stack(frame)
+    # кадры самого asyncio (run_forever → _run_once → Handle._run) не интересны
+    for i in range(len(stack) - 1, -1, -1):
+        if stack[i].filename == _ASYNCIO_EVENTS:
+            stack = stack[i + 1:]
+            break
+    handler = culprit = None
+    for fs in stack:
+        path = os.path.abspath(fs.filename)
+        if path.startswith(_HANDLERS_DIR):
+            handler = f"{os.path.splitext(os.path.basename(path))[0]}.{fs.name}"
+        if path.startswith(_BOT_DIR):
+            culprit = f"{os.path.relpath(path, os.path.dirname(_BOT_DIR))}:{fs.lineno} {fs.name}"
+    return handler, culprit, traceback.format_list(stack)
+
+
+class LoopWatchdog:
+    def __init__(self, threshold_ms: float = LOOP_LAG_THRESHOLD_MS, interval: float = LOOP_WATCHDOG_INTERVAL):
+        self.set_threshold(threshold_ms)
+        self.interval = interval
+        self.stalls = 0
+        self._beat = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped: Optional[threading.Event] = None
+        # стек, снятый сторожем во время текущей остановки цикла
+        self._captured: Optional[tuple] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Запускает пульс в текущем цикле и поток-сторож (вызывать из цикла)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped = threading.Event()
+        self._task = self._loop.create_task(self._pulse())
+        self._thread = threading.Thread(target=self._watch, args=(self._stopped,), name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Сторож цикла включён: порог {self.threshold * 1000:.0f} мс")
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        self._task = None
+        self._stopped.set()
+        self._thread = None
+        logger.info("Сторож цикла выключен")
+
+    def set_threshold(self, threshold_ms: float) -> None:
+        """Новый порог остановки; действует сразу, в том числе на работающего сторожа."""
+        if threshold_ms <= 0:
+            # порог 0: шаг сторожа 0 крутит ядро, а каждый пульс — «остановка»
+            raise ValueError(f"Порог сторожа должен быть > 0 мс, получено {threshold_ms}")
+        self.threshold = threshold_ms / 1000
+
+    # ── Пульс (в цикле) ──────────────────────────────────────
+
+    async def _pulse(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - start - self.interval)
+            REGISTRY.observe("loop.lag", lag)
+            if lag >= self.threshold:
+                self._report(lag)
+
+    def _report(self, lag: float) -> None:
+        self.stalls += 1
+        captured, self._captured = self._captured, None
+        if captured is None:
+            # сторож не успел (остановка короче его шага) — виновник неизвестен
+            logger.warning(f"Цикл стоял {lag * 1000:.0f} мс (стек не снят)")
+            return
+        handler, culprit, stack = captured
+        logger.warning(
+            f"Цикл стоял {lag * 1000:.0f} мс | обработчик: {handler or '—'} | виновник: {culprit or '—'}\n"
+            + "".join(stack[-20:])
+        )
+
+    # ── Сторож (в своём потоке) ──────────────────────────────
+
+    def _watch(self, stopped: threading.Event) -> None:
+        # шаг — от текущего порога: /watchdog <мс> меняет его на ходу
+        while not stopped.wait(min(self.interval, self.threshold) / 2):
+            silent = time.monotonic() - self._beat
+            if silent < self.interval + self.threshold or self._captured is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._captured = _describe(frame)
+
+
+WATCHDOG = LoopWatchdog()
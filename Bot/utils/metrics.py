@@ -0,0 +1,216 @@
+"""
+Лёгкие метрики и трассировка этапов сборки.
+
+    with span("catalog.load"):
+        ...
+
+    @traced()                 # этап "<модуль>.<функция>"
+    def pick_cpu(...): ...
+
+Каждый span пишет длительность в гистограмму этапа (реестр REGISTRY):
+кумулятивные бакеты для Prometheus + кольцевой буфер последних замеров
+для p50/p95/p99. Вложенность span'ов отслеживается через contextvars —
+в DEBUG-логе виден родительский этап. Счётчики событий (не длительности) —
+count("build_pc.shave_iterations", n). METRICS_ENABLED=false выключает запись.
+
+Реестр потокобезопасен (сборки идут в пуле потоков) и живёт в процессе:
+при нескольких воркерах у каждого свой /metrics.
+"""
+
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from Bot.config.runtime_config import METRICS_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# Границы бакетов, секунды
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Сколько последних замеров хранить для перцентилей
+SAMPLES = 2048
+
+_current_stage: ContextVar[Optional[str]] = ContextVar("current_stage", default=None)
+
+
+# ══════════════════════════════════════════════════════════
+#  ГИСТОГРАММЫ
+# ══════════════════════════════════════════════════════════
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total", "_samples", "_pos")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # последний — +Inf
+        self.count = 0
+        self.total = 0.0
+        self._samples: List[float] = []
+        self._pos = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if len(self._samples) < SAMPLES:
+            self._samples.append(value)
+        else:
+            self._samples[self._pos] = value
+            self._pos = (self._pos + 1) % SAMPLES
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Registry:
+    """Гистограммы по имени этапа и счётчики событий."""
+
+    def __init__(self):
+        self._hist: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            hist = self._hist.get(stage)
+            if hist is None:
+                hist = self._hist[stage] = Histogram()
+            hist.observe(seconds)
+
+    def inc(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def summary(self) -> Dict[str, dict]:
+        """{stage: {count, sum, p50, p95, p99}} — секунды."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": h.count,
+                    "sum": h.total,
+                    "p50": h.percentile(0.50),
+                    "p95": h.percentile(0.95),
+                    "p99": h.percentile(0.99),
+                }
+                for stage, h in sorted(self._hist.items())
+            }
+
+    def render_prometheus(self) -> str:
+        """Текстовый формат Prometheus (histogram pcbuilder_stage_seconds{stage=...})."""
+        lines = [
+            "# HELP pcbuilder_stage_seconds Длительность этапов сборки",
+            "# TYPE pcbuilder_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, h in sorted(self._hist.items()):
+                label = stage.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, n in zip(BUCKETS + (float("inf"),), h.buckets):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f'pcbuilder_stage_seconds_bucket{{stage="{label}",le="{le}"}} {cumulative}')
+                lines.append(f'pcbuilder_stage_seconds_sum{{stage="{label}"}} {h.total}')
+                lines.append(f'pcbuilder_stage_seconds_count{{stage="{label}"}} {h.count}')
+            if self._counters:
+                lines += [
+                    "# HELP pcbuilder_events_total Счётчики событий сборки",
+                    "# TYPE pcbuilder_events_total counter",
+                ]
+                for name, value in sorted(self._counters.items()):
+                    label = name.replace("\\", "\\\\").replace('"', '\\"')
+                    lines.append(f'pcbuilder_events_total{{event="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+
+
+REGISTRY = Registry()
+
+
+# ══════════════════════════════════════════════════════════
+#  SPAN'Ы
+# ══════════════════════════════════════════════════════════
+
+class span:
+    """Контекстный менеджер: замер этапа stage в REGISTRY."""
+
+    __slots__ = ("stage", "_t0", "_token")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> "span":
+        if METRICS_ENABLED:
+            self._token = _current_stage.set(self.stage)
+            self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not METRICS_ENABLED:
+            return
+        elapsed = time.perf_counter() - self._t0
+        _current_stage.reset(self._token)
+        REGISTRY.observe(self.stage, elapsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("span %s (в %s): %.2f мс", self.stage, _current_stage.get(), elapsed * 1000)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Прибавляет value к счётчику name (если метрики включены)."""
+    if METRICS_ENABLED:
+        REGISTRY.inc(name, value)
+
+
+def current_stage() -> Optional[str]:
+    """Имя самого внутреннего открытого span'а в текущем контексте."""
+    return _current_stage.get()
+
+
+def traced(stage: Optional[str] = None) -> Callable:
+    """Декоратор: вся функция — один span (по умолчанию "<модуль>.<функция>")."""
+
+    def decorator(fn: Callable) -> Callable:
+        name = stage or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# ══════════════════════════════════════════════════════════
+#  PROMETHEUS-ЭНДПОИНТ
+# ══════════════════════════════════════════════════════════
+
+async def start_metrics_server(host: str, port: int):
+    """Поднимает GET /metrics на host:port; возвращает aiohttp AppRunner (для cleanup)."""
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text=REGISTRY.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Метрики: http://{host}:{port}/metrics")
+    return runner
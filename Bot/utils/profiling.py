@@ -0,0 +1,264 @@
+"""
+Профилирование по запросу, без перезапуска.
+
+    @profiled               # build_pc_with_ai: следующие N вызовов — под профайлером
+    @memory_profiled        # load_components: следующая загрузка — под tracemalloc
+
+Режимы сборок:
+  • cprofile — детерминированный cProfile в потоке сборки; результат —
+    <dir>/builds-<время>.pstats (snakeviz, gprof2dot, flameprof);
+  • sample   — поток-сэмплер снимает стек потока сборки каждые
+    PROFILE_SAMPLE_INTERVAL c; результат — <dir>/builds-<время>.folded
+    (формат flamegraph.pl / speedscope: "a;b;c count"). Накладные расходы
+    почти нулевые, годится для прода.
+
+Память: снимок tracemalloc после load_components → <dir>/load_components-<время>.tracemalloc
+и топ строк по объёму выделений.
+
+Включение: PROFILE_BUILDS=N (+ PROFILE_MODE, PROFILE_MEMORY) при старте или
+админ-команда /profile. Пока профайлер не взведён, обёртка стоит одну проверку.
+"""
+
+import cProfile
+import functools
+import io
+import linecache
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, List, Optional
+
+from Bot.config.runtime_config import (
+    PROFILE_BUILDS, PROFILE_DIR, PROFILE_MEMORY, PROFILE_MODE, PROFILE_SAMPLE_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cprofile", "sample")
+TOP = 15
+
+
+class _Sampler:
+    """Поток, снимающий стеки одного потока в свёрнутом виде (folded stacks)."""
+
+    def __init__(self, thread_id: int, interval: float, stacks: Counter):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = stacks
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+
+class Profiler:
+    def __init__(self):
+        self.mode = "cprofile"
+        self.remaining = 0
+        self.memory = False
+        self.last_report: Optional[str] = None
+        self._lock = threading.Lock()
+        self._done = 0
+        # профилируемые сборки, которые ещё идут (отчёт — когда все досчитаны)
+        self._in_flight = 0
+        self._stats: Optional[pstats.Stats] = None
+        self._stacks: Counter = Counter()
+        self._listeners: List[Callable[[str], None]] = []
+
+    @property
+    def armed(self) -> bool:
+        return self.remaining > 0
+
+    def arm(self, builds: int, mode: str = "cprofile", memory: bool = False,
+            on_done: Optional[Callable[[str], None]] = None) -> None:
+        """Профилировать следующие builds сборок; on_done(отчёт) — после последней (из потока сборки)."""
+        if mode not in MODES:
+            raise ValueError(f"режим профилирования: {', '.join(MODES)}")
+        with self._lock:
+            self.mode = mode
+            self.remaining = builds
+            self.memory = self.memory or memory
+            self._done = 0
+            self._stats = None
+            self._stacks = Counter()
+            self._listeners = [on_done] if on_done else []
+        logger.info(f"Профилирование: следующие {builds} сборок ({mode})" + (", память" if memory else ""))
+
+    def disarm(self) -> None:
+        with self._lock:
+            self.remaining = 0
+            self.memory = False
+            self._listeners = []
+
+    # ── Сборки ───────────────────────────────────────────────
+
+    def _take(self) -> Optional[str]:
+        """Резервирует слот под профилируемую сборку; режим или None."""
+        with self._lock:
+            if self.remaining <= 0:
+                return None
+            self.remaining -= 1
+            self._in_flight += 1
+            return self.mode
+
+    def run(self, fn: Callable, *args, **kwargs):
+        mode = self._take()
+        if mode is None:
+            return fn(*args, **kwargs)
+
+        if mode == "cprofile":
+            prof = cProfile.Profile()
+            try:
+                return prof.runcall(fn, *args, **kwargs)
+            finally:
+                self._collect(prof, None)
+
+        stacks: Counter = Counter()
+        sampler = _Sampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL, stacks)
+        sampler.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.stop()
+            self._collect(None, stacks)
+
+    def _collect(self, prof: Optional[cProfile.Profile], stacks: Optional[Counter]) -> None:
+        with self._lock:
+            if prof is not None:
+                if self._stats is None:
+                    self._stats = pstats.Stats(prof)
+                else:
+                    self._stats.add(prof)
+            if stacks is not None:
+                self._stacks.update(stacks)
+            self._done += 1
+            self._in_flight -= 1
+            if self.remaining > 0 or self._in_flight > 0:
+                return
+            stats, folded, done, listeners = self._stats, self._stacks, self._done, self._listeners
+            self._stats, self._stacks, self._listeners = None, Counter(), []
+
+        report = self._write(stats, folded, done)
+        self.last_report = report
+        logger.info(report)
+        for listener in listeners:
+            listener(report)
+
+    def _write(self, stats: Optional[pstats.Stats], folded: Counter, builds: int) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+
+        if stats is not None:
+            path = os.path.join(PROFILE_DIR, f"builds-{stamp}.pstats")
+            stats.dump_stats(path)
+            buf = io.StringIO()
+            stats.stream = buf
+            # в файле — полные пути, в сообщении — только имена файлов
+            stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP)
+            rows = [line for line in buf.getvalue().splitlines() if line.strip()]
+            # заголовок pstats длинный — оставляем итог и таблицу
+            body = "\n".join(rows[-(TOP + 1):])
+            return f"cProfile, сборок: {builds} → {path}\n{body}"
+
+        path = os.path.join(PROFILE_DIR, f"builds-{stamp}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in folded.most_common():
+                f.write(f"{stack} {count}\n")
+        total = sum(folded.values()) or 1
+        own: Counter = Counter()
+        for stack, count in folded.items():
+            own[stack.rsplit(";", 1)[-1]] += count
+        lines = [f"{count * 100 / total:5.1f}%  {frame}" for frame, count in own.most_common(TOP)]
+        return f"сэмплы: {total}, сборок: {builds} → {path}\n" + "\n".join(lines)
+
+    # ── Память ───────────────────────────────────────────────
+
+    def run_memory(self, label: str, fn: Callable, *args, **kwargs):
+        with self._lock:
+            traced, self.memory = self.memory, False
+        if not traced:
+            return fn(*args, **kwargs)
+        return self._traced_memory(label, fn, *args, **kwargs)[0]
+
+    def measure_memory(self, label: str, fn: Callable, *args, **kwargs) -> str:
+        """Один вызов fn под tracemalloc прямо сейчас (без взвода); возвращает отчёт."""
+        return self._traced_memory(label, fn, *args, **kwargs)[1]
+
+    def _traced_memory(self, label: str, fn: Callable, *args, **kwargs):
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(25)
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if started:
+                tracemalloc.stop()
+            report = self._write_memory(label, snapshot, current, peak)
+            self.last_report = report
+            logger.info(report)
+        return result, report
+
+    def _write_memory(self, label: str, snapshot: tracemalloc.Snapshot, current: int, peak: int) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{label}-{time.strftime('%Y%m%d-%H%M%S')}.tracemalloc")
+        snapshot.dump(path)
+        lines = []
+        for stat in snapshot.statistics("lineno")[:TOP]:
+            frame = stat.traceback[0]
+            code = linecache.getline(frame.filename, frame.lineno).strip()
+            lines.append(f"{stat.size / 1024:9.1f} KiB  {os.path.basename(frame.filename)}:{frame.lineno}  {code[:60]}")
+        return (f"tracemalloc {label}: сейчас {current / 2**20:.1f} МиБ, пик {peak / 2**20:.1f} МиБ → {path}\n"
+                + "\n".join(lines))
+
+
+PROFILER = Profiler()
+if PROFILE_BUILDS or PROFILE_MEMORY:
+    PROFILER.arm(PROFILE_BUILDS, PROFILE_MODE, PROFILE_MEMORY)
+
+
+def profiled(fn: Callable) -> Callable:
+    """Следующие N вызовов fn (PROFILER.arm) идут под профайлером."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.armed:
+            return fn(*args, **kwargs)
+        return PROFILER.run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+def memory_profiled(fn: Callable) -> Callable:
+    """Следующий вызов fn после arm(memory=True) идёт под tracemalloc."""
+    label = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.memory:
+            return fn(*args, **kwargs)
+        return PROFILER.run_memory(label, fn, *args, **kwargs)
+
+    return wrapper
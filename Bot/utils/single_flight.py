@@ -0,0 +1,75 @@
+"""
+Single-flight: защита от повторных и одинаковых одновременных сборок.
+
+  • UserLocks   — не больше одной сборки на пользователя: повторное нажатие
+                  «Все верно», пока сборка идёт, игнорируется;
+  • SingleFlight — одинаковые запросы (бюджет, пресет, предпочтения, версия
+                  каталога), пришедшие, пока такой же уже считается, не
+                  запускают вычисление заново, а ждут общий результат.
+
+Оба работают в пределах процесса; при нескольких процессах (supervisor)
+обновления одного чата всегда попадают в один процесс.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+
+class UserLocks:
+    """Неблокирующие «занято» по user_id."""
+
+    def __init__(self):
+        self._busy: Set[int] = set()
+
+    def acquire(self, user_id: int) -> bool:
+        """True — взяли; False — у пользователя уже идёт сборка."""
+        if user_id in self._busy:
+            return False
+        self._busy.add(user_id)
+        return True
+
+    def release(self, user_id: int) -> None:
+        self._busy.discard(user_id)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._busy
+
+
+class SingleFlight:
+    """
+    Коалесинг по ключу: fn(*args) выполняется в пуле потоков (не блокирует
+    event loop), все вызовы run() с тем же ключом, пришедшие до завершения,
+    получают тот же результат (или то же исключение).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await self.run_in(None, key, fn, *args, **kwargs)
+
+    async def run_in(self, executor: Optional[Executor], key: Hashable, fn: Callable[..., Any],
+                     *args: Any, **kwargs: Any) -> Any:
+        """Как run, но новое вычисление идёт в executor (None — пул потоков цикла)."""
+        fut = self._inflight.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f, k=key: self._forget(k, f))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        # shield: отмена одного ожидающего не отменяет вычисление для остальных
+        return await asyncio.shield(fut)
+
+    def _forget(self, key: Hashable, fut: asyncio.Future) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+
+    def __len__(self) -> int:
+        return len(self._inflight)
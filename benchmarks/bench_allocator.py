@@ -0,0 +1,89 @@
+"""
+Режимы BudgetAllocator на реальном каталоге: сколько срезаний квот нужно
+build_pc после первой сборки и сколько бюджета остаётся неиспользованным.
+
+Для каждого режима (profile, learned, catalog, learned+catalog) — сетка
+бюджет × пресет, сборка build_pc с профилем и ступенями режима (подменой
+profile_for / tiers_for в pc_builder); счётчики build_pc.shave_iterations /
+build_pc.shaved / build_pc.tiers_fallback из REGISTRY, остаток
+(бюджет − итог), перебор итога, средний ранг GPU и ядра CPU.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_allocator [--step 25000] [--max 3000000] [--json out.json]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from Bot.services import pc_builder
+from Bot.services.budget_allocator import DEFAULT_PROFILE, PriceTiers, learn_profile
+from Bot.services.catalog import Catalog
+from Bot.services.pc_builder_pick import _get, _gpu_model_rank
+from Bot.utils.metrics import REGISTRY
+
+PRESETS = ("gaming", "work", "universal")
+
+
+def run_mode(catalog: Catalog, mode: str, budgets: List[int]) -> Dict:
+    profile = learn_profile(catalog) if "learned" in mode else DEFAULT_PROFILE
+    tiers = PriceTiers(catalog) if "catalog" in mode else None
+
+    pc_builder.profile_for = lambda _parts: profile
+    pc_builder.tiers_for = lambda _parts: tiers
+
+    REGISTRY.reset()
+    remainders, gpu_ranks, cpu_cores, over = [], [], [], 0
+    start = time.perf_counter()
+    for preset in PRESETS:
+        for budget in budgets:
+            build = pc_builder.build_pc(budget, preset, catalog)
+            total = pc_builder._total_price(build)
+            over += total > budget
+            remainders.append((budget - total) / budget)
+            gpu_ranks.append(_gpu_model_rank(build["gpu"]) if build.get("gpu") else 0)
+            cpu_cores.append(_get(build.get("cpu"), "specs", "cores", default=0))
+    elapsed = time.perf_counter() - start
+
+    counters = REGISTRY.counters()
+    builds = counters.get("build_pc.builds", 0) or 1
+    return {
+        "builds": builds,
+        "shaved_share": round(counters.get("build_pc.shaved", 0) / builds, 3),
+        "shave_iterations_avg": round(counters.get("build_pc.shave_iterations", 0) / builds, 3),
+        "tiers_fallback_share": round(counters.get("build_pc.tiers_fallback", 0) / builds, 3),
+        "over_budget": over,
+        "remainder_avg_pct": round(statistics.mean(remainders) * 100, 2),
+        "remainder_p90_pct": round(sorted(remainders)[int(len(remainders) * 0.9)] * 100, 2),
+        "gpu_rank_avg": round(statistics.mean(gpu_ranks), 1),
+        "cpu_cores_avg": round(statistics.mean(cpu_cores), 1),
+        "ms_per_build": round(elapsed / builds * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min", type=int, default=150_000)
+    parser.add_argument("--max", type=int, default=3_000_000)
+    parser.add_argument("--step", type=int, default=25_000)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    catalog = Catalog()
+    budgets = list(range(args.min, args.max + 1, args.step))
+    results = {mode: run_mode(catalog, mode, budgets)
+               for mode in ("profile", "learned", "catalog", "learned+catalog")}
+
+    columns = list(next(iter(results.values())))
+    print(f"{'режим':<16}" + "".join(f"{c:>22}" for c in columns))
+    for mode, r in results.items():
+        print(f"{mode:<16}" + "".join(f"{r[c]:>22}" for c in columns))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
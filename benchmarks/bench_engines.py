@@ -0,0 +1,279 @@
+"""
+Воспроизводимый бенчмарк движков сборки.
+
+Каталоги: поставляемый Bot/data/components (x1) и синтетические x10/x100 —
+каждая позиция размножается с суффиксом в названии и ценой ±5% (seed
+фиксирован), файлы пишутся во временную папку в исходном формате прайса,
+так что load_components меряется на настоящем разборе.
+
+Для каждого каталога замеряются:
+  • load_components и Catalog (загрузка + колонки);
+  • BudgetAllocator по сетке бюджет × пресет;
+  • каждая pick_* на аргументах, которые ей передаёт build_pc на той же сетке;
+  • build_pc по сетке;
+  • ИИ-конвейер AIPcBuilder со StubAIService (без сети; ответы — как у
+    benchmarks.stub_llm, один раунд доработки) — время конвейера без учёта LLM
+    плюс разбивка по этапам из Bot.utils.metrics.
+
+Результат — JSON (--json), для сравнения между коммитами:
+    python -m benchmarks.bench_engines --json before.json
+    python -m benchmarks.bench_engines --json after.json --compare before.json
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_engines [--scales 1,10,100] [--repeat 5] [--ai-latency 0]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from Bot.services.ai_pc_builder import AIPcBuilder
+from Bot.services.budget_allocator import BudgetAllocator
+from Bot.services.catalog import Catalog
+from Bot.services.catalog_columns import columnar_available
+from Bot.services.component_loader import COMPONENTS_DIR, load_components
+from Bot.services.pc_builder import build_pc
+from Bot.services.pc_builder_pick import (
+    pick_case, pick_cooler, pick_cpu, pick_gpu,
+    pick_motherboard, pick_psu, pick_ram, pick_ssd,
+)
+from Bot.utils.metrics import REGISTRY
+from benchmarks.stub_llm import answer
+
+PRESETS = ("gaming", "work", "universal")
+BUDGETS = list(range(150_000, 1_500_001, 50_000))
+AI_BUDGETS = (250_000, 500_000, 900_000, 1_400_000)
+AI_PREFERENCES = (
+    {},
+    {"cpu_brand": "amd", "gpu_brand": "nvidia", "need_gpu": True},
+    {"cpu_brand": "intel", "need_gpu": False},
+)
+
+
+# ══════════════════════════════════════════════════════════
+#  КАТАЛОГИ
+# ══════════════════════════════════════════════════════════
+
+def write_scaled_catalog(scale: int, dest: str, seed: int = 0) -> None:
+    """Копия поставляемого прайса, где каждая позиция повторена scale раз."""
+    rnd = random.Random(seed)
+    for src in sorted(Path(COMPONENTS_DIR).glob("*.json")):
+        raw = json.loads(src.read_text(encoding="utf-8"))
+        items = raw if isinstance(raw, list) else list(raw.values())
+        out = []
+        for item in items:
+            out.append(item)
+            for k in range(1, scale):
+                copy = dict(item)
+                copy["name"] = f"{item.get('name', '')} #{k}"
+                if isinstance(item.get("price"), (int, float)):
+                    copy["price"] = max(1, int(item["price"] * rnd.uniform(0.95, 1.05)))
+                out.append(copy)
+        Path(dest, src.name).write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАГЛУШКА LLM
+# ══════════════════════════════════════════════════════════
+
+class StubAIService:
+    """
+    AIService без сети: ответы — benchmarks.stub_llm.answer, проверка баланса
+    говорит «GPU слабая» в первом раунде каждой сборки, затем «ок».
+    latency — имитация задержки LLM на каждый вызов, секунды.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._checks = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_completion(self, prompt: str, use_json_format: bool = True, step: Optional[str] = None) -> Optional[str]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        unbalanced = False
+        if prompt.startswith("Оцени сборку"):
+            self._checks += 1
+            unbalanced = bool(self._checks % 2)
+        return answer(prompt, unbalanced)
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАМЕРЫ
+# ══════════════════════════════════════════════════════════
+
+def _measure(fn: Callable[[], Any], repeat: int, calls: int = 1) -> Dict[str, float]:
+    """Время одного вызова (мкс): min/median по repeat прогонам fn, fn делает calls вызовов."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) / calls * 1e6)
+    return {"min_us": round(min(runs), 2), "median_us": round(statistics.median(runs), 2), "calls": calls}
+
+
+def _pick_args(catalog: Catalog) -> Dict[str, List[tuple]]:
+    """Аргументы каждой pick_* в том виде, в каком их передаёт build_pc на сетке."""
+    args: Dict[str, List[tuple]] = {name: [] for name in
+                                    ("cpu", "motherboard", "ram", "gpu", "ssd", "psu", "cooler", "case")}
+    for preset in PRESETS:
+        for budget in BUDGETS:
+            b = BudgetAllocator(budget, preset).get_budgets()
+            cpu = pick_cpu(catalog["cpu"], b["cpu"])
+            mobo = pick_motherboard(catalog["motherboard"], cpu, b["motherboard"])
+            gpu = pick_gpu(catalog["gpu"], b["gpu"])
+            args["cpu"].append((catalog["cpu"], b["cpu"]))
+            args["motherboard"].append((catalog["motherboard"], cpu, b["motherboard"]))
+            args["ram"].append((catalog["ram"], mobo, b["ram"]))
+            args["gpu"].append((catalog["gpu"], b["gpu"]))
+            args["ssd"].append((catalog["ssd"], b["ssd"]))
+            args["psu"].append((catalog["psu"], cpu, gpu, b["psu"]))
+            args["cooler"].append((catalog["coolers"], cpu, b["coolers"]))
+            args["case"].append((catalog["case"], mobo, b["case"]))
+    return args
+
+
+_PICKS = {
+    "cpu": pick_cpu, "motherboard": pick_motherboard, "ram": pick_ram, "gpu": pick_gpu,
+    "ssd": pick_ssd, "psu": pick_psu, "cooler": pick_cooler, "case": pick_case,
+}
+
+
+def bench_catalog(path: str, repeat: int, ai_latency: float) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    grid = [(b, p) for p in PRESETS for b in BUDGETS]
+
+    parts = load_components(path)
+    result["items"] = {cat: len(items) for cat, items in sorted(parts.items())}
+    result["load_components"] = _measure(lambda: load_components(path), repeat)
+    result["catalog_load"] = _measure(lambda: Catalog(path), repeat)
+
+    catalog = Catalog(path)
+    result["budget_allocator"] = _measure(
+        lambda: [BudgetAllocator(b, p).get_budgets() for b, p in grid], repeat, len(grid))
+
+    result["pick"] = {}
+    for name, calls in _pick_args(catalog).items():
+        fn = _PICKS[name]
+        result["pick"][name] = _measure(lambda: [fn(*a) for a in calls], repeat, len(calls))
+
+    result["build_pc"] = _measure(lambda: [build_pc(b, p, catalog) for b, p in grid], repeat, len(grid))
+
+    ai_grid = [(b, p, prefs) for p in PRESETS for b in AI_BUDGETS for prefs in AI_PREFERENCES]
+    stub = StubAIService(latency=ai_latency)
+    builder = AIPcBuilder(ai_service=stub)
+    for b, p, prefs in ai_grid:  # прогрев кэшей представлений каталога
+        builder.build_pc(b, p, catalog, dict(prefs))
+    REGISTRY.reset()
+    stub.calls = 0
+    ai_repeat = max(1, repeat // 2)
+    result["ai_pipeline"] = _measure(
+        lambda: [builder.build_pc(b, p, catalog, dict(prefs)) for b, p, prefs in ai_grid],
+        ai_repeat, len(ai_grid))
+    result["ai_pipeline"]["llm_calls_per_build"] = stub.calls / (ai_repeat * len(ai_grid))
+    result["ai_stages"] = {
+        stage: {"count": s["count"], "mean_us": round(s["sum"] / s["count"] * 1e6, 2)}
+        for stage, s in REGISTRY.summary().items() if s["count"]
+    }
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales: List[int], repeat: int, ai_latency: float, seed: int = 0) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "columnar": columnar_available(),
+            "repeat": repeat,
+            "ai_latency": ai_latency,
+            "seed": seed,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "catalogs": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="pcbench_") as tmp:
+        for scale in scales:
+            path = COMPONENTS_DIR
+            if scale != 1:
+                path = os.path.join(tmp, f"x{scale}")
+                os.makedirs(path)
+                write_scaled_catalog(scale, path, seed)
+            print(f"x{scale}...", file=sys.stderr)
+            report["catalogs"][f"x{scale}"] = bench_catalog(path, repeat, ai_latency)
+    return report
+
+
+# ══════════════════════════════════════════════════════════
+#  СРАВНЕНИЕ
+# ══════════════════════════════════════════════════════════
+
+def _flatten(node: Any, prefix: str = "") -> Dict[str, float]:
+    """{"x10.pick.cpu": median_us, ...} — по всем замерам отчёта."""
+    out: Dict[str, float] = {}
+    if isinstance(node, dict):
+        if "median_us" in node:
+            out[prefix] = node["median_us"]
+        elif "mean_us" in node:
+            out[prefix] = node["mean_us"]
+        else:
+            for key, value in node.items():
+                out.update(_flatten(value, f"{prefix}.{key}" if prefix else key))
+    return out
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    before, after = _flatten(old["catalogs"]), _flatten(new["catalogs"])
+    lines = [f"{'замер':<60} {'было µs':>12} {'стало µs':>12} {'x':>7}"]
+    for key in sorted(before.keys() & after.keys()):
+        ratio = after[key] / before[key] if before[key] else float("inf")
+        lines.append(f"{key:<60} {before[key]:>12.1f} {after[key]:>12.1f} {ratio:>7.2f}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ai-latency", type=float, default=0.0, help="задержка заглушки LLM на вызов, c")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--compare", dest="compare_path", help="предыдущий отчёт для сравнения")
+    args = parser.parse_args()
+
+    report = run([int(s) for s in args.scales.split(",")], args.repeat, args.ai_latency, args.seed)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare_path:
+        with open(args.compare_path, encoding="utf-8") as f:
+            print("\n".join(compare(json.load(f), report)))
+
+
+if __name__ == "__main__":
+    main()
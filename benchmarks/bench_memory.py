@@ -0,0 +1,80 @@
+"""
+Память каталога: сколько занимают позиции после load_components.
+
+Замер через tracemalloc: разница между памятью до загрузки и после (парсинг
+JSON и временные объекты уже освобождены), плюс размер снапшота
+(catalog_snapshot) — его pickle пропорционален представлению позиций.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_memory [--scales 1,10] [--json out.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+from typing import Dict, List
+
+from Bot.services.catalog import Catalog
+from Bot.services.catalog_snapshot import write_snapshot
+from Bot.services.component_loader import COMPONENTS_DIR, load_components
+from benchmarks.bench_engines import write_scaled_catalog
+
+
+def measure(path: str) -> Dict:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    parts = load_components(path)
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    items = sum(len(v) for v in parts.values())
+    with tempfile.TemporaryDirectory() as tmp:
+        snap = os.path.join(tmp, "catalog.snap")
+        write_snapshot(Catalog(path), snap)
+        snapshot_bytes = os.path.getsize(snap)
+
+    return {
+        "items": items,
+        "catalog_bytes": after - before,
+        "bytes_per_item": round((after - before) / items, 1) if items else 0,
+        "peak_bytes": peak - before,
+        "snapshot_bytes": snapshot_bytes,
+    }
+
+
+def run(scales: List[int]) -> Dict[str, Dict]:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="pcmem_") as tmp:
+        for scale in scales:
+            path = COMPONENTS_DIR
+            if scale != 1:
+                path = os.path.join(tmp, f"x{scale}")
+                os.makedirs(path)
+                write_scaled_catalog(scale, path)
+            results[f"x{scale}"] = measure(path)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10")
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = run([int(s) for s in args.scales.split(",")])
+    print(f"{'каталог':>8} {'позиций':>8} {'память, КиБ':>12} {'байт/поз.':>10} {'пик, КиБ':>10} {'снапшот, КиБ':>13}")
+    for name, r in results.items():
+        print(f"{name:>8} {r['items']:>8} {r['catalog_bytes'] / 1024:>12.1f} {r['bytes_per_item']:>10.1f} "
+              f"{r['peak_bytes'] / 1024:>10.1f} {r['snapshot_bytes'] / 1024:>13.1f}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Бенчмарк выбора шорт-листа около цены (_pick_around_price / _pick_alternatives).
+
+Сравнивает прежний алгоритм (полная сортировка + линейный поиск ближайшей цены)
+с bisect по готовому массиву цен CatalogView на синтетических категориях
+от 100 до 100k позиций.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_shortlist [--sizes 100,1000,10000,100000] [--json out.json]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from Bot.services.ai_pc_builder import _name, _pick_alternatives, _pick_around_price, _price
+from Bot.services.catalog import CatalogView
+
+
+def _legacy_pick_around_price(items: List[dict], target: int, count: int = 5) -> List[dict]:
+    sorted_items = sorted(items, key=_price)
+    idx   = min(range(len(sorted_items)), key=lambda i: abs(_price(sorted_items[i]) - target))
+    start = max(0, idx - count // 2)
+    end   = min(len(sorted_items), start + count)
+    start = max(0, end - count)
+    seen, result = set(), []
+    for item in sorted_items[start:end]:
+        key = _name(item)[:45]
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+def _legacy_pick_alternatives(items, exclude_names, target, count=5):
+    exclude_set = {n[:45].upper() for n in exclude_names}
+    candidates  = [i for i in items if _name(i)[:45] not in exclude_set]
+    return _legacy_pick_around_price(candidates, target, count)
+
+
+def synthetic_items(size: int, seed: int = 0) -> List[dict]:
+    """Отсортированные по цене позиции; ~10% имён повторяются (как разные цены одного SKU)."""
+    rnd = random.Random(seed)
+    items = []
+    for i in range(size):
+        sku = rnd.randrange(int(size * 0.9) + 1)
+        items.append({"name": f"Synthetic part SKU-{sku:06d} rev {sku % 7}", "price": rnd.randrange(5_000, 1_500_000)})
+    items.sort(key=_price)
+    return items
+
+
+def _time(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(sizes: List[int], calls: int = 200) -> List[Dict]:
+    results = []
+    for size in sizes:
+        items   = synthetic_items(size)
+        view    = CatalogView(items)
+        rnd     = random.Random(size)
+        targets = [rnd.randrange(5_000, 1_500_000) for _ in range(calls)]
+        exclude = [i["name"] for i in items[:: max(1, size // 5)]][:5]
+        legacy_calls = max(1, min(calls, 2_000_000 // size))
+
+        row = {
+            "size": size,
+            "legacy_around_us":  _time(lambda: [_legacy_pick_around_price(items, t) for t in targets[:legacy_calls]], 1) / legacy_calls * 1e6,
+            "bisect_around_us":  _time(lambda: [_pick_around_price(view, t) for t in targets], 1) / calls * 1e6,
+            "legacy_alts_us":    _time(lambda: [_legacy_pick_alternatives(items, exclude, t) for t in targets[:legacy_calls]], 1) / legacy_calls * 1e6,
+            "bisect_alts_us":    _time(lambda: [_pick_alternatives(view, exclude, t) for t in targets], 1) / calls * 1e6,
+        }
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000,100000")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = run([int(s) for s in args.sizes.split(",")], args.calls)
+    print(f"{'size':>8} {'legacy µs':>12} {'bisect µs':>12} {'legacy alt µs':>14} {'bisect alt µs':>14}")
+    for r in results:
+        print(f"{r['size']:>8} {r['legacy_around_us']:>12.1f} {r['bisect_around_us']:>12.1f} "
+              f"{r['legacy_alts_us']:>14.1f} {r['bisect_alts_us']:>14.1f}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
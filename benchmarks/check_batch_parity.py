@@ -0,0 +1,91 @@
+"""
+Проверка паритета пакетной сборки (build_many) с build_pc во всех режимах
+BudgetAllocator (profile, learned, catalog, learned+catalog).
+
+Для каждого режима — отдельный процесс с BUDGET_ALLOCATOR (режим читается
+при импорте): сетка бюджет × пресет × предпочтения, build_many в текущем
+процессе и через пул сравнивается с build_pc на тех же списках (у CPU/GPU
+отброшен другой бренд, без GPU — пустой список). Плюс сборки дороже бюджета.
+Любое расхождение печатается, код возврата 1.
+
+Запуск из корня репозитория:
+    python -m benchmarks.check_batch_parity [--step 25000] [--max 2000000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Optional
+
+MODES = ("profile", "learned", "catalog", "learned,catalog")
+PREFERENCES = (None, {"cpu_brand": "AMD"}, {"cpu_brand": "INTEL", "gpu_brand": "NVIDIA"}, {"need_gpu": False})
+
+
+def _parts(catalog: dict, preferences: Optional[dict]) -> dict:
+    from Bot.services.ai_pc_builder import _brand_filter
+
+    preferences = preferences or {}
+    parts = {}
+    for cat, items in catalog.items():
+        if cat == "gpu" and preferences.get("need_gpu") is False:
+            items = []
+        elif cat in ("cpu", "gpu"):
+            items = _brand_filter(items, cat, preferences)
+        parts[cat] = items
+    return parts
+
+
+def check_mode(budgets: List[int]) -> List[str]:
+    """Расхождения в текущем режиме (BUDGET_ALLOCATOR уже выставлен)."""
+    from Bot.services import pc_builder
+    from Bot.services.batch_builder import build_many
+    from Bot.services.budget_allocator import profile_for, tiers_for
+    from Bot.services.catalog import Catalog
+
+    catalog = Catalog()
+    # build_pc на отфильтрованных списках берёт профиль и ступени всего каталога, как пакет
+    profile, tiers = profile_for(catalog), tiers_for(catalog)
+
+    errors = []
+    for preferences in PREFERENCES:
+        requests = [(b, p, preferences) for p in ("gaming", "work", "universal") for b in budgets]
+        parts = _parts(catalog, preferences)
+        expected = [pc_builder.build_pc(b, p, parts, profile=profile, tiers=tiers) for b, p, _ in requests]
+        for label, workers in (("1 процесс", 1), ("пул", 2)):
+            got = build_many(requests, catalog, workers=workers)
+            for (budget, preset, _), a, b in zip(requests, got, expected):
+                if a != b:
+                    errors.append(f"{label} {preset}@{budget} {preferences}: build_many != build_pc")
+        for (budget, preset, _), build in zip(requests, expected):
+            total = pc_builder._total_price(build)
+            if total > budget:
+                errors.append(f"перебор {preset}@{budget} {preferences}: {total}")
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min", type=int, default=150_000)
+    parser.add_argument("--max", type=int, default=2_000_000)
+    parser.add_argument("--step", type=int, default=25_000)
+    parser.add_argument("--mode", help="проверить только текущий процесс (служебный)", action="store_true")
+    args = parser.parse_args()
+
+    if args.mode:
+        errors = check_mode(list(range(args.min, args.max + 1, args.step)))
+        for e in errors[:50]:
+            print(e)
+        print(f"{os.environ.get('BUDGET_ALLOCATOR', 'profile')}: расхождений {len(errors)}")
+        return 1 if errors else 0
+
+    failed = False
+    for mode in MODES:
+        cmd = [sys.executable, "-m", "benchmarks.check_batch_parity", "--mode",
+               "--min", str(args.min), "--max", str(args.max), "--step", str(args.step)]
+        failed |= subprocess.run(cmd, env={**os.environ, "BUDGET_ALLOCATOR": mode}).returncode != 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
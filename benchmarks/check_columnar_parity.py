@@ -0,0 +1,127 @@
+"""
+Проверка паритета колоночного (NumPy) бэкенда со списочной реализацией pick_*.
+
+Каждая pick_* вызывается дважды — на обычном списке и на CatalogView с колонками —
+для реального каталога и для случайных каталогов с большим числом совпадающих
+ключей (проверка tie-break). Плюс build_pc по сетке бюджет × пресет.
+Любое расхождение печатается, код возврата 1.
+
+Запуск из корня репозитория:
+    python -m benchmarks.check_columnar_parity [--random-catalogs 200]
+"""
+
+import argparse
+import random
+import sys
+from typing import Dict, List
+
+from Bot.services.catalog import CatalogView
+from Bot.services.catalog_columns import columnar_available
+from Bot.services.component_loader import load_components
+from Bot.services.pc_builder import build_pc
+from Bot.services.pc_builder_pick import (
+    pick_case, pick_cooler, pick_cpu, pick_gpu,
+    pick_motherboard, pick_psu, pick_ram, pick_ssd,
+)
+
+_SOCKETS = [None, "AM4", "AM5", "LGA1700"]
+_DDR = [None, "DDR4", "DDR5"]
+_FF = [None, "ATX", "mATX", "ITX", "m-atx"]
+
+
+def _random_item(rnd: random.Random, category: str, i: int) -> Dict:
+    price = rnd.choice([5_000, 10_000, 20_000, 20_000, 40_000, 80_000, 150_000])
+    gpu = rnd.choice(["RTX 5060", "RTX 5070 Ti", "RX 9060 XT", "GTX 1660 Super", "GT 710", ""])
+    cert = rnd.choice(["", "Bronze", "Gold", "Platinum"])
+    cool = rnd.choice(["", "AIO", "Tower"])
+    specs = {
+        "cores": rnd.choice([4, 6, 8]), "threads": rnd.choice([8, 12, 16]),
+        "tdp": rnd.choice([65, 105, 180, 250]), "socket": rnd.choice(_SOCKETS),
+        "ram_type": rnd.choice(_DDR), "ddr": rnd.choice(_DDR),
+        "formfactor": rnd.choice(_FF), "form_factor": rnd.choice(_FF),
+        "capacity_gb": rnd.choice([16, 32, 512, 1000]), "mhz": rnd.choice([3200, 6000]),
+        "vram_gb": rnd.choice([8, 12, 16]), "gddr": rnd.choice([6, 7]),
+        "watt": rnd.choice([400, 550, 650, 850, 1000]), "interface": rnd.choice([None, "NVMe", "SATA"]),
+        "water": rnd.random() < 0.2, "psu_watts": rnd.choice([None, None, 450]),
+        "fans_count": rnd.choice([0, 0, 3]),
+    }
+    # у кулеров extract_cooler_specs кладёт tdp=None; прочие ключи иногда отсутствуют
+    if category == "coolers" and rnd.random() < 0.3:
+        specs["tdp"] = None
+    for key in rnd.sample(sorted(specs), 3):
+        if not (category == "coolers" and key == "tdp"):
+            specs.pop(key)
+    return {"name": f"{category} {gpu} {cert} {cool} #{i}", "price": price, "category": category, "specs": specs}
+
+
+def _random_catalog(rnd: random.Random) -> Dict[str, List[Dict]]:
+    cats = ["cpu", "motherboard", "ram", "gpu", "ssd", "psu", "coolers", "case"]
+    return {c: sorted((_random_item(rnd, c, i) for i in range(rnd.randint(1, 25))), key=lambda x: x["price"])
+            for c in cats}
+
+
+def _columnar(parts: Dict[str, List[Dict]]) -> Dict[str, CatalogView]:
+    return {c: CatalogView(items) for c, items in parts.items()}
+
+
+def _check_picks(plain: Dict, cols: Dict, budgets: List[int], rnd: random.Random) -> List[str]:
+    errors = []
+    deps_cpu = [None] + plain["cpu"][:3] + plain["cpu"][-2:]
+    deps_mobo = [None] + plain["motherboard"][:3] + plain["motherboard"][-2:]
+    deps_gpu = [None] + plain["gpu"][:3] + plain["gpu"][-2:]
+
+    def same(label, a, b):
+        if a is not b:
+            errors.append(f"{label}: list={a and a['name']!r} columnar={b and b['name']!r}")
+
+    for budget in budgets:
+        same(f"cpu@{budget}", pick_cpu(plain["cpu"], budget), pick_cpu(cols["cpu"], budget))
+        same(f"gpu@{budget}", pick_gpu(plain["gpu"], budget), pick_gpu(cols["gpu"], budget))
+        same(f"ssd@{budget}", pick_ssd(plain["ssd"], budget), pick_ssd(cols["ssd"], budget))
+        for cpu in deps_cpu:
+            same(f"mobo@{budget}", pick_motherboard(plain["motherboard"], cpu, budget),
+                 pick_motherboard(cols["motherboard"], cpu, budget))
+            same(f"cooler@{budget}", pick_cooler(plain["coolers"], cpu, budget),
+                 pick_cooler(cols["coolers"], cpu, budget))
+            gpu = rnd.choice(deps_gpu)
+            same(f"psu@{budget}", pick_psu(plain["psu"], cpu, gpu, budget),
+                 pick_psu(cols["psu"], cpu, gpu, budget))
+        for mobo in deps_mobo:
+            same(f"ram@{budget}", pick_ram(plain["ram"], mobo, budget), pick_ram(cols["ram"], mobo, budget))
+            same(f"case@{budget}", pick_case(plain["case"], mobo, budget), pick_case(cols["case"], mobo, budget))
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--random-catalogs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not columnar_available():
+        print("NumPy недоступен или CATALOG_COLUMNAR=false — проверять нечего")
+        return 1
+
+    rnd = random.Random(args.seed)
+    errors: List[str] = []
+
+    plain = load_components()
+    cols = _columnar(plain)
+    errors += _check_picks(plain, cols, list(range(0, 1_500_001, 5_000)), rnd)
+    for preset in ("gaming", "work", "universal"):
+        for budget in range(100_000, 3_000_001, 25_000):
+            if build_pc(budget, preset, plain) != build_pc(budget, preset, cols):
+                errors.append(f"build_pc {preset}@{budget}")
+
+    for _ in range(args.random_catalogs):
+        plain = _random_catalog(rnd)
+        errors += _check_picks(plain, _columnar(plain), [0, 4_999, 5_000, 19_999, 20_000, 60_000, 200_000], rnd)
+
+    for e in errors[:50]:
+        print(e)
+    print(f"расхождений: {len(errors)}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
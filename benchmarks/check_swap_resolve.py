@@ -0,0 +1,45 @@
+"""
+Проверка сопоставления сборок ИИ с каталогом (component_swap.resolve_build).
+
+Каждая позиция каталога превращается в элемент сборки ИИ — словарь
+{"name": name[:50], "price": цена, "code": ""}, как его возвращает модель, —
+и прогоняется через resolve_build. Позиция должна вернуться сама (тот же SKU
+и цена) или остаться несопоставленной; другая позиция каталога — ошибка.
+Любая ошибка печатается, код возврата 1.
+
+Запуск из корня репозитория:
+    python -m benchmarks.check_swap_resolve [--name-len 50]
+"""
+
+import argparse
+import sys
+
+from Bot.services.catalog import Catalog
+from Bot.services.component_swap import SWAPPABLE, _catalog_category, resolve_build
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name-len", type=int, default=50, help="длина названия в ответе ИИ")
+    args = parser.parse_args()
+
+    catalog = Catalog()
+    errors, total, unresolved = [], 0, 0
+    for category in SWAPPABLE:
+        for item in catalog.get(_catalog_category(category)) or []:
+            total += 1
+            ai_item = {"name": item["name"][:args.name_len], "price": item["price"], "code": ""}
+            got = resolve_build(catalog, {category: ai_item})[category]
+            if got is ai_item:
+                unresolved += 1
+            elif got["name"] != item["name"] or got["price"] != item["price"]:
+                errors.append(f"{category}: {item['name']!r} {item['price']} → {got['name']!r} {got['price']}")
+
+    for e in errors[:50]:
+        print(e)
+    print(f"позиций {total}, чужих {len(errors)}, несопоставленных {unresolved}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Фальшивый Telegram для локальных прогонов: Bot API-сервер и генератор обновлений.
+
+fake_bot_api_app() отвечает на любой метод Bot API как настоящий сервер
+(send*/edit* → объект Message, остальное → True) и считает вызовы. Бот
+направляется на него через TELEGRAM_API_BASE=http://127.0.0.1:<port>.
+
+conversation(chat_id, budget, preset) — обновления одного полного диалога
+сборки: /start → «Собрать ПК» → бюджет → назначение → предпочтения → подтверждение.
+"""
+
+import itertools
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+_update_ids = itertools.count(1)
+_message_ids = itertools.count(1)
+
+_USAGE_TEXT = {"gaming": "🎮 Игры", "work": "💼 Работа", "universal": "🔄 Универсальный"}
+
+
+# ══════════════════════════════════════════════════════════
+#  ОБНОВЛЕНИЯ
+# ══════════════════════════════════════════════════════════
+
+def _user(chat_id: int) -> Dict[str, Any]:
+    return {"id": chat_id, "is_bot": False, "first_name": f"load{chat_id}"}
+
+
+def _chat(chat_id: int) -> Dict[str, Any]:
+    return {"id": chat_id, "type": "private", "first_name": f"load{chat_id}"}
+
+
+def message_update(chat_id: int, text: str) -> Dict[str, Any]:
+    message = {
+        "message_id": next(_message_ids),
+        "date": int(time.time()),
+        "chat": _chat(chat_id),
+        "from": _user(chat_id),
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": next(_update_ids), "message": message}
+
+
+def callback_update(chat_id: int, data: str) -> Dict[str, Any]:
+    return {
+        "update_id": next(_update_ids),
+        "callback_query": {
+            "id": str(next(_update_ids)),
+            "chat_instance": str(chat_id),
+            "from": _user(chat_id),
+            "data": data,
+            "message": {
+                "message_id": next(_message_ids),
+                "date": int(time.time()),
+                "chat": _chat(chat_id),
+                "from": {"id": 1, "is_bot": True, "first_name": "bot"},
+                "text": "…",
+            },
+        },
+    }
+
+
+def conversation(chat_id: int, budget: int = 350_000, preset: str = "gaming") -> List[Dict[str, Any]]:
+    """Обновления полного диалога сборки для одного чата."""
+    updates = [
+        message_update(chat_id, "/start"),
+        message_update(chat_id, "🖥 Собрать ПК"),
+        message_update(chat_id, str(budget)),
+        message_update(chat_id, _USAGE_TEXT[preset]),
+        callback_update(chat_id, "pref_cpu_any"),
+    ]
+    if preset == "work":
+        updates.append(callback_update(chat_id, "pref_gpu_need_yes"))
+    updates.append(callback_update(chat_id, "pref_gpu_brand_any"))
+    updates.append(callback_update(chat_id, "pref_confirm"))
+    return updates
+
+
+# ══════════════════════════════════════════════════════════
+#  BOT API
+# ══════════════════════════════════════════════════════════
+
+def fake_bot_api_app(calls: Counter) -> web.Application:
+    """aiohttp-приложение, изображающее api.telegram.org; calls[method] += 1 на каждый вызов."""
+
+    async def handle(request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        calls[method] += 1
+        form = await request.post() if request.can_read_body else {}
+        if method.startswith(("send", "edit")):
+            chat_id = int(form.get("chat_id") or 0)
+            result: Any = {
+                "message_id": next(_message_ids),
+                "date": int(time.time()),
+                "chat": _chat(chat_id),
+                "from": {"id": 1, "is_bot": True, "first_name": "bot"},
+                "text": form.get("text", ""),
+            }
+        elif method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "bot", "username": "fake_bot"}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application()
+    app.router.add_route("*", "/bot{token}/{method}", handle)
+    return app
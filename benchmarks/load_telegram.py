@@ -0,0 +1,211 @@
+"""
+Синтетическая нагрузка на весь стек роутеров: сколько сборок в секунду выдержим.
+
+Пользователи приходят пуассоновским потоком (--rate в секунду, --duration
+секунд) и проходят полный диалог fake_telegram.conversation:
+/start → «Собрать ПК» → бюджет → назначение (BuildPC) → предпочтения
+(PreferencesState) → pref_confirm. Обновления подаются в настоящий
+Dispatcher (create_dispatcher) в том же процессе; бот работает через
+FakeSession — исходящие вызовы Bot API не уходят в сеть, а считаются.
+
+Отчёт (JSON): устойчивые сборок/с, задержка обработчиков по шагам диалога
+(p50/p95/p99), лаг event loop (замер переспа таймера), число вызовов Bot API
+и разбивка по этапам сборки из Bot.utils.metrics.
+
+ИИ-шаги: без GROQ_API сборка идёт по стандартному алгоритму; с
+AI_BASE_URL=http://127.0.0.1:8090 (python -m benchmarks.stub_llm) — через
+заглушку LLM с её задержками и ошибками.
+
+Запуск из корня репозитория:
+    python -m benchmarks.load_telegram [--rate 20] [--duration 30] [--think 0] [--json out.json]
+"""
+
+import os
+
+# Нагрузочный прогон не должен писать в рабочие хранилища FSM и предпочтений
+os.environ.setdefault("TOKEN", "1:load")
+os.environ.setdefault("FSM_STORAGE", "memory")
+os.environ.setdefault("PREFS_PERSIST", "false")
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, Message, Update, User
+
+from Bot.runtime.app import create_dispatcher
+from Bot.utils.metrics import REGISTRY
+from benchmarks.fake_telegram import conversation
+
+_STEPS = ("start", "build", "budget", "usage", "pref_cpu", "pref_gpu_need", "pref_gpu_brand", "pref_confirm")
+
+_BOT_USER = User(id=1, is_bot=True, first_name="bot")
+_message_ids = itertools.count(1)
+
+
+# ══════════════════════════════════════════════════════════
+#  FAKE BOT API
+# ══════════════════════════════════════════════════════════
+
+class FakeSession(BaseSession):
+    """Сессия без сети: send*/edit* → Message, getMe → бот, остальное → True."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter = Counter()
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: Optional[int] = None) -> Any:
+        name = method.__api_method__
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if name.startswith(("send", "edit")):
+            chat_id = getattr(method, "chat_id", None)
+            return Message(
+                message_id=next(_message_ids),
+                date=int(time.time()),
+                chat=Chat(id=chat_id if isinstance(chat_id, int) else 0, type="private"),
+                from_user=_BOT_USER,
+                text=getattr(method, "text", None),
+            )
+        if name == "getMe":
+            return _BOT_USER
+        return True
+
+    async def stream_content(self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАМЕРЫ
+# ══════════════════════════════════════════════════════════
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"n": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def q(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+    return {"n": len(ordered), "p50": q(0.50), "p95": q(0.95), "p99": q(0.99), "max": round(ordered[-1] * 1000, 2)}
+
+
+async def _loop_lag(samples: List[float], interval: float = 0.01) -> None:
+    """Насколько позже обещанного просыпается sleep(interval) — лаг event loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - t0 - interval))
+
+
+def _step_names(preset: str) -> List[str]:
+    # у «work» есть лишний вопрос «нужна ли видеокарта»
+    return [s for s in _STEPS if s != "pref_gpu_need" or preset == "work"]
+
+
+# ══════════════════════════════════════════════════════════
+#  ПРОГОН
+# ══════════════════════════════════════════════════════════
+
+async def run(rate: float, duration: float, think: float = 0.0, api_latency: float = 0.0, seed: int = 0) -> Dict:
+    rnd = random.Random(seed)
+    session = FakeSession(api_latency)
+    bot = Bot(token=os.environ["TOKEN"], session=session)
+    dp = create_dispatcher()
+    await dp.emit_startup(bot=bot, dispatcher=dp)
+    REGISTRY.reset()
+
+    handler_latency: Dict[str, List[float]] = defaultdict(list)
+    build_times: List[float] = []
+    errors: Counter = Counter()
+    lag: List[float] = []
+
+    async def user(chat_id: int) -> None:
+        preset = rnd.choice(["gaming", "work", "universal"])
+        budget = rnd.randrange(150_000, 1_500_000, 10_000)
+        started = time.perf_counter()
+        for step, raw in zip(_step_names(preset), conversation(chat_id, budget, preset)):
+            if think:
+                await asyncio.sleep(rnd.expovariate(1 / think))
+            t0 = time.perf_counter()
+            try:
+                await dp.feed_update(bot, Update.model_validate(raw, context={"bot": bot}))
+            except Exception as e:
+                errors[f"{step}: {type(e).__name__}"] += 1
+                return
+            handler_latency[step].append(time.perf_counter() - t0)
+        build_times.append(time.perf_counter() - started)
+
+    lag_task = asyncio.create_task(_loop_lag(lag))
+    tasks: List[asyncio.Task] = []
+    t_start = time.perf_counter()
+    chat_ids = itertools.count(500_000)
+    try:
+        while time.perf_counter() - t_start < duration:
+            tasks.append(asyncio.create_task(user(next(chat_ids))))
+            await asyncio.sleep(rnd.expovariate(rate))
+        arrivals_done = time.perf_counter() - t_start
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - t_start
+    finally:
+        lag_task.cancel()
+        await dp.emit_shutdown(bot=bot, dispatcher=dp)
+        await bot.session.close()
+
+    return {
+        "config": {"rate": rate, "duration": duration, "think": think, "api_latency": api_latency, "seed": seed},
+        "users": len(tasks),
+        "builds": len(build_times),
+        "seconds": round(elapsed, 3),
+        "arrival_seconds": round(arrivals_done, 3),
+        "builds_per_sec": round(len(build_times) / elapsed, 2) if elapsed else 0.0,
+        "conversation_ms": _percentiles(build_times),
+        "handler_ms": {step: _percentiles(handler_latency[step]) for step in _STEPS if handler_latency[step]},
+        "loop_lag_ms": _percentiles(lag),
+        "bot_api_calls": dict(session.calls),
+        "errors": dict(errors),
+        "stages": {
+            stage: {"count": s["count"], "p50_ms": round(s["p50"] * 1000, 2), "p99_ms": round(s["p99"] * 1000, 2)}
+            for stage, s in REGISTRY.summary().items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20.0, help="новых пользователей в секунду")
+    parser.add_argument("--duration", type=float, default=30.0, help="сколько секунд приходят пользователи")
+    parser.add_argument("--think", type=float, default=0.0, help="средняя пауза пользователя между шагами, c")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка фальшивого Bot API, c")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--log-level", default="ERROR")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    report = asyncio.run(run(args.rate, args.duration, args.think, args.api_latency, args.seed))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
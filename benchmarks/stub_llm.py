@@ -0,0 +1,283 @@
+"""
+Локальная заглушка LLM для нагрузочных тестов ИИ-конвейера.
+
+Говорит по протоколу chat completions OpenAI/Groq:
+    POST /openai/v1/chat/completions   (путь клиента groq)
+    POST /v1/chat/completions          (путь клиента openai)
+    GET  /stats                        — счётчики запросов, ошибок, параллелизма
+и отвечает валидным по схеме JSON для каждого шага AIPcBuilder — ответ
+строится из промпта (распределение по весам пресета, выбор первого
+варианта из списка категорий, проверка баланса, описание). Поддерживает
+stream=true (SSE, чанки chat.completion.chunk, завершение [DONE]).
+
+Бот переключается на заглушку через ai_config:
+    AI_BASE_URL=http://127.0.0.1:8090 python main.py   (GROQ_API не нужен)
+
+Запуск из корня репозитория:
+    python -m benchmarks.stub_llm [--port 8090] [--latency lognormal:-0.7,0.5]
+        [--error-rate 0.02] [--rate-limit-rate 0.05] [--rpm 300]
+        [--max-concurrency 16] [--hang-rate 0] [--unbalanced-rate 0.3]
+
+Распределения задержки (секунды): fixed:S, uniform:A,B, normal:MU,SD,
+lognormal:MU,SIGMA (параметры логарифма). Перегрузка:
+  --error-rate       доля ответов 500;
+  --rate-limit-rate  доля ответов 429 с Retry-After;
+  --rpm              настоящий лимит запросов в минуту (скользящее окно) → 429;
+  --max-concurrency  сверх лимита одновременных запросов — сразу 429;
+  --hang-rate        доля запросов, которые «висят» --hang секунд (таймауты клиента).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import Counter, deque
+from typing import Callable, Dict, Optional
+
+from aiohttp import web
+
+from Bot.services.ai_pc_builder import CATEGORIES, DEFAULT_WEIGHTS
+
+_OPTION = re.compile(r"(.+?)\((\d+)k\)")
+
+
+# ══════════════════════════════════════════════════════════
+#  ОТВЕТЫ ПО ШАГАМ КОНВЕЙЕРА
+# ══════════════════════════════════════════════════════════
+
+def _first_options(prompt: str) -> Dict[str, Dict]:
+    """Первый вариант каждой строки «категория: имя(Nk) / имя(Nk) ...»."""
+    picked = {}
+    for line in prompt.splitlines():
+        cat, sep, rest = line.partition(": ")
+        if not sep or cat not in CATEGORIES:
+            continue
+        m = _OPTION.match(rest.split(" / ")[0])
+        if m:
+            picked[cat] = {"name": m.group(1), "price": int(m.group(2)) * 1000}
+    return picked
+
+
+def answer(prompt: str, unbalanced: bool = False) -> str:
+    """Текст ответа модели на промпт AIPcBuilder (шаг определяется по началу промпта)."""
+    if prompt.startswith("Эксперт по ПК"):
+        budget = int(re.search(r"бюджет (\d+)k", prompt).group(1)) * 1000
+        preset = next((p for p in DEFAULT_WEIGHTS if f"| {p}" in prompt), "universal")
+        weights = dict(DEFAULT_WEIGHTS[preset])
+        if "GPU=не нужна" in prompt:
+            weights["gpu"] = 0.0
+        elif weights["gpu"] == 0:
+            weights["gpu"] = 0.15
+        scale = budget / sum(weights.values())
+        return json.dumps({cat: int(weights.get(cat, 0) * scale) for cat in CATEGORIES})
+
+    if prompt.startswith("ПК") or prompt.startswith("Улучши"):
+        return json.dumps(_first_options(prompt), ensure_ascii=False)
+
+    if prompt.startswith("Оцени сборку"):
+        if unbalanced:
+            return json.dumps({"balanced": False, "weak_categories": ["gpu"], "reason": "заглушка"},
+                              ensure_ascii=False)
+        return json.dumps({"balanced": True, "weak_categories": [], "reason": "заглушка"}, ensure_ascii=False)
+
+    return ("Сборка подобрана локальной заглушкой LLM. Компоненты совместимы и укладываются "
+            "в бюджет. Производительность соответствует выбранному сценарию.")
+
+
+# ══════════════════════════════════════════════════════════
+#  ЗАДЕРЖКИ
+# ══════════════════════════════════════════════════════════
+
+def parse_latency(spec: str, rnd: random.Random) -> Callable[[], float]:
+    """'fixed:0.5' | 'uniform:0.2,1.5' | 'normal:0.8,0.2' | 'lognormal:-0.7,0.5' → генератор задержек."""
+    kind, _, params = spec.partition(":")
+    args = [float(x) for x in params.split(",") if x]
+    if kind == "fixed":
+        return lambda: args[0] if args else 0.0
+    if kind == "uniform":
+        return lambda: rnd.uniform(args[0], args[1])
+    if kind == "normal":
+        return lambda: max(0.0, rnd.gauss(args[0], args[1]))
+    if kind == "lognormal":
+        return lambda: rnd.lognormvariate(args[0], args[1])
+    raise ValueError(f"неизвестное распределение задержки: {spec}")
+
+
+# ══════════════════════════════════════════════════════════
+#  СЕРВЕР
+# ══════════════════════════════════════════════════════════
+
+class StubLLM:
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        rpm: int = 0,
+        max_concurrency: int = 0,
+        hang_rate: float = 0.0,
+        hang: float = 600.0,
+        unbalanced_rate: float = 0.3,
+        chunk_delay: float = 0.01,
+        seed: int = 0,
+    ):
+        self.rnd = random.Random(seed)
+        self.latency = parse_latency(latency, self.rnd)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self.hang_rate = hang_rate
+        self.hang = hang
+        self.unbalanced_rate = unbalanced_rate
+        self.chunk_delay = chunk_delay
+
+        self.stats: Counter = Counter()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self._window: deque = deque()
+
+    # ── Перегрузка ───────────────────────────────────────────
+
+    def _over_rpm(self) -> bool:
+        if not self.rpm:
+            return False
+        now = time.monotonic()
+        while self._window and now - self._window[0] > 60:
+            self._window.popleft()
+        if len(self._window) >= self.rpm:
+            return True
+        self._window.append(now)
+        return False
+
+    def _rejection(self) -> Optional[web.Response]:
+        if self.max_concurrency and self.inflight >= self.max_concurrency:
+            self.stats["429_concurrency"] += 1
+            return _error(429, "rate_limit_exceeded", "Too many concurrent requests", retry_after=1)
+        if self._over_rpm():
+            self.stats["429_rpm"] += 1
+            return _error(429, "rate_limit_exceeded", f"Rate limit reached: {self.rpm} RPM", retry_after=1)
+        if self.rnd.random() < self.rate_limit_rate:
+            self.stats["429_injected"] += 1
+            return _error(429, "rate_limit_exceeded", "Injected rate limit", retry_after=1)
+        if self.rnd.random() < self.error_rate:
+            self.stats["500_injected"] += 1
+            return _error(500, "server_error", "Injected server error")
+        return None
+
+    # ── Обработчики ──────────────────────────────────────────
+
+    async def completions(self, request: web.Request) -> web.StreamResponse:
+        self.stats["requests"] += 1
+        try:
+            body = await request.json()
+            messages = body["messages"]
+        except (ValueError, KeyError, TypeError):
+            self.stats["400"] += 1
+            return _error(400, "invalid_request_error", "messages required")
+
+        rejected = self._rejection()
+        if rejected is not None:
+            return rejected
+
+        self.inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self.inflight)
+        try:
+            if self.rnd.random() < self.hang_rate:
+                self.stats["hung"] += 1
+                await asyncio.sleep(self.hang)
+            await asyncio.sleep(self.latency())
+
+            prompt = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+            content = answer(prompt, unbalanced=self.rnd.random() < self.unbalanced_rate)
+            model = body.get("model", "stub")
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+            if body.get("stream"):
+                self.stats["streamed"] += 1
+                return await self._stream(request, model, content)
+
+            self.stats["200"] += 1
+            return web.json_response({
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+        finally:
+            self.inflight -= 1
+
+    async def _stream(self, request: web.Request, model: str, content: str) -> web.StreamResponse:
+        resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+        cid, created = f"chatcmpl-{uuid.uuid4().hex[:24]}", int(time.time())
+
+        def chunk(delta: dict, finish: Optional[str] = None) -> bytes:
+            data = {
+                "id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+        await resp.write(chunk({"role": "assistant", "content": ""}))
+        for i in range(0, len(content), 16):
+            await asyncio.sleep(self.chunk_delay)
+            await resp.write(chunk({"content": content[i:i + 16]}))
+        await resp.write(chunk({}, "stop"))
+        await resp.write(b"data: [DONE]\n\n")
+        await resp.write_eof()
+        return resp
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.stats, "inflight": self.inflight, "peak_inflight": self.peak_inflight})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/openai/v1/chat/completions", self.completions)
+        app.router.add_post("/v1/chat/completions", self.completions)
+        app.router.add_get("/stats", self.stats_handler)
+        return app
+
+
+def _error(status: int, code: str, message: str, retry_after: Optional[int] = None) -> web.Response:
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+    return web.json_response(
+        {"error": {"message": message, "type": code, "code": code}}, status=status, headers=headers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang", type=float, default=600.0)
+    parser.add_argument("--unbalanced-rate", type=float, default=0.3)
+    parser.add_argument("--chunk-delay", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = StubLLM(
+        latency=args.latency, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        rpm=args.rpm, max_concurrency=args.max_concurrency, hang_rate=args.hang_rate, hang=args.hang,
+        unbalanced_rate=args.unbalanced_rate, chunk_delay=args.chunk_delay, seed=args.seed,
+    )
+    web.run_app(stub.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
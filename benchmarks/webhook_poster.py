@@ -0,0 +1,125 @@
+"""
+Локальная проверка режима вебхука: шлёт фальшивые обновления Telegram.
+
+Каждый из --users чатов проходит полный диалог сборки (fake_telegram.conversation);
+обновления одного чата идут по порядку, разные чаты — параллельно. Выводит
+коды ответов, запросов/с и задержку ответа вебхука (p50/p95/p99).
+
+С --fake-api PORT скрипт заодно поднимает фальшивый Bot API: бот, запущенный с
+TELEGRAM_API_BASE=http://127.0.0.1:PORT, отвечает пользователям «в никуда», а
+число вызовов Bot API показывает, сколько обновлений реально обработано.
+
+Пример:
+    python -m benchmarks.webhook_poster --fake-api 8081 --serve-only &
+    BOT_MODE=webhook TELEGRAM_API_BASE=http://127.0.0.1:8081 TOKEN=1:x python main.py &
+    python -m benchmarks.webhook_poster --users 200
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.fake_telegram import conversation, fake_bot_api_app
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def _post_chat(session, url: str, secret: str, updates: List[dict], statuses: Counter, latencies: List[float]):
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    for update in updates:
+        t0 = time.perf_counter()
+        try:
+            async with session.post(url, json=update, headers=headers) as resp:
+                await resp.read()
+                statuses[resp.status] += 1
+        except aiohttp.ClientError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - t0)
+
+
+async def post_updates(url: str, users: int, concurrency: int, secret: str = "", seed: int = 0) -> Dict:
+    rnd = random.Random(seed)
+    chats = [
+        conversation(100_000 + i, rnd.randrange(150_000, 1_500_000, 10_000), rnd.choice(["gaming", "work", "universal"]))
+        for i in range(users)
+    ]
+    statuses: Counter = Counter()
+    latencies: List[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def run(updates):
+        async with sem:
+            await _post_chat(session, url, secret, updates, statuses, latencies)
+
+    t0 = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(run(c) for c in chats))
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "updates": len(latencies),
+        "seconds": round(elapsed, 3),
+        "updates_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 2),
+        },
+    }
+
+
+async def _start_fake_api(port: int, calls: Counter) -> web.AppRunner:
+    runner = web.AppRunner(fake_bot_api_app(calls))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def main_async(args) -> None:
+    calls: Counter = Counter()
+    runner: Optional[web.AppRunner] = None
+    if args.fake_api:
+        runner = await _start_fake_api(args.fake_api, calls)
+        print(f"Фальшивый Bot API: http://127.0.0.1:{args.fake_api}")
+    try:
+        if args.serve_only:
+            while True:
+                await asyncio.sleep(5)
+                print(f"Вызовы Bot API: {dict(calls)}")
+        report = await post_updates(args.url, args.users, args.concurrency, args.secret)
+        if runner is not None:
+            await asyncio.sleep(args.settle)
+            report["bot_api_calls"] = dict(calls)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080/telegram/webhook")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--fake-api", type=int, default=0, help="порт фальшивого Bot API (0 — не поднимать)")
+    parser.add_argument("--serve-only", action="store_true", help="только фальшивый Bot API, без отправки")
+    parser.add_argument("--settle", type=float, default=5.0, help="сколько ждать обработки после отправки, c")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
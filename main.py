@@ -1,34 +1,27 @@
 import asyncio
 import logging
 
-from aiogram import Bot, Dispatcher
-from config import TOKEN
-
-from Bot.handlers.start import router as start_router
-from Bot.handlers.help import router as help_router
-from Bot.handlers.about import router as about_router
-from Bot.handlers.build import router as build_router
-from Bot.handlers.preferences import router as preferences_router
+from Bot.config.runtime_config import BOT_MODE, BOT_PROCESSES
+from Bot.runtime.app import create_bot, create_dispatcher
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-bot = Bot(token=TOKEN)
-dp = Dispatcher()
-
-
-def register_all_routers() -> None:
-    dp.include_router(start_router)
-    dp.include_router(help_router)
-    dp.include_router(about_router)
-    dp.include_router(build_router)
-    dp.include_router(preferences_router)
-
 
 async def main() -> None:
-    register_all_routers()
-    logging.info("Бот запускается...")
-    await dp.start_polling(bot)
+    if BOT_PROCESSES != 1:
+        from Bot.runtime.supervisor import run_supervisor
+        logging.info("Бот запускается (%s, несколько процессов)...", BOT_MODE)
+        return await run_supervisor()
+
+    bot = create_bot()
+    dp = create_dispatcher()
+    logging.info("Бот запускается (%s)...", BOT_MODE)
+    if BOT_MODE == "webhook":
+        from Bot.runtime.webhook import run_webhook
+        await run_webhook(dp, bot)
+    else:
+        await dp.start_polling(bot)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())